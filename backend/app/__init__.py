@@ -4,32 +4,34 @@ from .config import Config
 from .extensions import db, migrate
 from prometheus_flask_exporter import PrometheusMetrics
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
-from pythonjsonlogger import jsonlogger
-import logging
-import sys
 import uuid
-
-def _configure_logging(app):
-    """Configure JSON logging with request context support."""
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = jsonlogger.JsonFormatter('%(asctime)s %(levelname)s %(name)s %(message)s')
-    handler.setFormatter(formatter)
-    
-    app.logger.handlers.clear()
-    app.logger.addHandler(handler)
-    app.logger.setLevel(logging.INFO)
-    app.logger.propagate = False
+from .logs import configure_logging
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
-    _configure_logging(app)
+    configure_logging(app)
     
     # Initialize extensions
+    from . import pool, replicas
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS',
+                          pool.engine_options(app.config, app.config['SQLALCHEMY_DATABASE_URI']))
     db.init_app(app)
     migrate.init_app(app, db)
+    replicas.init_app(app, db)
+    pool.init_app(app, db)
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
+    # In-process caches (configured per app, cleared on every create_app)
+    from .auth import init_token_cache
+    from . import membership, audit, querymetrics, querywatch, profiling
+    init_token_cache(app)
+    membership.init_app(app)
+    audit.init_app(app)
+    querymetrics.init_app(app)
+    querywatch.init_app(app)
+    profiling.init_app(app)
+    
     # Setup Prometheus metrics
     metrics = PrometheusMetrics(app)
     
@@ -51,18 +53,27 @@ def create_app(config_class=Config):
                 'method': request.method,
                 'path': request.path,
                 'status_code': response.status_code,
-                'remote_addr': request.remote_addr
+                'remote_addr': request.remote_addr,
+                **querymetrics.log_fields()
             }
         )
         return response
     
     # Register blueprints
-    from .api import auth, users, projects, issues, comments
+    from .api import auth, users, projects, issues, comments, admin
     app.register_blueprint(auth.bp)
     app.register_blueprint(users.bp)
     app.register_blueprint(projects.bp)
     app.register_blueprint(issues.bp)
     app.register_blueprint(comments.bp)
+    app.register_blueprint(admin.bp)
+    
+    # CLI commands
+    from .stats import rebuild_stats_command
+    from .audit_archive import audit_partitions_command, archive_audit_command
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(audit_partitions_command)
+    app.cli.add_command(archive_audit_command)
     
     # Health check endpoint
     @app.route('/health')
@@ -0,0 +1,50 @@
+import logging
+import os
+from flask import Blueprint, request, jsonify, g, send_file
+from ..auth import require_admin
+from ..profiling import FORMATS, PROFILE_ID, list_profiles, profile_path
+
+bp = Blueprint('admin', __name__, url_prefix='/api/v1/admin')
+logger = logging.getLogger(__name__)
+
+
+@bp.route('/profiles', methods=['GET'])
+@require_admin
+def get_profiles():
+    """List request profiles stored on this instance, newest first"""
+    profiles = list_profiles()
+    logger.info(
+        'admin.profiles.list',
+        extra={
+            'request_id': getattr(g, 'request_id', None),
+            'user_id': request.current_user['user_id'],
+            'profile_count': len(profiles)
+        }
+    )
+    return jsonify(profiles)
+
+
+@bp.route('/profiles/<profile_id>', methods=['GET'])
+@require_admin
+def download_profile(profile_id):
+    """Download a profile as speedscope JSON (default) or collapsed stacks"""
+    fmt = request.args.get('format', 'speedscope')
+    if fmt not in FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(FORMATS)}'}), 400
+
+    suffix, mimetype = FORMATS[fmt]
+    path = profile_path(profile_id, suffix)
+    if not PROFILE_ID.match(profile_id) or not os.path.isfile(path):
+        return jsonify({'error': 'Profile not found'}), 404
+
+    logger.info(
+        'admin.profiles.download',
+        extra={
+            'request_id': getattr(g, 'request_id', None),
+            'user_id': request.current_user['user_id'],
+            'profile_id': profile_id,
+            'format': fmt
+        }
+    )
+    return send_file(path, mimetype=mimetype, as_attachment=True,
+                     download_name=f'{profile_id}.{suffix}')
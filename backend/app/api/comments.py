@@ -4,6 +4,7 @@ from ..extensions import db
 from ..models import Comment, Issue, User
 from ..auth import require_auth
 from ..workflows import can_comment_on_issue
+from ..fields import InvalidFields, parse_fields, select_fields, row_to_dict
 
 bp = Blueprint('comments', __name__, url_prefix='/api/v1/comments')
 logger = logging.getLogger(__name__)
@@ -81,7 +82,15 @@ def create_comment():
 @require_auth
 def get_comment(comment_id):
     """Get a specific comment"""
-    comment = Comment.query.get_or_404(comment_id)
+    try:
+        fields = parse_fields(request.args, Comment)
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    if fields:
+        query = Comment.query.filter_by(id=comment_id)
+        comment = select_fields(query, Comment, fields, extra=['issue_id', 'is_deleted']).first_or_404()
+    else:
+        comment = Comment.query.options(*Comment.load_options()).get_or_404(comment_id)
     current_user_id = request.current_user['user_id']
     if comment.is_deleted:
         logger.info(
@@ -103,7 +112,7 @@ def get_comment(comment_id):
             'user_id': current_user_id
         }
     )
-    return jsonify(comment.to_dict())
+    return jsonify(row_to_dict(comment, fields) if fields else comment.to_dict())
 
 
 @bp.route('/<int:comment_id>', methods=['PUT'])
@@ -1,16 +1,66 @@
 import logging
+from collections import Counter
+from datetime import datetime
 from flask import Blueprint, request, jsonify, g
+from sqlalchemy.orm import joinedload
 from ..extensions import db
-from ..models import Issue, Project, User, AuditLog
+from ..models import Issue, Project, User, Comment, project_members
 from ..auth import require_auth, check_project_membership
-from ..workflows import validate_status_change, can_modify_issue
+from ..workflows import validate_status_change, validate_issue_fields, can_modify_issue
+from ..pagination import MAX_PAGE_SIZE, InvalidCursor, parse_page_args, paginate_desc, page_envelope
+from ..search import apply_search, render_snippet
+from ..fields import InvalidFields, parse_fields, select_fields, row_to_dict
+from ..streaming import stream_query, wants_ndjson, wants_stream
+from ..etags import conditional_get, project_version, issue_project_version, bump_project_versions
+from ..stats import apply_deltas, issue_stat_keys
+from ..audit_query import audit_listing
+from .. import audit
 
 bp = Blueprint('issues', __name__, url_prefix='/api/v1/issues')
 logger = logging.getLogger(__name__)
 
+MAX_BULK_ITEMS = 1000
+COMMENTS_PREVIEW_SIZE = 20  # comments embedded in get_issue; the rest via /comments
+BATCH_FIELDS = {'status', 'assignee_id', 'priority'}
+
+
+def _issue_row_serializer(fields, searching):
+    """
+    (serialize, row_key) for list_issues rows, which are Issue entities,
+    column-only rows (?fields=) or either of those plus search rank/snippet
+    """
+    if fields:
+        base, row_id = (lambda row: row_to_dict(row, fields)), (lambda row: row.id)
+    elif searching:
+        base, row_id = (lambda row: row.Issue.to_dict()), (lambda row: row.Issue.id)
+    else:
+        return (lambda issue: issue.to_dict()), None
+    
+    if not searching:
+        return base, None
+    serialize = lambda row: dict(base(row), search_rank=row.rank, search_snippet=render_snippet(row.snippet))
+    return serialize, (lambda row: (row.rank, row_id(row)))
+
+
+def _comments_query(issue_id):
+    """An issue's live comments, authors eager-loaded"""
+    return Comment.query.options(*Comment.load_options()).filter_by(issue_id=issue_id, is_deleted=False)
+
+
+def _comments_page(issue_id, limit, cursor=None, include_total=False):
+    """Newest-first keyset page of an issue's live comments"""
+    return paginate_desc(_comments_query(issue_id), Comment.created_at, Comment.id, limit, cursor, include_total)
+
+
+def _list_version():
+    """Project-scoped listings can be validated by the project version"""
+    project_id = request.args.get('project_id', type=int)
+    return project_version(project_id) if project_id else None
+
 
 @bp.route('', methods=['GET'])
 @require_auth
+@conditional_get(_list_version)
 def list_issues():
     """List issues with optional filters"""
     current_user_id = request.current_user['user_id']
@@ -31,18 +81,52 @@ def list_issues():
     if priority:
         query = query.filter_by(priority=priority)
     
-    # Search (intentionally using ILIKE - will be slow)
+    # Sparse fieldsets: select only the requested columns, not whole entities
+    try:
+        fields = parse_fields(request.args, Issue)
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    if fields:
+        query = select_fields(query, Issue, fields, extra=['created_at'])
+    
+    # Full-text search: ranked, prefix-matching, served from the FTS index
     search = request.args.get('search')
+    rank = None
     if search:
-        search_pattern = f'%{search}%'
-        query = query.filter(
-            db.or_(
-                Issue.title.ilike(search_pattern),
-                Issue.description.ilike(search_pattern)
-            )
+        query, rank, _ = apply_search(query, search)
+    
+    serialize, row_key = _issue_row_serializer(fields, searching=rank is not None)
+    
+    # Keyset pagination is opt-in so existing clients keep getting a plain list.
+    # Search results page by (rank, id), everything else by (created_at, id).
+    sort_col = rank if rank is not None else Issue.created_at
+    sort_key = 'rank' if rank is not None else 'created_at'
+    paginated = 'limit' in request.args or 'cursor' in request.args
+    if not paginated and wants_stream():
+        logger.info(
+            'issues.list.stream',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'user_id': current_user_id,
+                'project_id': project_id,
+                'search_applied': bool(search),
+                'ndjson': wants_ndjson()
+            }
         )
+        return stream_query(query.order_by(sort_col.desc(), Issue.id.desc()), serialize)
     
-    issues = query.order_by(Issue.created_at.desc()).all()
+    next_cursor = total = None
+    if paginated:
+        try:
+            limit, cursor, include_total = parse_page_args(request.args)
+            rows, next_cursor, total = paginate_desc(
+                query, sort_col, Issue.id, limit, cursor, include_total, row_key, sort_key
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    else:
+        rows = query.order_by(sort_col.desc(), Issue.id.desc()).all()
+    items = [serialize(row) for row in rows]
     
     logger.info(
         'issues.list',
@@ -54,17 +138,21 @@ def list_issues():
             'assignee_id': assignee_id,
             'priority': priority,
             'search_applied': bool(search),
-            'result_count': len(issues)
+            'result_count': len(rows),
+            'paginated': paginated
         }
     )
-    return jsonify([i.to_dict() for i in issues])
+    if paginated:
+        return jsonify(page_envelope(items, next_cursor, total))
+    return jsonify(items)
 
 
 @bp.route('/<int:issue_id>', methods=['GET'])
 @require_auth
+@conditional_get(issue_project_version)
 def get_issue(issue_id):
-    """Get a specific issue with comments"""
-    issue = Issue.query.get_or_404(issue_id)
+    """Get a specific issue with its most recent comments"""
+    issue = Issue.query.options(joinedload(Issue.project)).get_or_404(issue_id)
     current_user_id = request.current_user['user_id']
     if issue.is_deleted:
         logger.info(
@@ -90,16 +178,68 @@ def get_issue(issue_id):
         )
         return jsonify({'error': 'Access denied'}), 403
     
+    # Only the latest comments are embedded (oldest first, as a thread reads);
+    # comments_next_cursor continues into older ones on GET /<id>/comments
+    limit = request.args.get('comments_limit', COMMENTS_PREVIEW_SIZE, type=int)
+    limit = max(0, min(limit, MAX_PAGE_SIZE))
+    comments, next_cursor = [], None
+    if limit:
+        comments, next_cursor, _ = _comments_page(issue_id, limit)
+    
     logger.info(
         'issues.get.success',
         extra={
             'request_id': getattr(g, 'request_id', None),
             'issue_id': issue_id,
             'project_id': issue.project_id,
-            'user_id': current_user_id
+            'user_id': current_user_id,
+            'comment_count': len(comments)
+        }
+    )
+    data = issue.to_dict(comments=reversed(comments))
+    data['comments_next_cursor'] = next_cursor
+    return jsonify(data)
+
+
+@bp.route('/<int:issue_id>/comments', methods=['GET'])
+@require_auth
+@conditional_get(issue_project_version)
+def list_issue_comments(issue_id):
+    """List an issue's comments, newest first, one keyset page at a time"""
+    issue = Issue.query.get_or_404(issue_id)
+    current_user_id = request.current_user['user_id']
+    if issue.is_deleted:
+        return jsonify({'error': 'Issue not found'}), 404
+    
+    if not check_project_membership(current_user_id, issue.project):
+        logger.warning(
+            'issues.comments.access_denied',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'issue_id': issue_id,
+                'project_id': issue.project_id,
+                'user_id': current_user_id
+            }
+        )
+        return jsonify({'error': 'Access denied'}), 403
+    
+    try:
+        limit, cursor, include_total = parse_page_args(request.args)
+        comments, next_cursor, total = _comments_page(issue_id, limit, cursor, include_total)
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    logger.info(
+        'issues.comments.success',
+        extra={
+            'request_id': getattr(g, 'request_id', None),
+            'issue_id': issue_id,
+            'project_id': issue.project_id,
+            'user_id': current_user_id,
+            'result_count': len(comments)
         }
     )
-    return jsonify(issue.to_dict(include_comments=True))
+    return jsonify(page_envelope([c.to_dict() for c in comments], next_cursor, total))
 
 
 @bp.route('', methods=['POST'])
@@ -122,6 +262,18 @@ def create_issue():
         )
         return jsonify({'error': f'Required fields: {", ".join(required)}'}), 400
     
+    invalid = validate_issue_fields(data)
+    if invalid:
+        logger.warning(
+            'issues.create.validation_failed',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'user_id': current_user_id,
+                'reason': invalid
+            }
+        )
+        return jsonify({'error': invalid}), 400
+    
     # Verify project exists
     project = Project.query.get(data['project_id'])
     if not project or project.is_deleted:
@@ -188,13 +340,7 @@ def create_issue():
     db.session.flush()  # Get the issue ID
     
     # Create audit log
-    audit = AuditLog(
-        issue_id=issue.id,
-        user_id=current_user_id,
-        action='created',
-        new_value=issue.status
-    )
-    db.session.add(audit)
+    audit.record(issue, current_user_id, 'created', new_value=issue.status)
     
     db.session.commit()
     logger.info(
@@ -213,6 +359,265 @@ def create_issue():
     return jsonify(issue.to_dict()), 201
 
 
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_memberships(project_ids, user_ids):
+    """(project_id, user_id) pairs with access, owners included, in one query"""
+    if not project_ids or not user_ids:
+        return set()
+    members = db.select(project_members.c.project_id, project_members.c.user_id).where(
+        project_members.c.project_id.in_(project_ids),
+        project_members.c.user_id.in_(user_ids)
+    )
+    owners = db.select(Project.id, Project.owner_id).where(
+        Project.id.in_(project_ids),
+        Project.owner_id.in_(user_ids)
+    )
+    return {tuple(row) for row in db.session.execute(db.union(members, owners))}
+
+
+@bp.route('/bulk', methods=['POST'])
+@require_auth
+def bulk_create_issues():
+    """Create many issues in one request; each item succeeds or fails on its own"""
+    items = request.get_json()
+    current_user_id = request.current_user['user_id']
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Expected a non-empty JSON array of issues'}), 400
+    if len(items) > MAX_BULK_ITEMS:
+        return jsonify({'error': f'At most {MAX_BULK_ITEMS} issues per request'}), 400
+    
+    # Everything needed for validation, loaded once for the whole batch
+    project_ids = {_as_int(item.get('project_id')) for item in items if isinstance(item, dict)} - {None}
+    assignee_ids = {_as_int(item.get('assignee_id')) for item in items if isinstance(item, dict)} - {None}
+    live_projects = {
+        pid for (pid,) in db.session.query(Project.id).filter(
+            Project.id.in_(project_ids), Project.is_deleted == False
+        )
+    }
+    existing_users = {uid for (uid,) in db.session.query(User.id).filter(User.id.in_(assignee_ids))}
+    access = _load_memberships(live_projects, existing_users | {current_user_id})
+    
+    results = [None] * len(items)
+    rows, row_index = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('title') or not item.get('project_id'):
+            results[index] = {'index': index, 'status': 400, 'error': 'Required fields: title, project_id'}
+            continue
+        project_id = _as_int(item['project_id'])
+        assignee_id = _as_int(item.get('assignee_id'))
+        invalid = validate_issue_fields(item)
+        if invalid:
+            error = (400, invalid)
+        elif project_id is None:
+            error = (400, 'project_id must be an id')
+        elif item.get('assignee_id') is not None and assignee_id is None:
+            error = (400, 'assignee_id must be an id or null')
+        elif project_id not in live_projects:
+            error = (404, 'Project not found')
+        elif (project_id, current_user_id) not in access:
+            error = (403, 'You must be a project member to create issues')
+        elif assignee_id and assignee_id not in existing_users:
+            error = (404, 'Assignee not found')
+        elif assignee_id and (project_id, assignee_id) not in access:
+            error = (400, 'Assignee must be a project member')
+        else:
+            error = None
+        if error:
+            results[index] = {'index': index, 'status': error[0], 'error': error[1]}
+            continue
+        rows.append({
+            'title': item['title'],
+            'description': item.get('description'),
+            'project_id': project_id,
+            'reporter_id': current_user_id,
+            'assignee_id': assignee_id or None,
+            'status': item.get('status', 'OPEN'),
+            'priority': item.get('priority', 'MEDIUM'),
+            'is_deleted': False
+        })
+        row_index.append(index)
+    
+    if rows:
+        # Multi-row INSERT ... RETURNING. Ids are assigned in VALUES order, so
+        # sorting by id restores request order without forcing row-at-a-time
+        # inserts (sort_by_parameter_order does that on SQLite).
+        table = Issue.__table__
+        created = sorted(
+            db.session.execute(table.insert().returning(*table.c), rows).all(),
+            key=lambda row: row.id
+        )
+        audit.record_many([
+            {'issue_id': row.id, 'project_id': row.project_id, 'user_id': current_user_id,
+             'action': 'created', 'new_value': row.status}
+            for row in created
+        ])
+        # Core inserts skip the ORM flush hooks, so keep versions and stats current here
+        bump_project_versions(project_ids={row.project_id for row in created})
+        apply_deltas(Counter(
+            key for row in created
+            for key in issue_stat_keys(row.project_id, row.status, row.priority, row.assignee_id)
+        ))
+        db.session.commit()
+        
+        fields = list(Issue.sparse_fields())
+        for index, row in zip(row_index, created):
+            results[index] = {'index': index, 'status': 201, 'issue': row_to_dict(row, fields)}
+    
+    failed = sum(1 for r in results if r['status'] != 201)
+    logger.info(
+        'issues.bulk_create.completed',
+        extra={
+            'request_id': getattr(g, 'request_id', None),
+            'user_id': current_user_id,
+            'submitted_count': len(items),
+            'created_count': len(rows),
+            'failed_count': failed,
+            'project_ids': sorted(live_projects)
+        }
+    )
+    return jsonify({'created': len(rows), 'failed': failed, 'results': results}), 201 if not failed else 207
+
+
+@bp.route('/batch', methods=['PATCH'])
+@require_auth
+def batch_update_issues():
+    """Apply the same status/assignee/priority change to many issues"""
+    data = request.get_json() or {}
+    current_user_id = request.current_user['user_id']
+    raw_ids = data.get('issue_ids')
+    changes = data.get('changes') or {}
+    
+    if (not isinstance(raw_ids, list) or not raw_ids
+            or not all(isinstance(i, int) and not isinstance(i, bool) for i in raw_ids)):
+        return jsonify({'error': 'issue_ids must be a non-empty list of ids'}), 400
+    if len(raw_ids) > MAX_BULK_ITEMS:
+        return jsonify({'error': f'At most {MAX_BULK_ITEMS} issues per request'}), 400
+    issue_ids = list(dict.fromkeys(raw_ids))
+    if not isinstance(changes, dict) or not changes or set(changes) - BATCH_FIELDS:
+        return jsonify({'error': f'changes may only contain: {", ".join(sorted(BATCH_FIELDS))}'}), 400
+    
+    new_assignee_id = _as_int(changes.get('assignee_id'))
+    if 'assignee_id' in changes and changes['assignee_id'] is not None and new_assignee_id is None:
+        return jsonify({'error': 'assignee_id must be an id or null'}), 400
+    invalid = validate_issue_fields(changes)
+    if invalid:
+        return jsonify({'error': invalid}), 400
+    
+    # One query for the issues, one for memberships, one for the assignee
+    issues = {issue.id: issue for issue in Issue.query.filter(Issue.id.in_(issue_ids))}
+    project_ids = {issue.project_id for issue in issues.values()}
+    user_ids = {current_user_id} | ({new_assignee_id} if new_assignee_id else set())
+    access = _load_memberships(project_ids, user_ids)
+    assignee_exists = bool(new_assignee_id and db.session.query(User.id).filter_by(id=new_assignee_id).first())
+    
+    results, updates = {}, {}
+    for issue_id in issue_ids:
+        issue = issues.get(issue_id)
+        if issue is None or issue.is_deleted:
+            results[issue_id] = (404, 'Issue not found')
+            continue
+        can_modify = (
+            current_user_id in (issue.assignee_id, issue.reporter_id)
+            or (issue.project_id, current_user_id) in access
+        )
+        if not can_modify:
+            results[issue_id] = (403, 'You do not have permission to modify this issue')
+            continue
+        
+        changed = {}
+        if 'status' in changes and changes['status'] != issue.status:
+            is_valid, error_msg = validate_status_change(issue, changes['status'], current_user_id)
+            if not is_valid:
+                results[issue_id] = (400, error_msg)
+                continue
+            changed['status'] = changes['status']
+        if 'assignee_id' in changes and new_assignee_id != issue.assignee_id:
+            if new_assignee_id is not None and not assignee_exists:
+                results[issue_id] = (404, 'Assignee not found')
+                continue
+            if new_assignee_id is not None and (issue.project_id, new_assignee_id) not in access:
+                results[issue_id] = (400, 'Assignee must be a project member')
+                continue
+            changed['assignee_id'] = new_assignee_id
+        if 'priority' in changes and changes['priority'] != issue.priority:
+            changed['priority'] = changes['priority']
+        
+        results[issue_id] = (200, None)
+        if changed:
+            updates[issue_id] = changed
+    
+    if updates:
+        values = dict(changes, **({'assignee_id': new_assignee_id} if 'assignee_id' in changes else {}))
+        _apply_batch_updates(issues, updates, values, current_user_id)
+        db.session.commit()
+    
+    ok_ids = [issue_id for issue_id, (status, _) in results.items() if status == 200]
+    fresh = {issue.id: issue for issue in Issue.query.filter(Issue.id.in_(ok_ids))} if ok_ids else {}
+    body = []
+    for issue_id, (status, error) in results.items():
+        if status == 200:
+            body.append({'id': issue_id, 'status': 200, 'issue': fresh[issue_id].to_dict()})
+        else:
+            body.append({'id': issue_id, 'status': status, 'error': error})
+    
+    failed = len(results) - len(ok_ids)
+    logger.info(
+        'issues.batch_update.completed',
+        extra={
+            'request_id': getattr(g, 'request_id', None),
+            'user_id': current_user_id,
+            'requested_count': len(issue_ids),
+            'updated_count': len(updates),
+            'failed_count': failed,
+            'updated_fields': sorted(changes)
+        }
+    )
+    return jsonify({'updated': len(updates), 'failed': failed, 'results': body}), 200 if not failed else 207
+
+
+def _apply_batch_updates(issues, updates, values, user_id):
+    """
+    One UPDATE for every changed issue, one multi-row audit INSERT, explicit
+    stats/version upkeep. Every issue in `updates` passed all checks, so
+    setting the columns it already matches to `values` is a no-op for it.
+    """
+    table = Issue.__table__
+    db.session.execute(
+        table.update().where(table.c.id.in_(list(updates))).values(**values, updated_at=datetime.utcnow())
+    )
+    
+    audit_rows, deltas = [], Counter()
+    for issue_id, changed in updates.items():
+        issue = issues[issue_id]
+        if 'status' in changed:
+            audit_rows.append({'issue_id': issue_id, 'project_id': issue.project_id,
+                               'user_id': user_id, 'action': 'status_change',
+                               'old_value': issue.status, 'new_value': changed['status']})
+        if 'assignee_id' in changed:
+            old, new = issue.assignee_id, changed['assignee_id']
+            audit_rows.append({'issue_id': issue_id, 'project_id': issue.project_id,
+                               'user_id': user_id, 'action': 'assigned',
+                               'old_value': str(old) if old else None,
+                               'new_value': str(new) if new else None})
+        deltas.subtract(issue_stat_keys(issue.project_id, issue.status, issue.priority, issue.assignee_id))
+        deltas.update(issue_stat_keys(
+            issue.project_id,
+            changed.get('status', issue.status),
+            changed.get('priority', issue.priority),
+            changed.get('assignee_id', issue.assignee_id)
+        ))
+    audit.record_many(audit_rows)
+    apply_deltas(deltas)
+    bump_project_versions(project_ids={issues[issue_id].project_id for issue_id in updates})
+
+
 @bp.route('/<int:issue_id>', methods=['PUT'])
 @require_auth
 def update_issue(issue_id):
@@ -273,14 +678,8 @@ def update_issue(issue_id):
         updated_fields.append('status')
         
         # Create audit log
-        audit = AuditLog(
-            issue_id=issue.id,
-            user_id=current_user_id,
-            action='status_change',
-            old_value=old_status,
-            new_value=data['status']
-        )
-        db.session.add(audit)
+        audit.record(issue, current_user_id, 'status_change',
+                     old_value=old_status, new_value=data['status'])
     
     # Update assignee with validation
     if 'assignee_id' in data and data['assignee_id'] != issue.assignee_id:
@@ -319,14 +718,9 @@ def update_issue(issue_id):
         updated_fields.append('assignee')
         
         # Create audit log
-        audit = AuditLog(
-            issue_id=issue.id,
-            user_id=current_user_id,
-            action='assigned',
-            old_value=str(old_assignee) if old_assignee else None,
-            new_value=str(new_assignee_id) if new_assignee_id else None
-        )
-        db.session.add(audit)
+        audit.record(issue, current_user_id, 'assigned',
+                     old_value=str(old_assignee) if old_assignee else None,
+                     new_value=str(new_assignee_id) if new_assignee_id else None)
     
     # Simple field updates
     if 'title' in data:
@@ -376,14 +770,7 @@ def delete_issue(issue_id):
     issue.is_deleted = True
     
     # Audit log
-    audit = AuditLog(
-        issue_id=issue.id,
-        user_id=current_user_id,
-        action='deleted',
-        old_value='active',
-        new_value='deleted'
-    )
-    db.session.add(audit)
+    audit.record(issue, current_user_id, 'deleted', old_value='active', new_value='deleted')
     
     db.session.commit()
     logger.info(
@@ -400,8 +787,9 @@ def delete_issue(issue_id):
 
 @bp.route('/<int:issue_id>/audit', methods=['GET'])
 @require_auth
+@conditional_get(issue_project_version)
 def get_audit_log(issue_id):
-    """Get audit log for an issue"""
+    """Audit log of an issue, newest first, one keyset page at a time (see audit_query.py)"""
     issue = Issue.query.get_or_404(issue_id)
     current_user_id = request.current_user['user_id']
     
@@ -418,15 +806,8 @@ def get_audit_log(issue_id):
         )
         return jsonify({'error': 'Access denied'}), 403
     
-    logs = AuditLog.query.filter_by(issue_id=issue_id).order_by(AuditLog.timestamp.desc()).all()
-    logger.info(
-        'issues.audit.success',
-        extra={
-            'request_id': getattr(g, 'request_id', None),
-            'issue_id': issue_id,
-            'project_id': issue.project_id,
-            'user_id': current_user_id,
-            'log_count': len(logs)
-        }
-    )
-    return jsonify([log.to_dict() for log in logs])
+    return audit_listing({'issue_id': issue_id}, 'issues.audit', {
+        'issue_id': issue_id,
+        'project_id': issue.project_id,
+        'user_id': current_user_id
+    })
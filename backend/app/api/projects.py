@@ -1,30 +1,76 @@
 import logging
 from flask import Blueprint, request, jsonify, g
 from ..extensions import db
-from ..models import Project, User
+from ..models import Project, User, project_members
 from ..auth import require_auth, check_project_membership
+from ..streaming import stream_query, wants_ndjson, wants_stream
+from ..fields import InvalidFields, parse_fields, select_fields, row_to_dict
+from ..etags import conditional_get, project_version, bump_project_versions
+from ..stats import get_project_stats
+from ..membership import invalidate as invalidate_membership
+from ..pagination import InvalidCursor, parse_page_args, paginate_desc, page_envelope
+from ..audit_query import audit_listing
 
 bp = Blueprint('projects', __name__, url_prefix='/api/v1/projects')
 logger = logging.getLogger(__name__)
 
 
+def _include_members():
+    """Member lists are unbounded, so they are only embedded on request"""
+    return request.args.get('include_members', '').lower() in ('1', 'true', 'yes')
+
+
+def _is_listed_member(project_id, user_id):
+    """Single-row check against the project_members primary key"""
+    return db.session.query(db.exists().where(
+        project_members.c.project_id == project_id,
+        project_members.c.user_id == user_id
+    )).scalar()
+
+
 @bp.route('', methods=['GET'])
 @require_auth
 def list_projects():
     """List projects where user is a member (excluding soft-deleted)"""
     current_user_id = request.current_user['user_id']
-    user = User.query.get(current_user_id)
-    
-    # Get projects where user is owner or member
-    projects = Project.query.filter(
-        db.and_(
-            Project.is_deleted == False,
-            db.or_(
-                Project.owner_id == current_user_id,
-                Project.members.contains(user)
-            )
+    
+    # Project ids the user owns or belongs to, each read from its own index
+    accessible = db.union(
+        db.select(project_members.c.project_id.label('project_id'))
+        .where(project_members.c.user_id == current_user_id),
+        db.select(Project.id.label('project_id'))
+        .where(Project.owner_id == current_user_id, Project.is_deleted == False)
+    ).subquery()
+    query = (
+        Project.query
+        .join(accessible, accessible.c.project_id == Project.id)
+        .filter(Project.is_deleted == False)
+    )
+    
+    try:
+        fields = parse_fields(request.args, Project)
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
+    if fields:
+        query = select_fields(query, Project, fields)
+        serialize = lambda row: row_to_dict(row, fields)
+    else:
+        counts = Project.count_columns()
+        query = query.add_columns(*(column.label(name) for name, column in counts.items()))
+        serialize = lambda row: dict(row.Project.to_dict(), **{name: row._mapping[name] for name in counts})
+    
+    if wants_stream():
+        logger.info(
+            'projects.list.stream',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'user_id': current_user_id,
+                'ndjson': wants_ndjson()
+            }
         )
-    ).all()
+        return stream_query(query.order_by(Project.id), serialize)
+    
+    projects = query.order_by(Project.id).all()
     
     logger.info(
         'projects.list',
@@ -34,14 +80,16 @@ def list_projects():
             'project_count': len(projects)
         }
     )
-    return jsonify([p.to_dict() for p in projects])
+    return jsonify([serialize(p) for p in projects])
 
 
 @bp.route('/<int:project_id>', methods=['GET'])
 @require_auth
+@conditional_get(project_version)
 def get_project(project_id):
-    """Get a specific project with members"""
-    project = Project.query.get_or_404(project_id)
+    """Get a specific project (members with ?include_members=true)"""
+    include_members = _include_members()
+    project = Project.query.options(*Project.load_options(include_members)).get_or_404(project_id)
     current_user_id = request.current_user['user_id']
     
     if project.is_deleted:
@@ -72,10 +120,124 @@ def get_project(project_id):
         extra={
             'request_id': getattr(g, 'request_id', None),
             'project_id': project_id,
-            'user_id': current_user_id
+            'user_id': current_user_id,
+            'include_members': include_members
+        }
+    )
+    return jsonify(project.to_dict(include_members=include_members))
+
+
+@bp.route('/<int:project_id>/members', methods=['GET'])
+@require_auth
+@conditional_get(project_version)
+def list_members(project_id):
+    """List project members, most recently joined first, one keyset page at a time"""
+    project = Project.query.get_or_404(project_id)
+    current_user_id = request.current_user['user_id']
+    
+    if project.is_deleted:
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if not check_project_membership(current_user_id, project):
+        logger.warning(
+            'projects.members.list.access_denied',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'project_id': project_id,
+                'user_id': current_user_id
+            }
+        )
+        return jsonify({'error': 'Access denied'}), 403
+    
+    joined_at = project_members.c.joined_at
+    query = (
+        db.session.query(User, joined_at)
+        .join(project_members, project_members.c.user_id == User.id)
+        .filter(project_members.c.project_id == project_id)
+    )
+    try:
+        limit, cursor, include_total = parse_page_args(request.args)
+        rows, next_cursor, total = paginate_desc(
+            query, joined_at, User.id, limit, cursor, include_total,
+            row_key=lambda row: (row.joined_at, row.User.id)
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    logger.info(
+        'projects.members.list',
+        extra={
+            'request_id': getattr(g, 'request_id', None),
+            'project_id': project_id,
+            'user_id': current_user_id,
+            'result_count': len(rows)
         }
     )
-    return jsonify(project.to_dict(include_members=True))
+    items = [dict(row.User.to_dict(), joined_at=row.joined_at.isoformat()) for row in rows]
+    return jsonify(page_envelope(items, next_cursor, total))
+
+
+@bp.route('/<int:project_id>/stats', methods=['GET'])
+@require_auth
+@conditional_get(project_version)
+def get_stats(project_id):
+    """Issue counts by status, priority and assignee (served from the summary table)"""
+    project = Project.query.get_or_404(project_id)
+    current_user_id = request.current_user['user_id']
+    
+    if project.is_deleted:
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if not check_project_membership(current_user_id, project):
+        logger.warning(
+            'projects.stats.access_denied',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'project_id': project_id,
+                'user_id': current_user_id
+            }
+        )
+        return jsonify({'error': 'Access denied'}), 403
+    
+    stats = get_project_stats(project_id)
+    logger.info(
+        'projects.stats.success',
+        extra={
+            'request_id': getattr(g, 'request_id', None),
+            'project_id': project_id,
+            'user_id': current_user_id,
+            'total': stats['total']
+        }
+    )
+    return jsonify(stats)
+
+
+@bp.route('/<int:project_id>/audit', methods=['GET'])
+@require_auth
+@conditional_get(project_version)
+def get_audit_log(project_id):
+    """Audit log across a project's issues, newest first (see audit_query.py)"""
+    project = Project.query.get_or_404(project_id)
+    current_user_id = request.current_user['user_id']
+    
+    if project.is_deleted:
+        return jsonify({'error': 'Project not found'}), 404
+    
+    if not check_project_membership(current_user_id, project):
+        logger.warning(
+            'projects.audit.access_denied',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'project_id': project_id,
+                'user_id': current_user_id
+            }
+        )
+        return jsonify({'error': 'Access denied'}), 403
+    
+    return audit_listing({'project_id': project_id}, 'projects.audit', {
+        'project_id': project_id,
+        'user_id': current_user_id
+    })
 
 
 @bp.route('', methods=['POST'])
@@ -118,7 +280,7 @@ def create_project():
             'user_id': current_user_id
         }
     )
-    return jsonify(project.to_dict(include_members=True)), 201
+    return jsonify(project.to_dict(include_members=_include_members())), 201
 
 
 @bp.route('/<int:project_id>', methods=['PUT'])
@@ -191,6 +353,7 @@ def delete_project(project_id):
     
     project.is_deleted = True
     db.session.commit()
+    invalidate_membership(project_id=project_id)
     logger.info(
         'projects.delete.success',
         extra={
@@ -252,7 +415,7 @@ def add_member(project_id):
         )
         return jsonify({'error': 'User not found'}), 404
     
-    if user in project.members:
+    if _is_listed_member(project_id, user_id):
         logger.info(
             'projects.members.add.already_member',
             extra={
@@ -264,8 +427,11 @@ def add_member(project_id):
         )
         return jsonify({'error': 'User already a member'}), 400
     
-    project.members.append(user)
+    # Core insert: appending to project.members would load the whole member list
+    db.session.execute(project_members.insert().values(project_id=project_id, user_id=user.id))
+    bump_project_versions(project_ids=[project_id])
     db.session.commit()
+    invalidate_membership(project_id=project_id, user_id=user_id)
     
     logger.info(
         'projects.members.add.success',
@@ -276,7 +442,7 @@ def add_member(project_id):
             'member_id': user_id
         }
     )
-    return jsonify(project.to_dict(include_members=True))
+    return jsonify(project.to_dict(include_members=_include_members()))
 
 
 @bp.route('/<int:project_id>/members/<int:user_id>', methods=['DELETE'])
@@ -298,9 +464,9 @@ def remove_member(project_id, user_id):
         )
         return jsonify({'error': 'Only project owner can remove members'}), 403
     
-    user = User.query.get_or_404(user_id)
+    db.get_or_404(User, user_id)
     
-    if user not in project.members:
+    if not _is_listed_member(project_id, user_id):
         logger.warning(
             'projects.members.remove.not_member',
             extra={
@@ -316,8 +482,13 @@ def remove_member(project_id, user_id):
     if project.owner_id == user_id:
         return jsonify({'error': 'Cannot remove project owner'}), 400
     
-    project.members.remove(user)
+    db.session.execute(project_members.delete().where(
+        project_members.c.project_id == project_id,
+        project_members.c.user_id == user_id
+    ))
+    bump_project_versions(project_ids=[project_id])
     db.session.commit()
+    invalidate_membership(project_id=project_id, user_id=user_id)
     
     logger.info(
         'projects.members.remove.success',
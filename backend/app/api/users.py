@@ -4,6 +4,8 @@ from werkzeug.security import generate_password_hash
 from ..extensions import db
 from ..models import User
 from ..auth import require_auth, require_admin
+from ..streaming import stream_query, wants_ndjson, wants_stream
+from ..membership import invalidate as invalidate_membership
 
 bp = Blueprint('users', __name__, url_prefix='/api/v1/users')
 logger = logging.getLogger(__name__)
@@ -13,6 +15,17 @@ logger = logging.getLogger(__name__)
 @require_auth
 def list_users():
     """List all users"""
+    if wants_stream():
+        logger.info(
+            'users.list.stream',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'user_id': request.current_user['user_id'],
+                'ndjson': wants_ndjson()
+            }
+        )
+        return stream_query(User.query.order_by(User.id), lambda user: user.to_dict())
+    
     users = User.query.all()
     logger.info(
         'users.list',
@@ -120,6 +133,7 @@ def delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    invalidate_membership(user_id=user_id)
     logger.info(
         'users.delete.success',
         extra={
@@ -0,0 +1,305 @@
+"""
+Audit log writes
+
+Endpoints call `record()` / `record_many()`; AUDIT_MODE decides where the
+rows go:
+
+- sync  (default, strict consistency): rows join the request transaction,
+  so an issue change and its audit trail commit or roll back together.
+- async (write-behind): rows are handed over only after the request
+  transaction commits, appended to a per-process spool file, queued in
+  memory and written by a background thread in multi-row INSERTs.
+
+Async delivery is at-least-once. The spool is truncated whenever every
+spooled event has been committed; spools left behind by a crashed process
+are replayed on startup, which may insert an event twice but never loses
+one. Every worker replays on startup, so a spool is first claimed by
+renaming it to `*.replaying.<pid>`; the rename is atomic and only one
+worker wins it. When the queue is full the request thread waits up to
+AUDIT_ENQUEUE_TIMEOUT and then writes the rows itself (backpressure
+instead of dropping). Pending events are flushed at interpreter exit.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from prometheus_client import Counter, Gauge
+from sqlalchemy import event
+from .extensions import db
+from .models import AuditLog, Issue
+from .etags import bump_project_versions
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = 'audit.pending'
+_WAKE = object()  # queued by shutdown() to interrupt the writer's wait
+_CLAIM_SUFFIX = '.replaying.'
+
+AUDIT_EVENTS = Counter(
+    'audit_events_total',
+    'Audit events by how they reached the database',
+    ['path']  # transaction, queued, backpressure, replayed
+)
+QUEUE_DEPTH = Gauge('audit_queue_depth', 'Audit events waiting for the background writer')
+
+
+def _row(issue_id, project_id, user_id, action, old_value=None, new_value=None):
+    return {'issue_id': issue_id, 'project_id': project_id, 'user_id': user_id, 'action': action,
+            'old_value': old_value, 'new_value': new_value, 'timestamp': datetime.utcnow()}
+
+
+def _insert_rows(connection, rows):
+    connection.execute(AuditLog.__table__.insert(), rows)
+    # Audit rows change what the issue and project audit endpoints return
+    bump_project_versions(project_ids={row['project_id'] for row in rows}, connection=connection)
+
+
+def _fill_project_ids(connection, rows):
+    """Spools written before audit rows carried project_id"""
+    missing = {row['issue_id'] for row in rows if row.get('project_id') is None}
+    if not missing:
+        return
+    projects = dict(connection.execute(
+        db.select(Issue.id, Issue.project_id).where(Issue.id.in_(missing))
+    ).all())
+    for row in rows:
+        if row.get('project_id') is None:
+            row['project_id'] = projects.get(row['issue_id'])
+
+
+class AuditSink:
+    """Bounded in-process queue drained by one writer thread per process"""
+
+    def __init__(self):
+        self.engine = None
+        self.queue = None
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # guards the spool file and _outstanding
+        self._spool = None
+        self._outstanding = 0
+
+    def configure(self, app):
+        self.shutdown()  # a writer bound to a previous app's engine
+        self._pid = None
+        self.config = {key: app.config[key] for key in app.config if key.startswith('AUDIT_')}
+        os.makedirs(self.config['AUDIT_SPOOL_DIR'], exist_ok=True)
+
+    # Writer side ---------------------------------------------------------
+
+    def _ensure_started(self):
+        """Start the writer in this process (threads do not survive fork)"""
+        if self._pid == os.getpid() and self._writer_ok():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._writer_ok():
+                return
+            self._pid = os.getpid()
+            self.engine = db.engine
+            self.queue = queue.Queue(maxsize=self.config['AUDIT_QUEUE_SIZE'])
+            self._outstanding = 0
+            path = os.path.join(self.config['AUDIT_SPOOL_DIR'], f'audit-{self._pid}.jsonl')
+            self._spool = open(path, 'a', encoding='utf-8')
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            if self._background:
+                self._thread.start()
+
+    def _writer_ok(self):
+        return self._thread is not None and (self._thread.is_alive() or not self._background)
+
+    @property
+    def _background(self):
+        # Tests turn the writer thread off and call flush() themselves
+        return self.config.get('AUDIT_BACKGROUND_WRITER', True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._drain(wait=self.config['AUDIT_FLUSH_INTERVAL'])
+
+    def _drain(self, wait=0):
+        """Write one batch; blocks up to `wait` seconds for the first event"""
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=wait) if wait else self.queue.get_nowait())
+            while len(batch) < self.config['AUDIT_BATCH_SIZE']:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        batch = [row for row in batch if row is not _WAKE]
+        if not batch:
+            return 0
+        while True:
+            try:
+                with self.engine.begin() as connection:
+                    _insert_rows(connection, batch)
+                break
+            except Exception:
+                # Keep the batch; it is also still in the spool
+                logger.exception('audit.flush.failed', extra={'batch_size': len(batch)})
+                if self._stop.wait(1.0):
+                    return 0
+        self._acknowledge(len(batch))
+        QUEUE_DEPTH.set(self.queue.qsize())
+        return len(batch)
+
+    def _acknowledge(self, count):
+        with self._lock:
+            self._outstanding -= count
+            if self._outstanding == 0:
+                # Everything spooled so far is committed
+                self._spool.seek(0)
+                self._spool.truncate()
+
+    def flush(self):
+        """Write everything queued so far (tests, shutdown)"""
+        if self.queue is None or self._pid != os.getpid():
+            return
+        while self._drain():
+            pass
+
+    def shutdown(self):
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        if self._thread.is_alive():
+            try:
+                self.queue.put_nowait(_WAKE)  # the writer may be waiting on an empty queue
+            except queue.Full:
+                pass  # then it is busy and sees _stop after this batch
+            self._thread.join(timeout=30)
+        self.flush()
+        self._spool.close()
+        self._thread = None
+
+    # Producer side -------------------------------------------------------
+
+    def enqueue(self, rows):
+        """Hand committed rows to the writer, or write them here if it is saturated"""
+        self._ensure_started()
+        with self._lock:
+            for row in rows:
+                self._spool.write(json.dumps(row, default=datetime.isoformat) + '\n')
+            self._spool.flush()
+            if self.config['AUDIT_SPOOL_FSYNC']:
+                os.fsync(self._spool.fileno())
+            self._outstanding += len(rows)
+
+        deadline = time.monotonic() + self.config['AUDIT_ENQUEUE_TIMEOUT']
+        for index, row in enumerate(rows):
+            try:
+                self.queue.put(row, timeout=max(deadline - time.monotonic(), 0))
+            except queue.Full:
+                rest = rows[index:]
+                with self.engine.begin() as connection:
+                    _insert_rows(connection, rest)
+                self._acknowledge(len(rest))
+                AUDIT_EVENTS.labels('backpressure').inc(len(rest))
+                break
+            AUDIT_EVENTS.labels('queued').inc()
+        QUEUE_DEPTH.set(self.queue.qsize())
+
+    # Recovery ------------------------------------------------------------
+
+    def replay_spools(self):
+        """Insert events from spools whose process is gone, then delete them"""
+        spool_dir = self.config['AUDIT_SPOOL_DIR']
+        for path in glob.glob(os.path.join(spool_dir, 'audit-*.jsonl*')):
+            name = os.path.basename(path)
+            spool_name, _, claimer = name.partition(_CLAIM_SUFFIX)
+            # A claimed spool whose replayer died is up for grabs again
+            pid = int(claimer or spool_name[len('audit-'):-len('.jsonl')])
+            if pid != os.getpid() and _alive(pid):
+                continue
+            claimed = os.path.join(spool_dir, f'{spool_name}{_CLAIM_SUFFIX}{os.getpid()}')
+            if path != claimed:
+                try:
+                    os.rename(path, claimed)
+                except FileNotFoundError:
+                    continue  # another worker claimed it first
+            self._replay(claimed)
+
+    def _replay(self, path):
+        """Insert the events of a spool this process has claimed, then delete it"""
+        with open(path, encoding='utf-8') as spool:
+            rows = [json.loads(line) for line in spool if line.strip()]
+        for row in rows:
+            row['timestamp'] = datetime.fromisoformat(row['timestamp'])
+        batch_size = self.config['AUDIT_BATCH_SIZE']
+        with db.engine.begin() as connection:
+            _fill_project_ids(connection, rows)
+            for start in range(0, len(rows), batch_size):
+                _insert_rows(connection, rows[start:start + batch_size])
+        os.remove(path)
+        AUDIT_EVENTS.labels('replayed').inc(len(rows))
+        logger.info('audit.spool.replayed', extra={'spool': path, 'event_count': len(rows)})
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+sink = AuditSink()
+
+
+def _is_async():
+    return current_app.config['AUDIT_MODE'] == 'async'
+
+
+def record(issue, user_id, action, old_value=None, new_value=None):
+    """Audit one change to `issue` made in the current transaction"""
+    row = _row(issue.id, issue.project_id, user_id, action, old_value, new_value)
+    if _is_async():
+        db.session.info.setdefault(_PENDING_KEY, []).append(row)
+    else:
+        db.session.add(AuditLog(**row))
+        AUDIT_EVENTS.labels('transaction').inc()
+
+
+def record_many(rows):
+    """Audit several changes; rows are dicts of issue_id, project_id, user_id, action, old/new_value"""
+    rows = [_row(**row) for row in rows]
+    if not rows:
+        return
+    if _is_async():
+        db.session.info.setdefault(_PENDING_KEY, []).extend(rows)
+    else:
+        db.session.execute(AuditLog.__table__.insert(), rows)
+        AUDIT_EVENTS.labels('transaction').inc(len(rows))
+
+
+@event.listens_for(db.session, 'after_commit')
+def _hand_over(session):
+    rows = session.info.pop(_PENDING_KEY, None)
+    if rows:
+        sink.enqueue(rows)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_app(app):
+    if app.config['AUDIT_MODE'] not in ('sync', 'async'):
+        raise RuntimeError(f"Unsupported AUDIT_MODE: {app.config['AUDIT_MODE']}")
+    if app.config['AUDIT_MODE'] != 'async':
+        return
+    sink.configure(app)
+    with app.app_context():
+        sink.replay_spools()
+    atexit.register(sink.shutdown)
+
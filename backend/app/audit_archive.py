@@ -0,0 +1,289 @@
+"""
+Audit log partitions and cold archive
+
+On Postgres `audit_logs` is range-partitioned by month on `timestamp`
+(see the 5e1b7c9d3a08 migration): `audit_logs_p202610` holds October 2026,
+and `audit_logs_default` catches anything without a partition.
+Partitions for the current and the next AUDIT_PARTITION_PREMAKE_MONTHS
+months are created ahead of time by `flask audit-partitions` (run on
+container start) and by the daily `flask archive-audit` job
+(k8s/10-audit-maintenance-cronjob.yml). If rows already landed in the
+default partition for a month, they are moved into the new partition.
+
+`flask archive-audit` moves every month older than AUDIT_RETENTION_MONTHS
+to AUDIT_ARCHIVE_DIR as `audit-YYYY-MM.csv.gz` (one file per month,
+fixed columns, `\\N` for NULL, newest row first) and then drops the
+partition, which is a catalog operation rather than a huge DELETE. Other
+databases have no partitions and delete the month's rows instead. The
+file is in place before the rows go, so an interrupted run can at worst
+archive a row twice; readers skip duplicate ids.
+
+`iter_archived()` streams archived rows back, newest first, for
+`GET /api/v1/issues/<id>/audit?archived=true`.
+"""
+import csv
+import glob
+import gzip
+import heapq
+import logging
+import os
+import re
+from datetime import datetime
+import click
+from flask import current_app
+from .extensions import db
+from .models import AuditLog
+from .etags import bump_project_versions
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('id', 'issue_id', 'project_id', 'user_id', 'action', 'old_value', 'new_value', 'timestamp')
+INT_COLUMNS = ('id', 'issue_id', 'project_id', 'user_id')
+NULL = '\\N'
+_ARCHIVE_NAME = re.compile(r'^audit-(\d{4})-(\d{2})(?:\.\d+)?\.csv\.gz$')
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'audit_logs_p{month:%Y%m}'
+
+
+def _is_postgres(connection):
+    return connection.dialect.name == 'postgresql'
+
+
+# Partitions -------------------------------------------------------------
+
+def _partition_exists(connection, month):
+    return connection.execute(
+        db.text('SELECT to_regclass(:name) IS NOT NULL'), {'name': partition_name(month)}
+    ).scalar()
+
+
+def create_partition(connection, month):
+    """
+    Create the partition for `month` unless it exists. Rows that already
+    sit in the default partition for that month are moved into it, since
+    Postgres refuses to attach a range the default partition overlaps.
+    """
+    if _partition_exists(connection, month):
+        return False
+    name, start, end = partition_name(month), month, add_months(month, 1)
+    bounds = {'start': start, 'end': end}
+    connection.execute(db.text(
+        f'CREATE TABLE {name} (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    ))
+    moved = connection.execute(db.text(
+        f'WITH moved AS (DELETE FROM audit_logs_default '
+        f'WHERE timestamp >= :start AND timestamp < :end RETURNING *) '
+        f'INSERT INTO {name} SELECT * FROM moved'
+    ), bounds).rowcount
+    connection.execute(db.text(
+        f"ALTER TABLE audit_logs ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    logger.info('audit.partition.created', extra={'partition': name, 'moved_rows': moved})
+    return True
+
+
+def ensure_partitions(connection, months_ahead, now=None):
+    """Make sure the current month and the next `months_ahead` have partitions"""
+    if not _is_postgres(connection):
+        return []
+    current = month_start(now or datetime.utcnow())
+    months = [add_months(current, offset) for offset in range(months_ahead + 1)]
+    return [month for month in months if create_partition(connection, month)]
+
+
+# Archive ----------------------------------------------------------------
+
+def _archive_path(archive_dir, month):
+    """First free file name for `month`; reruns never overwrite an archive"""
+    base = os.path.join(archive_dir, f'audit-{month:%Y-%m}')
+    path, part = f'{base}.csv.gz', 0
+    while os.path.exists(path):
+        part += 1
+        path = f'{base}.{part}.csv.gz'
+    return path
+
+
+def _encode(value):
+    if value is None:
+        return NULL
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _write_archive(connection, month, path, batch_size):
+    """Write the month's rows to `path` atomically; returns (rows, issue ids)"""
+    table = AuditLog.__table__
+    select = (
+        db.select(*(table.c[column] for column in COLUMNS))
+        .where(table.c.timestamp >= month, table.c.timestamp < add_months(month, 1))
+        .order_by(table.c.timestamp.desc(), table.c.id.desc())
+    )
+    count, issue_ids = 0, set()
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8', newline='') as archive:
+        writer = csv.writer(archive)
+        writer.writerow(COLUMNS)
+        result = connection.execution_options(yield_per=batch_size).execute(select)
+        for row in result:
+            writer.writerow([_encode(value) for value in row])
+            issue_ids.add(row.issue_id)
+            count += 1
+    if not count:
+        os.remove(tmp_path)
+        return 0, issue_ids
+    with open(tmp_path, 'rb') as archive:
+        os.fsync(archive.fileno())
+    os.replace(tmp_path, path)
+    return count, issue_ids
+
+
+def _oldest_month(connection):
+    oldest = connection.execute(db.select(db.func.min(AuditLog.__table__.c.timestamp))).scalar()
+    return month_start(oldest) if oldest else None
+
+
+def archive_month(connection, month, archive_dir, batch_size=5000):
+    """Move one month of audit rows to a file; returns the number of rows archived"""
+    path = _archive_path(archive_dir, month)
+    count, issue_ids = _write_archive(connection, month, path, batch_size)
+
+    if _is_postgres(connection) and _partition_exists(connection, month):
+        name = partition_name(month)
+        connection.execute(db.text(f'ALTER TABLE audit_logs DETACH PARTITION {name}'))
+        connection.execute(db.text(f'DROP TABLE {name}'))
+    table = AuditLog.__table__
+    # Rows in the default partition, or every row when there are no partitions
+    connection.execute(table.delete().where(
+        table.c.timestamp >= month, table.c.timestamp < add_months(month, 1)
+    ))
+    if issue_ids:
+        # Archived rows drop out of the default audit view
+        bump_project_versions(issue_ids=issue_ids, connection=connection)
+    if count:
+        logger.info('audit.archive.written',
+                    extra={'archive': path, 'month': f'{month:%Y-%m}', 'row_count': count})
+    return count
+
+
+def archive_before(cutoff, archive_dir, batch_size=5000):
+    """Archive every whole month that ends on or before `cutoff`, one transaction each"""
+    os.makedirs(archive_dir, exist_ok=True)
+    with db.engine.connect() as connection:
+        month = _oldest_month(connection)
+    archived = {}
+    while month is not None and add_months(month, 1) <= cutoff:
+        with db.engine.begin() as connection:
+            archived[month] = archive_month(connection, month, archive_dir, batch_size)
+        month = add_months(month, 1)
+    return archived
+
+
+# Reading archives --------------------------------------------------------
+
+def _decode(header, row):
+    # Columns are looked up by header name, so files stay readable if COLUMNS grows
+    values = dict(zip(header, row))
+    data = {column: values.get(column, NULL) for column in COLUMNS}
+    data = {column: (None if value == NULL else value) for column, value in data.items()}
+    for column in INT_COLUMNS:
+        if data[column] is not None:
+            data[column] = int(data[column])
+    return data
+
+
+def _archives_by_month(archive_dir):
+    months = {}
+    for path in glob.glob(os.path.join(archive_dir, 'audit-*.csv.gz')):
+        match = _ARCHIVE_NAME.match(os.path.basename(path))
+        if match:
+            month = datetime(int(match.group(1)), int(match.group(2)), 1)
+            months.setdefault(month, []).append(path)
+    return months
+
+
+def _read_archive(path, issue_id, project_id, predicate):
+    """Matching rows of one archive file, in file order (newest first)"""
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as archive:
+        reader = csv.reader(archive)
+        header = next(reader, ())
+        for raw in reader:
+            row = _decode(header, raw)
+            if issue_id is not None and row['issue_id'] != issue_id:
+                continue
+            if project_id is not None and row['project_id'] != project_id:
+                continue
+            if predicate is not None and not predicate(row):
+                continue
+            yield row
+
+
+def iter_archived(issue_id=None, project_id=None, predicate=None, archive_dir=None, since=None, until=None):
+    """
+    Archived audit rows as dicts (the shape of AuditLog.to_dict), newest
+    first, optionally limited to one issue or project and to rows for
+    which `predicate(row)` is true. Months entirely outside [since, until)
+    are never opened, and rows are streamed straight from the files, so
+    a caller that stops reading early never touches older archives.
+    """
+    archive_dir = archive_dir or current_app.config['AUDIT_ARCHIVE_DIR']
+    months = _archives_by_month(archive_dir)
+    for month in sorted(months, reverse=True):
+        if until is not None and month >= until:
+            continue
+        if since is not None and add_months(month, 1) <= since:
+            break  # this and every older month end before `since`
+        files = [_read_archive(path, issue_id, project_id, predicate) for path in months[month]]
+        # A rerun leaves several files for a month; each is newest first already
+        rows = files[0] if len(files) == 1 else heapq.merge(
+            *files, key=lambda row: (row['timestamp'], row['id']), reverse=True
+        )
+        seen = set()
+        for row in rows:
+            if row['id'] not in seen:
+                seen.add(row['id'])
+                yield row
+
+
+# CLI ----------------------------------------------------------------------
+
+@click.command('audit-partitions')
+@click.option('--months-ahead', type=int, default=None, help='Defaults to AUDIT_PARTITION_PREMAKE_MONTHS')
+def audit_partitions_command(months_ahead):
+    """Create the audit_logs partitions for this month and the coming ones."""
+    if months_ahead is None:
+        months_ahead = current_app.config['AUDIT_PARTITION_PREMAKE_MONTHS']
+    with db.engine.begin() as connection:
+        if not _is_postgres(connection):
+            click.echo('audit_logs is not partitioned on this database')
+            return
+        created = ensure_partitions(connection, months_ahead)
+    for month in created:
+        click.echo(f'created {partition_name(month)}')
+    click.echo(f'{len(created)} partitions created')
+
+
+@click.command('archive-audit')
+@click.option('--retention-months', type=int, default=None, help='Defaults to AUDIT_RETENTION_MONTHS')
+def archive_audit_command(retention_months):
+    """Create upcoming partitions, then archive rows older than the retention window."""
+    if retention_months is None:
+        retention_months = current_app.config['AUDIT_RETENTION_MONTHS']
+    with db.engine.begin() as connection:
+        for month in ensure_partitions(connection, current_app.config['AUDIT_PARTITION_PREMAKE_MONTHS']):
+            click.echo(f'created {partition_name(month)}')
+    cutoff = add_months(month_start(datetime.utcnow()), -retention_months)
+    archived = archive_before(cutoff, current_app.config['AUDIT_ARCHIVE_DIR'])
+    for month, count in archived.items():
+        click.echo(f'{month:%Y-%m}: {count} rows')
+    click.echo(f'{sum(archived.values())} rows archived before {cutoff:%Y-%m}')
@@ -0,0 +1,126 @@
+"""
+Audit log filters and paging
+
+The issue and project audit endpoints share these query args:
+
+- `action=status_change,assigned`  one or more actions
+- `user_id=7`                      who made the change
+- `since=2026-10-01T00:00:00`      inclusive lower bound on timestamp
+- `until=2026-10-08T00:00:00`      exclusive upper bound on timestamp
+
+Rows are returned newest first and paged by (timestamp, id) with the
+usual limit/cursor/include_total args. Both scopes, issue_id and
+project_id, have a composite index ending in (timestamp, id). A page is
+therefore one index range scan, with the time range as the bounds of
+the range and the cursor as the seek position; user_id and action are
+filtered within that scan.
+"""
+import logging
+from datetime import datetime
+from itertools import chain
+from flask import g, jsonify, request
+from .models import AuditLog
+from .audit_archive import iter_archived
+from .pagination import InvalidCursor, parse_page_args, paginate_desc, page_envelope
+from .streaming import STREAM_BATCH_SIZE, stream_query, stream_rows, wants_ndjson, wants_stream
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidAuditFilter(ValueError):
+    """Raised for malformed audit filter query args"""
+
+
+def _parse_time(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidAuditFilter(f'{name} must be an ISO 8601 timestamp')
+
+
+def parse_audit_filters(args):
+    """Read action/user_id/since/until from request args into a dict"""
+    actions = [a for a in args.get('action', '').split(',') if a]
+    user_id = args.get('user_id')
+    if user_id is not None:
+        try:
+            user_id = int(user_id)
+        except ValueError:
+            raise InvalidAuditFilter('user_id must be an integer')
+    filters = {
+        'actions': actions,
+        'user_id': user_id,
+        'since': _parse_time(args, 'since'),
+        'until': _parse_time(args, 'until'),
+    }
+    if filters['since'] and filters['until'] and filters['since'] >= filters['until']:
+        raise InvalidAuditFilter('since must be before until')
+    return filters
+
+
+def apply_audit_filters(query, filters):
+    if filters['actions']:
+        query = query.filter(AuditLog.action.in_(filters['actions']))
+    if filters['user_id'] is not None:
+        query = query.filter(AuditLog.user_id == filters['user_id'])
+    if filters['since']:
+        query = query.filter(AuditLog.timestamp >= filters['since'])
+    if filters['until']:
+        query = query.filter(AuditLog.timestamp < filters['until'])
+    return query
+
+
+def matches_audit_filters(row, filters):
+    """The same filters for archived rows (dicts from audit_archive.iter_archived)"""
+    if filters['actions'] and row['action'] not in filters['actions']:
+        return False
+    if filters['user_id'] is not None and row['user_id'] != filters['user_id']:
+        return False
+    if filters['since'] or filters['until']:
+        timestamp = datetime.fromisoformat(row['timestamp'])
+        if filters['since'] and timestamp < filters['since']:
+            return False
+        if filters['until'] and timestamp >= filters['until']:
+            return False
+    return True
+
+
+def audit_listing(scope, log_event, log_extra):
+    """
+    Response for an audit endpoint scoped by `scope` (issue_id= or
+    project_id=). Keyset pages by default; `?stream=true` / NDJSON stream
+    every match (exports), and `?archived=true` streams the archived
+    months after the live rows.
+    """
+    try:
+        filters = parse_audit_filters(request.args)
+    except InvalidAuditFilter as e:
+        return jsonify({'error': str(e)}), 400
+    query = apply_audit_filters(AuditLog.query.filter_by(**scope), filters)
+    log_extra = dict(log_extra, request_id=getattr(g, 'request_id', None),
+                     actions=','.join(filters['actions']) or None, filter_user_id=filters['user_id'],
+                     since=request.args.get('since'), until=request.args.get('until'))
+
+    archived = request.args.get('archived', '').lower() in ('1', 'true', 'yes')
+    if archived or wants_stream():
+        logger.info(f'{log_event}.stream', extra=dict(log_extra, ndjson=wants_ndjson(), archived=archived))
+        query = query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+        if not archived:
+            return stream_query(query, lambda log: log.to_dict())
+        older = iter_archived(predicate=lambda row: matches_audit_filters(row, filters),
+                              since=filters['since'], until=filters['until'], **scope)
+        rows = chain(query.yield_per(STREAM_BATCH_SIZE), older)
+        return stream_rows(rows, lambda row: row if isinstance(row, dict) else row.to_dict())
+
+    try:
+        limit, cursor, include_total = parse_page_args(request.args)
+        logs, next_cursor, total = paginate_desc(
+            query, AuditLog.timestamp, AuditLog.id, limit, cursor, include_total
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    logger.info(log_event, extra=dict(log_extra, result_count=len(logs)))
+    return jsonify(page_envelope([log.to_dict() for log in logs], next_cursor, total))
@@ -1,9 +1,26 @@
 import jwt
+import hashlib
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, current_app
+from prometheus_client import Counter
+from .cache import TTLCache
 from .models import User
 
+# Verified tokens, keyed by SHA-256 of the raw token. Only successful
+# verifications are cached, and never past the token's own `exp`.
+token_cache = TTLCache()
+
+TOKEN_CACHE_LOOKUPS = Counter(
+    'auth_token_cache_lookups_total',
+    'JWT verifications served from the verified-token cache (hit) or by jwt.decode (miss)',
+    ['result']
+)
+
+
+def init_token_cache(app):
+    token_cache.configure(app.config['AUTH_TOKEN_CACHE_SIZE'], app.config['AUTH_TOKEN_CACHE_TTL'])
+
 
 def generate_token(user_id, email, role):
     """Generate JWT token"""
@@ -28,6 +45,21 @@ def decode_token(token):
         return None
 
 
+def decode_token_cached(token):
+    """decode_token, skipping the HS256 verify for tokens seen recently"""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        TOKEN_CACHE_LOOKUPS.labels('hit').inc()
+        return payload
+    
+    TOKEN_CACHE_LOOKUPS.labels('miss').inc()
+    payload = decode_token(token)
+    if payload is not None:
+        token_cache.set(key, payload, expires_at=payload.get('exp'))
+    return payload
+
+
 def get_current_user():
     """Extract current user from Authorization header"""
     auth_header = request.headers.get('Authorization')
@@ -38,7 +70,7 @@ def get_current_user():
     try:
         # Format: "Bearer <token>"
         token = auth_header.split(' ')[1]
-        payload = decode_token(token)
+        payload = decode_token_cached(token)
         
         if not payload:
             return None
@@ -88,6 +120,5 @@ def require_admin(f):
 
 def check_project_membership(user_id, project):
     """Check if user is a member of the project"""
-    from .models import User
-    user = User.query.get(user_id)
-    return user in project.members or project.owner_id == user_id
\ No newline at end of file
+    from .membership import is_member
+    return is_member(project.id, user_id, owner_id=project.owner_id)
\ No newline at end of file
@@ -11,6 +11,22 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool (see app/pool.py); ignored for SQLite
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'false').lower() in ('1', 'true', 'yes')
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '15000'))  # 0 disables
+    
+    # Read replicas (see app/replicas.py); comma-separated, empty disables routing
+    SQLALCHEMY_REPLICA_URIS = [u for u in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if u]
+    REPLICA_BLUEPRINTS = ('issues', 'projects', 'users')
+    REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', '5'))
+    REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '5'))
+    READ_YOUR_WRITES_WINDOW = float(os.getenv('READ_YOUR_WRITES_WINDOW', '5'))
+    
     # Security
     SECRET_KEY = os.getenv('SECRET_KEY')
     
@@ -18,4 +34,47 @@ class Config:
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
     
     # API
-    API_VERSION = 'v1'
\ No newline at end of file
+    API_VERSION = 'v1'
+    
+    # Logging (see app/logs.py); queue size 0 writes synchronously
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')  # e.g. issues.list=0.01,request.completed=0.1
+    
+    # Per-request query metrics (see app/querymetrics.py)
+    SERVER_TIMING = os.getenv('SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes')
+    
+    # SQL capture for dev/staging/tests (see app/querywatch.py); off in production
+    QUERY_WATCH = os.getenv('QUERY_WATCH', 'false').lower() in ('1', 'true', 'yes')
+    QUERY_WATCH_STRICT = os.getenv('QUERY_WATCH_STRICT', 'false').lower() in ('1', 'true', 'yes')
+    QUERY_WATCH_SLOW_MS = float(os.getenv('QUERY_WATCH_SLOW_MS', '100'))
+    QUERY_WATCH_REPEAT_THRESHOLD = int(os.getenv('QUERY_WATCH_REPEAT_THRESHOLD', '3'))
+    
+    # On-demand request profiling (see app/profiling.py); off adds no hooks
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))  # fraction of requests, besides X-Profile
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', '/var/lib/minijira/profiles')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '200'))
+    
+    # Membership cache (see app/membership.py)
+    MEMBERSHIP_CACHE_SIZE = int(os.getenv('MEMBERSHIP_CACHE_SIZE', '10000'))
+    MEMBERSHIP_CACHE_TTL = float(os.getenv('MEMBERSHIP_CACHE_TTL', '60'))
+    
+    # Verified JWT cache (see app/auth.py); size 0 disables it
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', '10000'))
+    AUTH_TOKEN_CACHE_TTL = float(os.getenv('AUTH_TOKEN_CACHE_TTL', '300'))
+    
+    # Audit log writes (see app/audit.py): sync = in the request transaction
+    AUDIT_MODE = os.getenv('AUDIT_MODE', 'sync')
+    AUDIT_QUEUE_SIZE = int(os.getenv('AUDIT_QUEUE_SIZE', '10000'))
+    AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '500'))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv('AUDIT_FLUSH_INTERVAL', '1'))
+    AUDIT_ENQUEUE_TIMEOUT = float(os.getenv('AUDIT_ENQUEUE_TIMEOUT', '0.05'))
+    # Must survive restarts: replay on startup only helps if the spool is still there
+    AUDIT_SPOOL_DIR = os.getenv('AUDIT_SPOOL_DIR', '/var/lib/minijira/audit-spool')
+    AUDIT_SPOOL_FSYNC = os.getenv('AUDIT_SPOOL_FSYNC', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Audit log partitions and cold archive (see app/audit_archive.py)
+    AUDIT_PARTITION_PREMAKE_MONTHS = int(os.getenv('AUDIT_PARTITION_PREMAKE_MONTHS', '3'))
+    AUDIT_RETENTION_MONTHS = int(os.getenv('AUDIT_RETENTION_MONTHS', '12'))
+    AUDIT_ARCHIVE_DIR = os.getenv('AUDIT_ARCHIVE_DIR', '/var/lib/minijira/audit-archive')
@@ -0,0 +1,140 @@
+"""
+ETags and conditional GET
+
+Every project carries a `version` counter that is bumped in the same
+transaction as any change that can alter what its reads return: issues,
+comments, audit rows, membership and the project itself. Read endpoints
+derive a strong ETag from that counter, so `If-None-Match` is answered
+with a single primary-key lookup and a 304, without loading any rows.
+The lookup also checks membership, so only readers get a 304.
+"""
+import hashlib
+from functools import wraps
+from flask import Response, make_response, request
+from sqlalchemy import event
+from .extensions import db
+from .models import Project, Issue, Comment, AuditLog, User, project_members
+from .membership import is_member
+
+_PENDING_KEY = 'etags.pending_bumps'
+
+
+def bump_project_versions(project_ids=(), issue_ids=(), user_ids=(), connection=None):
+    """
+    Increment the version of every project touched by the given ids.
+    Issues and users are resolved to their projects in SQL.
+    """
+    conditions = []
+    if project_ids:
+        conditions.append(Project.id.in_(set(project_ids)))
+    if issue_ids:
+        conditions.append(Project.id.in_(
+            db.select(Issue.project_id).where(Issue.id.in_(set(issue_ids)))
+        ))
+    if user_ids:
+        conditions.append(Project.id.in_(
+            db.select(project_members.c.project_id).where(project_members.c.user_id.in_(set(user_ids)))
+        ))
+    if not conditions:
+        return
+    statement = (
+        db.update(Project.__table__)
+        .where(db.or_(*conditions))
+        .values(version=Project.__table__.c.version + 1)
+    )
+    (connection or db.session.connection()).execute(statement)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_version_bumps(session, flush_context, instances):
+    pending = session.info.setdefault(_PENDING_KEY, {'project_ids': set(), 'issue_ids': set(), 'user_ids': set()})
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Issue) and obj.project_id is not None:
+            pending['project_ids'].add(obj.project_id)
+        elif isinstance(obj, (Comment, AuditLog)) and obj.issue_id is not None:
+            pending['issue_ids'].add(obj.issue_id)
+        elif isinstance(obj, Project) and obj.id is not None:
+            pending['project_ids'].add(obj.id)
+        elif isinstance(obj, User) and obj.id is not None and obj not in session.new:
+            # Email changes and deletions show up in member lists and comments
+            pending['user_ids'].add(obj.id)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _apply_version_bumps(session, flush_context):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        bump_project_versions(connection=session.connection(), **pending)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_version_bumps(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _readable_version(row):
+    """
+    The version, only if the current user may read the project. Otherwise
+    None, so the view runs and answers with its own 404 or 403 instead of a
+    304 that would confirm the resource exists and is unchanged.
+    """
+    if row is None or row.is_deleted:
+        return None
+    if not is_member(row.id, request.current_user['user_id'], owner_id=row.owner_id):
+        return None
+    return row.version
+
+
+def project_version(project_id):
+    return _readable_version(
+        db.session.query(Project.version, Project.id, Project.owner_id, Project.is_deleted)
+        .filter(Project.id == project_id)
+        .first()
+    )
+
+
+def issue_project_version(issue_id):
+    return _readable_version(
+        db.session.query(Project.version, Project.id, Project.owner_id,
+                         db.or_(Project.is_deleted, Issue.is_deleted).label('is_deleted'))
+        .join(Issue, Issue.project_id == Project.id)
+        .filter(Issue.id == issue_id)
+        .first()
+    )
+
+
+def make_etag(*parts):
+    """Strong validator over the request representation and the data version"""
+    raw = '|'.join(str(p) for p in (request.path, request.query_string.decode(),
+                                     request.headers.get('Accept', ''), *parts))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def conditional_get(version_of):
+    """
+    Decorator for read endpoints, below require_auth. `version_of(**view_args)`
+    returns the data version for the request, or None when no cheap
+    validator exists or the user may not read the data (the view then runs
+    normally without an ETag).
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            version = version_of(**kwargs)
+            if version is None:
+                return f(*args, **kwargs)
+
+            etag = make_etag(version)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,144 @@
+"""
+Structured logging off the request thread
+
+Request threads only decide whether to keep a record and put it on a
+bounded queue. A `QueueListener` thread does the JSON formatting and the
+stdout writes. When the queue is full, the record is dropped and counted
+rather than blocking the request.
+
+Sampling is per event name (the log message, e.g. `issues.list`):
+
+    LOG_SAMPLE_RATES="issues.list=0.01,request.completed=0.1"
+
+keeps 1% of `issues.list` and 10% of `request.completed`. Events without
+a rate, and every WARNING or above, are always kept. Records are passed
+to the listener unformatted, so `extra` values must not be mutated after
+the call to the logger (ours are scalars).
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from prometheus_client import Counter
+from pythonjsonlogger import jsonlogger
+
+LOG_RECORDS = Counter(
+    'log_records_total',
+    'Log records by what happened to them on the request thread',
+    ['outcome']  # queued, sampled_out, dropped
+)
+
+
+def parse_sample_rates(spec):
+    """'issues.list=0.01,request.completed=0.1' -> {'issues.list': 0.01, ...}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        event, _, rate = item.partition('=')
+        rate = float(rate)
+        if not 0 <= rate <= 1:
+            raise RuntimeError(f'LOG_SAMPLE_RATES: rate for {event} must be in [0, 1]')
+        rates[event] = rate
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of INFO/DEBUG records per event name"""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.msg)
+        if rate is None or rate >= 1 or random.random() < rate:
+            return True
+        LOG_RECORDS.labels('sampled_out').inc()
+        return False
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Non-blocking QueueHandler with its listener thread. The listener is
+    (re)started in whichever process first logs, because threads do not
+    survive gunicorn's fork of a preloaded app.
+    """
+
+    def __init__(self, maxsize, *handlers):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.handlers = handlers
+        self.listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.Queue(maxsize=self.queue.maxsize)  # the parent's may hold a lock
+            self.listener = QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Formatting happens in the listener thread; the stock prepare() formats here
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS.labels('dropped').inc()
+        else:
+            LOG_RECORDS.labels('queued').inc()
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def stop(self):
+        """Write everything queued so far and stop the listener"""
+        with self._start_lock:
+            if self.listener is not None and self._pid == os.getpid():
+                self.listener.stop()
+            self.listener = self._pid = None
+
+
+_handler = None
+
+
+def configure_logging(app):
+    """Route app (and app.*) loggers through the queue; replaces any previous pipeline"""
+    global _handler
+    if _handler is not None:
+        _handler.stop()
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(jsonlogger.JsonFormatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+    if app.config['LOG_QUEUE_SIZE'] > 0:
+        _handler = BoundedQueueHandler(app.config['LOG_QUEUE_SIZE'], stream)
+        handler = _handler
+    else:
+        _handler, handler = None, stream  # synchronous, e.g. for debugging
+    handler.addFilter(SamplingFilter(parse_sample_rates(app.config['LOG_SAMPLE_RATES'])))
+
+    app.logger.handlers.clear()
+    app.logger.addHandler(handler)
+    app.logger.setLevel(logging.INFO)
+    app.logger.propagate = False
+
+
+def flush_logs():
+    """Drain the queue (tests, benchmarks, interpreter exit)"""
+    if _handler is not None:
+        _handler.stop()
+
+
+atexit.register(flush_logs)
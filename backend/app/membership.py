@@ -0,0 +1,82 @@
+"""
+Project membership checks
+
+"Is user U a member (or the owner) of project P?" is asked on almost
+every request. It is answered with one indexed EXISTS query, memoized
+for the rest of the request, and cached process-wide in a small
+LRU keyed by (project_id, user_id). The query always runs on the
+primary: a lagging replica would keep granting a removed member access,
+and would put that stale answer in the LRU. Writes that change membership call
+`invalidate()`. Entries also expire after a TTL, which bounds staleness
+in the other worker processes that did not see the write.
+"""
+from flask import g, has_request_context
+from prometheus_client import Counter
+from .cache import TTLCache
+from .extensions import db
+from .models import Project, project_members
+
+CACHE_LOOKUPS = Counter(
+    'membership_cache_lookups_total',
+    'Project membership lookups by the layer that answered them',
+    ['result']  # request_hit, hit, miss
+)
+
+
+cache = TTLCache()
+
+
+def init_app(app):
+    cache.configure(app.config['MEMBERSHIP_CACHE_SIZE'], app.config['MEMBERSHIP_CACHE_TTL'])
+
+
+def _query_membership(project_id, user_id):
+    member = db.exists().where(
+        project_members.c.project_id == project_id,
+        project_members.c.user_id == user_id
+    )
+    owner = db.exists().where(Project.id == project_id, Project.owner_id == user_id)
+    # session.connection() is bound to the primary (see app/replicas.py)
+    return bool(db.session.connection().execute(db.select(db.or_(member, owner))).scalar())
+
+
+def is_member(project_id, user_id, owner_id=None):
+    """True if the user is a member or the owner of the project"""
+    if owner_id is not None and owner_id == user_id:
+        return True
+
+    key = (project_id, user_id)
+    memo = None
+    if has_request_context():
+        memo = g.setdefault('membership_memo', {})
+        if key in memo:
+            CACHE_LOOKUPS.labels('request_hit').inc()
+            return memo[key]
+
+    result = cache.get(key)
+    if result is None:
+        CACHE_LOOKUPS.labels('miss').inc()
+        result = _query_membership(project_id, user_id)
+        cache.set(key, result)
+    else:
+        CACHE_LOOKUPS.labels('hit').inc()
+
+    if memo is not None:
+        memo[key] = result
+    return result
+
+
+def _matches(project_id, user_id):
+    return lambda key: ((project_id is None or key[0] == project_id)
+                        and (user_id is None or key[1] == user_id))
+
+
+def invalidate(project_id=None, user_id=None):
+    """Forget cached answers after a membership, project or user change"""
+    matches = _matches(project_id, user_id)
+    cache.invalidate(matches)
+    if has_request_context():
+        memo = g.get('membership_memo')
+        if memo:
+            for key in [k for k in memo if matches(k)]:
+                del memo[key]
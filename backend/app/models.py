@@ -1,11 +1,14 @@
 from datetime import datetime
+from sqlalchemy.orm import joinedload, selectinload
 from .extensions import db
 
 # Association table for project members (many-to-many)
 project_members = db.Table('project_members',
     db.Column('project_id', db.Integer, db.ForeignKey('projects.id'), primary_key=True),
     db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
-    db.Column('joined_at', db.DateTime, default=datetime.utcnow)
+    db.Column('joined_at', db.DateTime, default=datetime.utcnow),
+    # PK is (project_id, user_id); "projects of user X" needs the reverse order
+    db.Index('ix_project_members_user_id', 'user_id', 'project_id')
 )
 
 
@@ -42,12 +45,57 @@ class Project(db.Model):
     owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_deleted = db.Column(db.Boolean, default=False)  # Soft delete
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped on any change, see etags.py
+    
+    __table_args__ = (
+        db.Index('ix_projects_owner_id_active', owner_id,
+                 postgresql_where=(is_deleted == False), sqlite_where=(is_deleted == False)),
+    )
     
     # Relationships
     owner = db.relationship('User', back_populates='owned_projects', foreign_keys=[owner_id])
     members = db.relationship('User', secondary=project_members, back_populates='member_of_projects')
     issues = db.relationship('Issue', back_populates='project', cascade='all, delete-orphan')
     
+    @classmethod
+    def sparse_fields(cls):
+        """Columns selectable with ?fields= (keys match to_dict)"""
+        return {
+            'id': cls.id,
+            'name': cls.name,
+            'description': cls.description,
+            'owner_id': cls.owner_id,
+            'created_at': cls.created_at,
+            'is_deleted': cls.is_deleted,
+            **cls.count_columns()
+        }
+    
+    @classmethod
+    def count_columns(cls):
+        """
+        Per-project counts as correlated scalar subqueries, each a single
+        index range read: members from the project_members primary key,
+        open issues from the project_issue_stats summary table
+        """
+        member_count = (
+            db.select(db.func.count())
+            .where(project_members.c.project_id == cls.id)
+            .scalar_subquery()
+        )
+        open_issue_count = (
+            db.select(db.func.coalesce(db.func.sum(ProjectIssueStat.count), 0))
+            .where(ProjectIssueStat.project_id == cls.id,
+                   ProjectIssueStat.dimension == 'status',
+                   ProjectIssueStat.value != 'DONE')
+            .scalar_subquery()
+        )
+        return {'member_count': member_count, 'open_issue_count': open_issue_count}
+    
+    @classmethod
+    def load_options(cls, include_members=False):
+        """Eager loads that let to_dict(**same kwargs) run without lazy loads"""
+        return [selectinload(cls.members)] if include_members else []
+    
     def to_dict(self, include_members=False):
         data = {
             'id': self.id,
@@ -77,6 +125,18 @@ class Issue(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_deleted = db.Column(db.Boolean, default=False)  # Soft delete
     
+    # Partial indexes matching list_issues: only live rows, newest first
+    __table_args__ = (
+        db.Index('ix_issues_active_created', created_at, id,
+                 postgresql_where=(is_deleted == False), sqlite_where=(is_deleted == False)),
+        db.Index('ix_issues_project_active_created', project_id, created_at, id,
+                 postgresql_where=(is_deleted == False), sqlite_where=(is_deleted == False)),
+        db.Index('ix_issues_project_status_active_created', project_id, status, created_at, id,
+                 postgresql_where=(is_deleted == False), sqlite_where=(is_deleted == False)),
+        db.Index('ix_issues_assignee_active_created', assignee_id, created_at, id,
+                 postgresql_where=(is_deleted == False), sqlite_where=(is_deleted == False)),
+    )
+    
     # Relationships
     project = db.relationship('Project', back_populates='issues')
     assignee = db.relationship('User', back_populates='assigned_issues', foreign_keys=[assignee_id])
@@ -84,7 +144,24 @@ class Issue(db.Model):
     comments = db.relationship('Comment', back_populates='issue', cascade='all, delete-orphan')
     audit_logs = db.relationship('AuditLog', back_populates='issue', cascade='all, delete-orphan')
     
-    def to_dict(self, include_comments=False):
+    @classmethod
+    def sparse_fields(cls):
+        """Columns selectable with ?fields= (keys match to_dict)"""
+        return {
+            'id': cls.id,
+            'title': cls.title,
+            'description': cls.description,
+            'status': cls.status,
+            'priority': cls.priority,
+            'project_id': cls.project_id,
+            'assignee_id': cls.assignee_id,
+            'reporter_id': cls.reporter_id,
+            'created_at': cls.created_at,
+            'updated_at': cls.updated_at,
+            'is_deleted': cls.is_deleted
+        }
+    
+    def to_dict(self, comments=None):
         data = {
             'id': self.id,
             'title': self.title,
@@ -98,8 +175,9 @@ class Issue(db.Model):
             'updated_at': self.updated_at.isoformat(),
             'is_deleted': self.is_deleted
         }
-        if include_comments:
-            data['comments'] = [c.to_dict() for c in self.comments if not c.is_deleted]
+        if comments is not None:
+            # A page loaded by the caller; never the whole (unbounded) relationship
+            data['comments'] = [c.to_dict() for c in comments]
         return data
 
 
@@ -113,10 +191,32 @@ class Comment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_deleted = db.Column(db.Boolean, default=False)  # Soft delete
     
+    __table_args__ = (
+        db.Index('ix_comments_issue_created', issue_id, created_at, id),
+    )
+    
     # Relationships
     issue = db.relationship('Issue', back_populates='comments')
     author = db.relationship('User', back_populates='comments')
     
+    @classmethod
+    def sparse_fields(cls):
+        """Columns selectable with ?fields= (keys match to_dict)"""
+        return {
+            'id': cls.id,
+            'content': cls.content,
+            'issue_id': cls.issue_id,
+            'author_id': cls.author_id,
+            'author_email': db.select(User.email).where(User.id == cls.author_id).scalar_subquery(),
+            'created_at': cls.created_at,
+            'is_deleted': cls.is_deleted
+        }
+    
+    @classmethod
+    def load_options(cls):
+        """Eager loads that let to_dict() run without lazy loads"""
+        return [joinedload(cls.author)]
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -129,16 +229,34 @@ class Comment(db.Model):
         }
 
 
+class ProjectIssueStat(db.Model):
+    """Live issue counts per project, kept current by stats.py"""
+    __tablename__ = 'project_issue_stats'
+    
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), primary_key=True)
+    dimension = db.Column(db.String(20), primary_key=True)  # status, priority, assignee
+    value = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
     
     id = db.Column(db.Integer, primary_key=True)
     issue_id = db.Column(db.Integer, db.ForeignKey('issues.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)  # copied from the issue
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     action = db.Column(db.String(50), nullable=False)  # e.g., 'status_change', 'assigned', 'created'
     old_value = db.Column(db.String(255))
     new_value = db.Column(db.String(255))
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Partition key on Postgres, where the primary key is (id, timestamp); see audit_archive.py
+    timestamp = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    # Newest-first keyset pages per scope, see audit_query.py
+    __table_args__ = (
+        db.Index('ix_audit_logs_issue_timestamp', issue_id, timestamp, id),
+        db.Index('ix_audit_logs_project_timestamp', project_id, timestamp, id),
+    )
     
     issue = db.relationship('Issue', back_populates='audit_logs')
     user = db.relationship('User')
@@ -147,6 +265,7 @@ class AuditLog(db.Model):
         return {
             'id': self.id,
             'issue_id': self.issue_id,
+            'project_id': self.project_id,
             'user_id': self.user_id,
             'action': self.action,
             'old_value': self.old_value,
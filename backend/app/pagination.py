@@ -0,0 +1,113 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+import base64
+import json
+from datetime import datetime
+from .extensions import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def encode_cursor(sort_key, sort_value, row_id):
+    """
+    Encode a sort position, e.g. ('created_at', created_at, id), as an opaque url-safe token
+    The sort key travels with the position so a cursor cannot be replayed
+    against a listing ordered by something else
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps({'k': sort_key, 'v': [sort_value, row_id]})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a token produced by encode_cursor back into (sort_key, sort_value, row_id)"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(data, dict) or not isinstance(data.get('k'), str):
+            raise ValueError(token)
+        values = data.get('v')
+        if not isinstance(values, list) or len(values) != 2:
+            raise ValueError(token)
+        sort_value, row_id = values
+        if isinstance(sort_value, str):
+            sort_value = datetime.fromisoformat(sort_value)
+        elif isinstance(sort_value, bool) or not isinstance(sort_value, (int, float)):
+            raise ValueError(token)
+        if isinstance(row_id, bool) or not isinstance(row_id, int):
+            raise ValueError(token)
+        return data['k'], sort_value, row_id
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def parse_page_args(args):
+    """
+    Read limit/cursor/include_total from request args
+    Returns (limit, cursor, include_total); cursor is None on the first page
+    """
+    limit = args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    token = args.get('cursor')
+    cursor = decode_cursor(token) if token else None
+    include_total = args.get('include_total', '').lower() in ('1', 'true', 'yes')
+    return limit, cursor, include_total
+
+
+def page_query(query, sort_col, id_col, limit, position=None):
+    """The query paginate_desc runs for one page: limit + 1 rows after `position`"""
+    if position is not None:
+        query = query.filter(db.tuple_(sort_col, id_col) < db.tuple_(*position))
+    return query.order_by(sort_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def _cursor_position(cursor, sort_key, sort_col):
+    """The (sort_value, id) of a decoded cursor, if it was issued for this ordering"""
+    cursor_key, sort_value, row_id = cursor
+    if cursor_key != sort_key:
+        raise InvalidCursor('Invalid cursor')
+    if isinstance(sort_value, datetime) != isinstance(sort_col.type, db.DateTime):
+        raise InvalidCursor('Invalid cursor')
+    return sort_value, row_id
+
+
+def paginate_desc(query, sort_col, id_col, limit, cursor=None, include_total=False, row_key=None,
+                  sort_key=None):
+    """
+    Descending keyset page over (sort_col, id_col).
+
+    The row-value comparison lets the database seek straight into a
+    (sort_col, id) index, so page N costs the same as page 1.
+    `row_key(row)` returns the cursor position of a row; by default it
+    reads the two columns as attributes of the row.
+    `sort_key` names the ordering in the cursor (defaults to sort_col.key);
+    a cursor issued for another ordering raises InvalidCursor.
+    Returns (rows, next_cursor, total); total is None unless requested.
+    """
+    sort_key = sort_key or sort_col.key
+    position = _cursor_position(cursor, sort_key, sort_col) if cursor is not None else None
+    total = query.order_by(None).count() if include_total else None
+    rows = page_query(query, sort_col, id_col, limit, position).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if row_key is None:
+            row_key = lambda row: (getattr(row, sort_col.key), getattr(row, id_col.key))
+        next_cursor = encode_cursor(sort_key, *row_key(rows[-1]))
+    return rows, next_cursor, total
+
+
+def page_envelope(items, next_cursor, total=None):
+    """Standard response body for paginated list endpoints"""
+    data = {'items': items, 'next_cursor': next_cursor}
+    if total is not None:
+        data['total'] = total
+    return data
@@ -0,0 +1,147 @@
+"""
+Database connection pool settings and telemetry
+
+Pool sizing comes from the environment (DB_POOL_*), so each deployment
+can budget `replicas x workers x (pool_size + max_overflow)` against the
+Postgres connection limit. With DB_PGBOUNCER=true the app keeps no pool
+of its own (PgBouncer in transaction mode is the pool) and sets no
+session-level state on connections.
+
+Every transaction opened while serving a request runs under
+`SET LOCAL statement_timeout`, which is transaction-scoped and therefore
+also safe behind PgBouncer.
+
+Pool activity is exported to Prometheus from SQLAlchemy pool events.
+"""
+import time
+from flask import current_app, has_request_context
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import NullPool, QueuePool
+
+POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out',
+    'Connections currently checked out of the pool',
+    ['engine']
+)
+POOL_OVERFLOW = Gauge(
+    'db_pool_overflow',
+    'Connections open beyond pool_size (negative while the pool is still filling)',
+    ['engine']
+)
+POOL_CHECKOUTS = Counter(
+    'db_pool_checkouts_total',
+    'Connection checkouts',
+    ['engine']
+)
+POOL_TIMEOUTS = Counter(
+    'db_pool_checkout_timeouts_total',
+    'Checkouts that gave up after pool_timeout',
+    ['engine']
+)
+POOL_CONNECTS = Counter(
+    'db_pool_connects_total',
+    'New DBAPI connections opened',
+    ['engine']
+)
+POOL_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds',
+    'Time spent waiting for a pooled connection',
+    ['engine'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+POOL_HOLD = Histogram(
+    'db_pool_connection_hold_seconds',
+    'Time a connection stays checked out',
+    ['engine'],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30, 120)
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait (there is no event for it)"""
+
+    metrics_name = 'default'
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeout:
+            POOL_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            POOL_WAIT.labels(self.metrics_name).observe(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def engine_options(config, url):
+    """SQLALCHEMY_ENGINE_OPTIONS for `url`; SQLite keeps Flask-SQLAlchemy's defaults"""
+    if not url or make_url(url).get_backend_name() == 'sqlite':
+        return {}
+    if config['DB_PGBOUNCER']:
+        options = {'poolclass': NullPool}
+        if make_url(url).get_driver_name() == 'psycopg':
+            # Server-side prepared statements do not survive transaction pooling
+            options['connect_args'] = {'prepare_threshold': None}
+        return options
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def instrument(engine, name):
+    """Export pool metrics for `engine` under the label `name`"""
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics_name = name
+
+    def update_gauges(returning=0):
+        pool = engine.pool  # dispose() swaps in a new pool, events carry over
+        if isinstance(pool, QueuePool):
+            # checkin fires before the connection is back in the queue
+            POOL_CHECKED_OUT.labels(name).set(pool.checkedout() - returning)
+            POOL_OVERFLOW.labels(name).set(pool.overflow())
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTS.labels(name).inc()
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        POOL_CHECKOUTS.labels(name).inc()
+        update_gauges()
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop('checked_out_at', None)
+        if started is not None:
+            POOL_HOLD.labels(name).observe(time.perf_counter() - started)
+        update_gauges(returning=1)
+
+
+def _set_statement_timeout(session, transaction, connection):
+    timeout = current_app.config['DB_STATEMENT_TIMEOUT_MS'] if has_request_context() else 0
+    if timeout and connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(timeout)}')
+
+
+def init_app(app, db):
+    with app.app_context():
+        instrument(db.engine, 'primary')
+    replicas = app.extensions.get('replicas')
+    for replica in (replicas.replicas if replicas else ()):
+        instrument(replica.engine, replica.name)
+    if not event.contains(db.session, 'after_begin', _set_statement_timeout):
+        event.listen(db.session, 'after_begin', _set_statement_timeout)
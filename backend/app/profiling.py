@@ -0,0 +1,214 @@
+"""
+On-demand request profiling
+
+With PROFILING_ENABLED=true a request is profiled when either:
+
+- an admin sends `X-Profile: 1` (the same admin check as require_admin)
+- it is picked by PROFILE_SAMPLE_RATE (a fraction of all requests)
+
+A sampling profiler thread reads the request thread's stack every
+PROFILE_INTERVAL_MS while the view runs. The result is written to
+PROFILE_DIR as a speedscope file (open it at https://www.speedscope.app)
+and as collapsed stacks (`a;b;c 12` per line, for flamegraph.pl and
+similar tools). Admins list and download profiles under
+/api/v1/admin/profiles. Only the newest PROFILE_MAX_FILES profiles are
+kept.
+
+When PROFILING_ENABLED is false, no hooks are registered and requests
+pay nothing. Under gevent the sampler is a greenlet and only gets to run
+when the request yields, so profiles of CPU-bound code come out empty;
+use a gthread or sync worker to profile those.
+"""
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app, g, request
+from .auth import get_current_user
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID = re.compile(r'^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$')
+FORMATS = {
+    'speedscope': ('speedscope.json', 'application/json'),
+    'collapsed': ('collapsed.txt', 'text/plain'),
+}
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval from a helper thread"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+
+def _frame_label(frame):
+    name, filename, line = frame
+    return f'{name} ({os.path.basename(filename)}:{line})'
+
+
+def collapsed(stacks):
+    """Brendan Gregg's folded format, hottest stack first"""
+    return ''.join(
+        ';'.join(_frame_label(frame) for frame in stack) + f' {count}\n'
+        for stack, count in stacks.most_common()
+    )
+
+
+def speedscope(stacks, interval, name):
+    frames, index = [], {}
+    samples, weights = [], []
+    for stack, count in stacks.most_common():
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+        samples.append([index[frame] for frame in stack])
+        weights.append(count * interval)
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'seconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+        'exporter': 'minijira',
+    }
+
+
+def profile_path(profile_id, suffix):
+    return os.path.join(current_app.config['PROFILE_DIR'], f'{profile_id}.{suffix}')
+
+
+def list_profiles():
+    """Metadata of stored profiles, newest first"""
+    directory = current_app.config['PROFILE_DIR']
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in sorted(os.listdir(directory), reverse=True):
+        if entry.endswith('.meta.json'):
+            with open(os.path.join(directory, entry), encoding='utf-8') as meta:
+                profiles.append(json.load(meta))
+    return profiles
+
+
+def _prune(directory, keep):
+    ids = sorted({entry.split('.', 1)[0] for entry in os.listdir(directory) if PROFILE_ID.match(entry.split('.', 1)[0])})
+    for profile_id in ids[:-keep] if keep else ids:
+        for suffix in ('meta.json', *(suffix for suffix, _ in FORMATS.values())):
+            try:
+                os.remove(os.path.join(directory, f'{profile_id}.{suffix}'))
+            except FileNotFoundError:
+                pass
+
+
+def _save(sampler, trigger):
+    directory = current_app.config['PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f'{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.urandom(4).hex()}'
+    name = f'{request.method} {request.path}'
+    meta = {
+        'id': profile_id,
+        'endpoint': request.endpoint,
+        'method': request.method,
+        'path': request.path,
+        'request_id': getattr(g, 'request_id', None),
+        'trigger': trigger,
+        'duration_ms': round(sampler.duration * 1000, 2),
+        'samples': sum(sampler.stacks.values()),
+        'created_at': datetime.utcnow().isoformat(),
+    }
+    with open(profile_path(profile_id, 'speedscope.json'), 'w', encoding='utf-8') as out:
+        json.dump(speedscope(sampler.stacks, sampler.interval, name), out)
+    with open(profile_path(profile_id, 'collapsed.txt'), 'w', encoding='utf-8') as out:
+        out.write(collapsed(sampler.stacks))
+    # Written last: list_profiles only sees complete profiles
+    with open(profile_path(profile_id, 'meta.json'), 'w', encoding='utf-8') as out:
+        json.dump(meta, out)
+    _prune(directory, current_app.config['PROFILE_MAX_FILES'])
+    logger.info(
+        'profiling.saved',
+        extra={
+            'request_id': meta['request_id'],
+            'profile_id': profile_id,
+            'endpoint': meta['endpoint'],
+            'trigger': trigger,
+            'duration_ms': meta['duration_ms'],
+            'samples': meta['samples']
+        }
+    )
+
+
+def _trigger():
+    if request.headers.get('X-Profile') == '1':
+        user = get_current_user()
+        if user and user['role'] == 'admin':
+            return 'header'
+    rate = current_app.config['PROFILE_SAMPLE_RATE']
+    if rate and random.random() < rate:
+        return 'sampled'
+    return None
+
+
+def _start():
+    trigger = _trigger()
+    if trigger is None or request.blueprint == 'admin':
+        return
+    sampler = StackSampler(threading.get_ident(), current_app.config['PROFILE_INTERVAL_MS'] / 1000)
+    g.profile = (sampler, trigger)
+    sampler.start()
+
+
+def _finish(exc):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return
+    sampler, trigger = profile
+    sampler.stop()
+    try:
+        _save(sampler, trigger)
+    except OSError:
+        logger.exception('profiling.save_failed')
+
+
+def init_app(app):
+    if not app.config['PROFILING_ENABLED']:
+        return
+    app.before_request(_start)
+    app.teardown_request(_finish)
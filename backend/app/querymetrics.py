@@ -0,0 +1,108 @@
+"""
+Per-request database query metrics
+
+Cursor events on every engine (primary and replicas) add up, for the
+request being served:
+
+- queries:  statements executed
+- db_time:  seconds spent in cursor.execute
+- rows:     rows returned or affected, as reported by the driver's
+            rowcount (psycopg2 reports it for SELECTs, SQLite does not)
+
+The totals are exported as Prometheus histograms labelled by endpoint,
+added to the `request.completed` log line, and, with SERVER_TIMING=true,
+returned as `Server-Timing: db;dur=<ms>;desc="<n> queries"`.
+
+Queries issued while a streamed response body is written run after the
+request has been logged and are not counted.
+"""
+import time
+from flask import g, has_request_context, request
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERY_COUNT = Histogram(
+    'db_queries_per_request',
+    'SQL statements executed per request',
+    ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+)
+QUERY_TIME = Histogram(
+    'db_time_per_request_seconds',
+    'Time spent executing SQL per request',
+    ['endpoint'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+QUERY_ROWS = Histogram(
+    'db_rows_per_request',
+    'Rows returned or affected per request (where the driver reports them)',
+    ['endpoint'],
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info['query_started_at'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('query_started_at', None)
+    if started is None or not has_request_context():
+        return
+    elapsed = time.perf_counter() - started
+    stats = g.get('db_stats')
+    if stats is None:
+        return  # before this app's before_request ran
+    stats['queries'] += 1
+    stats['db_time'] += elapsed
+    if cursor.rowcount > 0:
+        stats['rows'] += cursor.rowcount
+
+
+def _reset():
+    g.db_stats = {'queries': 0, 'db_time': 0.0, 'rows': 0}
+
+
+def request_stats():
+    """Totals for the current request: queries, db_time (seconds) and rows"""
+    return g.get('db_stats') or {'queries': 0, 'db_time': 0.0, 'rows': 0}
+
+
+def _observe(response):
+    stats = request_stats()
+    endpoint = request.endpoint or 'unmatched'  # bounded label set, unlike paths
+    QUERY_COUNT.labels(endpoint).observe(stats['queries'])
+    QUERY_TIME.labels(endpoint).observe(stats['db_time'])
+    QUERY_ROWS.labels(endpoint).observe(stats['rows'])
+    return response
+
+
+def _server_timing(response):
+    stats = request_stats()
+    response.headers.add(
+        'Server-Timing', f'db;dur={stats["db_time"] * 1000:.1f};desc="{stats["queries"]} queries"'
+    )
+    return response
+
+
+def log_fields():
+    """Fields for the request.completed log line"""
+    stats = request_stats()
+    return {
+        'db_queries': stats['queries'],
+        'db_time_ms': round(stats['db_time'] * 1000, 2),
+        'db_rows': stats['rows'],
+    }
+
+
+def init_app(app):
+    for name, listener in (('before_cursor_execute', _before_cursor_execute),
+                           ('after_cursor_execute', _after_cursor_execute)):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+    app.before_request(_reset)
+    app.after_request(_observe)
+    if app.config['SERVER_TIMING']:
+        app.after_request(_server_timing)
@@ -0,0 +1,127 @@
+"""
+SQL statement capture for development, staging and tests
+
+With QUERY_WATCH=true every statement a request executes is recorded
+and normalized into a fingerprint: literals and bind parameters become
+`?` and IN lists become `IN (...)`, so `SELECT ... WHERE users.id = 3`
+and `... = 4` are the same fingerprint. At the end of the request:
+
+- a fingerprint seen QUERY_WATCH_REPEAT_THRESHOLD times or more is
+  logged as `sql.repeated`. This is the N+1 signature, for example one
+  lazy load of Comment.author per comment.
+- with QUERY_WATCH_STRICT=true (the test suite), a repeated fingerprint
+  raises RepeatedQueryError instead, so N+1 regressions fail CI.
+
+A statement slower than QUERY_WATCH_SLOW_MS is logged as `sql.slow`
+with its bind parameters and the plan from EXPLAIN (EXPLAIN QUERY PLAN
+on SQLite). Only SELECTs are explained, and the plan is not executed.
+
+When QUERY_WATCH is off, no listeners are registered and nothing is
+captured.
+"""
+import logging
+import re
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_PARAMS = 500  # characters of repr(parameters) in sql.slow
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_BIND = re.compile(r'%\(\w+\)s|%s|\$\d+|:\w+|\?')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+class RepeatedQueryError(AssertionError):
+    """Raised in strict mode when a request repeats the same statement"""
+
+
+def fingerprint(statement):
+    """Normalize a SQL statement so queries differing only in values compare equal"""
+    sql = _STRING.sub('?', statement)
+    sql = _BIND.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def _explain(conn, statement, parameters):
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    conn.info['querywatch_explaining'] = True
+    try:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).all()
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+    finally:
+        conn.info.pop('querywatch_explaining', None)
+    return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and not conn.info.get('querywatch_explaining'):
+        conn.info['querywatch_started_at'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('querywatch_started_at', None)
+    if started is None or not has_request_context() or 'querywatch' not in g:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    key = fingerprint(statement)
+    g.querywatch.setdefault(key, []).append(elapsed_ms)
+
+    if elapsed_ms >= current_app.config['QUERY_WATCH_SLOW_MS']:
+        is_select = statement.lstrip().upper().startswith(('SELECT', 'WITH'))
+        logger.warning(
+            'sql.slow',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'endpoint': request.endpoint,
+                'duration_ms': round(elapsed_ms, 2),
+                'statement': statement,
+                'parameters': repr(parameters)[:MAX_LOGGED_PARAMS],
+                'plan': _explain(conn, statement, parameters) if is_select and not executemany else None
+            }
+        )
+
+
+def _start():
+    g.querywatch = {}
+
+
+def _report(response):
+    threshold = current_app.config['QUERY_WATCH_REPEAT_THRESHOLD']
+    repeated = {key: timings for key, timings in g.pop('querywatch', {}).items() if len(timings) >= threshold}
+    for key, timings in repeated.items():
+        logger.warning(
+            'sql.repeated',
+            extra={
+                'request_id': getattr(g, 'request_id', None),
+                'endpoint': request.endpoint,
+                'fingerprint': key,
+                'count': len(timings),
+                'total_ms': round(sum(timings), 2)
+            }
+        )
+    if repeated and current_app.config['QUERY_WATCH_STRICT']:
+        worst = max(repeated, key=lambda key: len(repeated[key]))
+        raise RepeatedQueryError(
+            f'{request.method} {request.path} ran {len(repeated[worst])}x: {worst}'
+        )
+    return response
+
+
+def init_app(app):
+    if not app.config['QUERY_WATCH']:
+        return
+    for name, listener in (('before_cursor_execute', _before_cursor_execute),
+                           ('after_cursor_execute', _after_cursor_execute)):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+    app.before_request(_start)
+    app.after_request(_report)
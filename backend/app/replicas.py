@@ -0,0 +1,174 @@
+"""
+Read-replica routing
+
+With DATABASE_REPLICA_URLS set, SELECTs issued while serving a safe
+(GET/HEAD) request to one of the REPLICA_BLUEPRINTS go to a healthy
+replica; everything else stays on the primary:
+
+- flushes, explicit `session.connection()` calls and non-SELECT statements
+- the rest of a request once it has written anything, through a flush or
+  a Core INSERT/UPDATE/DELETE passed to `session.execute`
+- membership checks (see app/membership.py), which decide access and
+  must not see a removed member on a lagging replica
+- a client's reads for READ_YOUR_WRITES_WINDOW seconds after it wrote,
+  tracked with a short-lived cookie so the pin holds across workers
+
+Each replica's lag is probed at most every REPLICA_LAG_CHECK_INTERVAL
+seconds; replicas behind by more than REPLICA_MAX_LAG (or failing the
+probe) are skipped until they catch up. With no healthy replica, reads
+fall back to the primary.
+"""
+import itertools
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from prometheus_client import Counter, Gauge
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.sql import Select
+
+PIN_COOKIE = 'db_primary_until'
+SAFE_METHODS = ('GET', 'HEAD')
+
+READS = Counter(
+    'db_read_route_total',
+    'SELECT statements by the database they were routed to',
+    ['target']  # primary, replica
+)
+REPLICA_LAG = Gauge(
+    'db_replica_lag_seconds',
+    'Last measured replication lag (+Inf when the probe failed)',
+    ['replica']
+)
+
+_PG_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def measure_lag(engine):
+    """Replication lag of `engine` in seconds"""
+    if engine.dialect.name != 'postgresql':
+        # SQLite (local two-database setups) has no replication to measure
+        return 0.0
+    with engine.connect() as conn:
+        return float(conn.execute(_PG_LAG_SQL).scalar() or 0)
+
+
+class _Replica:
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.lag = 0.0
+        self.checked_at = None
+
+
+class ReplicaRouter:
+    """Healthy-replica selection for one app"""
+
+    def __init__(self, urls, engine_options, max_lag, check_interval):
+        self.replicas = [
+            _Replica(f'replica{n}', create_engine(url, **engine_options))
+            for n, url in enumerate(urls)
+        ]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+        self._lock = threading.Lock()
+
+    def _refresh(self, replica, now):
+        try:
+            replica.lag = measure_lag(replica.engine)
+        except Exception:
+            replica.lag = float('inf')
+            current_app.logger.warning('db.replica.probe_failed', extra={'replica': replica.name}, exc_info=True)
+        replica.checked_at = now
+        REPLICA_LAG.labels(replica.name).set(replica.lag)
+
+    def healthy(self, replica):
+        now = time.monotonic()
+        if replica.checked_at is None or now - replica.checked_at >= self.check_interval:
+            self._refresh(replica, now)
+        return replica.lag <= self.max_lag
+
+    def pick(self):
+        """Next healthy replica engine, round robin, or None"""
+        if self._cycle is None:
+            return None
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if self.healthy(replica):
+                return replica.engine
+        return None
+
+    def dispose(self):
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+
+def _request_may_use_replica():
+    if request.method not in SAFE_METHODS or g.get('db_wrote'):
+        return False
+    if request.blueprint not in current_app.config['REPLICA_BLUEPRINTS']:
+        return False
+    pinned_until = request.cookies.get(PIN_COOKIE, type=float)
+    return not (pinned_until and pinned_until > time.time())
+
+
+class RoutingSession(Session):
+    """Session that sends eligible SELECTs to a read replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and isinstance(clause, Select) and not self._flushing and has_request_context():
+            router = current_app.extensions.get('replicas')
+            if router is not None and _request_may_use_replica():
+                engine = router.pick()
+                if engine is not None:
+                    READS.labels('replica').inc()
+                    return engine
+            READS.labels('primary').inc()
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _reset_write_flag():
+    g.db_wrote = False
+
+
+def _mark_write(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+def _mark_statement_write(orm_execute_state):
+    """Core writes (bulk inserts, membership rows) never flush"""
+    if not orm_execute_state.is_select and has_request_context():
+        g.db_wrote = True
+
+
+def _pin_writer(response):
+    """After a write, keep this client's reads on the primary for a while"""
+    if g.get('db_wrote'):
+        window = current_app.config['READ_YOUR_WRITES_WINDOW']
+        response.set_cookie(PIN_COOKIE, f'{time.time() + window:.3f}', max_age=int(window) + 1,
+                            httponly=True, samesite='Lax')
+    return response
+
+
+def init_app(app, db):
+    urls = app.config['SQLALCHEMY_REPLICA_URIS']
+    if not urls:
+        return
+    router = ReplicaRouter(
+        urls,
+        app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+        app.config['REPLICA_MAX_LAG'],
+        app.config['REPLICA_LAG_CHECK_INTERVAL'],
+    )
+    app.extensions['replicas'] = router
+    for name, listener in (('after_flush', _mark_write), ('do_orm_execute', _mark_statement_write)):
+        if not event.contains(db.session, name, listener):
+            event.listen(db.session, name, listener)
+    app.before_request(_reset_write_flag)
+    app.after_request(_pin_writer)
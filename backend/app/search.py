@@ -0,0 +1,117 @@
+"""
+Full-text search for issues
+
+Postgres: a generated `issues.search_vector` tsvector column (title weighted
+above description) with a GIN index. SQLite: an external-content FTS5 table
+kept in sync by triggers. Both are maintained by the database itself, so
+every insert/update is searchable immediately.
+"""
+import html
+import re
+from sqlalchemy import DDL, event
+from .extensions import db
+from .models import Issue
+
+# The database marks matches with private-use characters; render_snippet
+# escapes the issue text and only then turns them into <mark> tags
+SNIPPET_START = '\ue000'
+SNIPPET_STOP = '\ue001'
+
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+# Postgres: generated column + GIN index (same SQL as the migration)
+PG_DDL = [
+    "ALTER TABLE issues ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS ix_issues_search_vector ON issues USING gin (search_vector)",
+]
+
+# SQLite: FTS5 index over issues(title, description) kept current by triggers
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5("
+    "title, description, content='issues', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS issues_fts_ai AFTER INSERT ON issues BEGIN "
+    "INSERT INTO issues_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS issues_fts_ad AFTER DELETE ON issues BEGIN "
+    "INSERT INTO issues_fts(issues_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS issues_fts_au AFTER UPDATE OF title, description ON issues BEGIN "
+    "INSERT INTO issues_fts(issues_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO issues_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+]
+
+for _statement in PG_DDL:
+    event.listen(Issue.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+for _statement in SQLITE_DDL:
+    event.listen(Issue.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+event.listen(
+    Issue.__table__, 'before_drop',
+    DDL('DROP TABLE IF EXISTS issues_fts').execute_if(dialect='sqlite')
+)
+
+_fts = db.table('issues_fts', db.column('rowid'))
+
+
+def tokenize(term):
+    """Split user input into plain word tokens (drops all query syntax)"""
+    return _TOKEN_RE.findall(term or '')
+
+
+def render_snippet(snippet):
+    """HTML-safe snippet: escaped issue text with matches wrapped in <mark>"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(SNIPPET_START, '<mark>').replace(SNIPPET_STOP, '</mark>')
+
+
+def apply_search(query, term):
+    """
+    Restrict an Issue query to rows matching `term`.
+
+    Every token is treated as a prefix, tokens are ANDed. Returns
+    (query, rank, snippet): the query has `rank` and `snippet` columns
+    added, `rank` is the bare expression (higher is better) for ordering.
+    `snippet` is raw text with match markers; pass it through render_snippet.
+    Returns (query, None, None) when the term has no searchable tokens.
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return query, None, None
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        tsquery = db.func.to_tsquery('english', ' & '.join(f'{t}:*' for t in tokens))
+        vector = db.literal_column('issues.search_vector')
+        query = query.filter(vector.op('@@')(tsquery))
+        rank = db.func.ts_rank_cd(vector, tsquery)
+        snippet = db.func.ts_headline(
+            'english',
+            db.func.concat_ws(' ', Issue.title, Issue.description),
+            tsquery,
+            f'StartSel="{SNIPPET_START}", StopSel="{SNIPPET_STOP}", MaxFragments=2, MaxWords=20, MinWords=5'
+        )
+    elif dialect == 'sqlite':
+        fts = db.literal_column('issues_fts')
+        query = query.join(_fts, _fts.c.rowid == Issue.id).filter(
+            fts.op('MATCH')(' '.join(f'"{t}"*' for t in tokens))
+        )
+        # bm25() is "lower is better"; negate so both backends sort rank desc
+        rank = -db.func.bm25(fts)
+        snippet = db.func.snippet(fts, -1, SNIPPET_START, SNIPPET_STOP, '...', 12)
+    else:
+        conditions = []
+        for t in tokens:
+            pattern = f'%{t}%'
+            conditions.append(db.or_(Issue.title.ilike(pattern), Issue.description.ilike(pattern)))
+        query = query.filter(db.and_(*conditions))
+        rank = db.literal(0.0)
+        snippet = db.literal(None, db.Text)
+
+    return query.add_columns(rank.label('rank'), snippet.label('snippet')), rank, snippet
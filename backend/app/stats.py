@@ -0,0 +1,190 @@
+"""
+Per-project issue statistics
+
+`project_issue_stats` holds one counter per (project, dimension, value),
+e.g. (7, 'status', 'DONE') -> 42, counting live (not soft-deleted)
+issues. Any flush that creates, edits or soft-deletes an Issue applies
+the matching +1/-1 deltas in the same transaction, so reading a
+project's stats touches a handful of rows instead of scanning issues.
+`flask rebuild-stats` recomputes the table from scratch.
+"""
+from collections import Counter
+import click
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from .extensions import db
+from .models import Issue, ProjectIssueStat
+
+DIMENSIONS = {
+    'status': 'status',
+    'priority': 'priority',
+    'assignee': 'assignee_id',
+}
+UNASSIGNED = 'unassigned'
+_PENDING_KEY = 'stats.pending_deltas'
+
+
+_TRACKED = ('project_id', 'is_deleted', 'status', 'priority', 'assignee_id')
+
+
+def _stat_value(dimension, value):
+    if dimension == 'assignee':
+        return UNASSIGNED if value is None else str(value)
+    return value
+
+
+def issue_stat_keys(project_id, status, priority, assignee_id):
+    """The (project_id, dimension, value) counters one live issue contributes to"""
+    values = {'status': status, 'priority': priority, 'assignee': assignee_id}
+    return [(project_id, dim, _stat_value(dim, values[dim])) for dim in DIMENSIONS]
+
+
+def _stat_keys(values):
+    """(is_live, stat keys) for a dict of tracked Issue values"""
+    # Column defaults are applied at INSERT time, after before_flush runs
+    status = values['status'] or Issue.__table__.c.status.default.arg
+    priority = values['priority'] or Issue.__table__.c.priority.default.arg
+    return not values['is_deleted'], issue_stat_keys(
+        values['project_id'], status, priority, values['assignee_id']
+    )
+
+
+def _previous_values(session, issue):
+    """Tracked values of a dirty Issue as they are in the database"""
+    state = inspect(issue)
+    values = {}
+    for attr in _TRACKED:
+        history = state.attrs[attr].history
+        if history.deleted:
+            values[attr] = history.deleted[0]
+        elif history.added:
+            break  # overwritten without ever being loaded; ask the database
+        else:
+            values[attr] = getattr(issue, attr)
+    else:
+        return values
+    table = Issue.__table__
+    row = session.connection().execute(
+        db.select(*(table.c[attr] for attr in _TRACKED)).where(table.c.id == issue.id)
+    ).one()
+    return dict(row._mapping)
+
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_stat_deltas(session, flush_context, instances):
+    deltas = session.info.setdefault(_PENDING_KEY, Counter())
+    for obj in session.new:
+        if isinstance(obj, Issue):
+            live, keys = _stat_keys({attr: getattr(obj, attr) for attr in _TRACKED})
+            if live:
+                deltas.update(keys)
+    for obj in session.dirty:
+        if isinstance(obj, Issue) and session.is_modified(obj):
+            was_live, old_keys = _stat_keys(_previous_values(session, obj))
+            live, new_keys = _stat_keys({attr: getattr(obj, attr) for attr in _TRACKED})
+            if was_live:
+                deltas.subtract(old_keys)
+            if live:
+                deltas.update(new_keys)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _apply_stat_deltas(session, flush_context):
+    deltas = session.info.pop(_PENDING_KEY, None)
+    if deltas:
+        apply_deltas(deltas, session.connection())
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_stat_deltas(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def apply_deltas(deltas, connection=None):
+    """Upsert {(project_id, dimension, value): delta} into the stats table"""
+    rows = [
+        {'project_id': pid, 'dimension': dim, 'value': value, 'count': n}
+        for (pid, dim, value), n in deltas.items() if n
+    ]
+    if not rows:
+        return
+    connection = connection or db.session.connection()
+    dialect = connection.dialect.name
+    insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+    table = ProjectIssueStat.__table__
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.dimension, table.c.value],
+        set_={'count': table.c.count + statement.excluded.count},
+    )
+    connection.execute(statement, rows)
+
+
+def get_project_stats(project_id):
+    """Counts by status, priority and assignee plus open/closed totals"""
+    rows = db.session.query(
+        ProjectIssueStat.dimension, ProjectIssueStat.value, ProjectIssueStat.count
+    ).filter(ProjectIssueStat.project_id == project_id, ProjectIssueStat.count != 0)
+
+    data = {f'by_{dim}': {} for dim in DIMENSIONS}
+    for dimension, value, count in rows:
+        data[f'by_{dimension}'][value] = count
+    total = sum(data['by_status'].values())
+    closed = data['by_status'].get('DONE', 0)
+    data.update({'project_id': project_id, 'total': total, 'open': total - closed, 'closed': closed})
+    return data
+
+
+def rebuild_project_stats(project_id=None):
+    """Recompute the stats table from issues (all projects, or just one)"""
+    table = ProjectIssueStat.__table__
+    delete = db.delete(table)
+    if project_id is not None:
+        delete = delete.where(table.c.project_id == project_id)
+    db.session.execute(delete)
+
+    for dimension, attr in DIMENSIONS.items():
+        column = getattr(Issue, attr)
+        value = column
+        if dimension == 'assignee':
+            value = db.func.coalesce(db.cast(column, db.String), UNASSIGNED)
+        select = (
+            db.select(Issue.project_id, db.literal(dimension), value, db.func.count())
+            .where(Issue.is_deleted == False)
+            .group_by(Issue.project_id, column)
+        )
+        if project_id is not None:
+            select = select.where(Issue.project_id == project_id)
+        db.session.execute(
+            table.insert().from_select(['project_id', 'dimension', 'value', 'count'], select)
+        )
+
+
+@click.command('rebuild-stats')
+@click.option('--project-id', type=int, default=None, help='Only rebuild this project')
+@click.option('--verify', is_flag=True, help='Report drift against the live table, then roll back')
+def rebuild_stats_command(project_id, verify):
+    """Recompute project_issue_stats from the issues table."""
+    before = _snapshot_table(project_id)
+    rebuild_project_stats(project_id)
+    after = _snapshot_table(project_id)
+
+    drift = {key: (before.get(key, 0), after.get(key, 0))
+             for key in before.keys() | after.keys() if before.get(key, 0) != after.get(key, 0)}
+    for (pid, dim, value), (old, new) in sorted(drift.items()):
+        click.echo(f'project={pid} {dim}={value}: {old} -> {new}')
+    click.echo(f'{len(drift)} counters differed')
+
+    if verify:
+        db.session.rollback()
+        if drift:
+            raise SystemExit(1)
+    else:
+        db.session.commit()
+
+
+def _snapshot_table(project_id):
+    query = db.session.query(ProjectIssueStat)
+    if project_id is not None:
+        query = query.filter_by(project_id=project_id)
+    return {(s.project_id, s.dimension, s.value): s.count for s in query if s.count}
@@ -0,0 +1,62 @@
+"""
+Streaming responses for large list endpoints
+
+Rows are pulled from a server-side cursor in batches (`yield_per`) and
+written to the client one by one, so worker memory stays flat however
+many rows match. Streaming is opt-in:
+
+- `Accept: application/x-ndjson` -> one JSON object per line
+- `?stream=true`                 -> a regular JSON array, written incrementally
+"""
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson():
+    """True when the client prefers NDJSON over plain JSON"""
+    # JSON is listed first so wildcards (*/*) keep the JSON default
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def wants_stream():
+    """True when the client asked for any streaming format"""
+    return wants_ndjson() or request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def _iter_json_array(rows, serialize, dumps):
+    yield '['
+    first = True
+    for row in rows:
+        if not first:
+            yield ','
+        first = False
+        yield dumps(serialize(row))
+    yield ']\n'
+
+
+def _iter_ndjson(rows, serialize, dumps):
+    for row in rows:
+        yield dumps(serialize(row)) + '\n'
+
+
+def stream_query(query, serialize, batch_size=STREAM_BATCH_SIZE):
+    """
+    Stream every row of `query` through `serialize` as JSON or NDJSON.
+
+    The query must be fully built (filters and ordering); it is executed
+    lazily, inside the request context, once the client starts reading.
+    """
+    return stream_rows(query.yield_per(batch_size), serialize)
+
+
+def stream_rows(rows, serialize):
+    """Stream any lazy iterable of rows, e.g. a query chained with archived rows"""
+    dumps = current_app.json.dumps
+    if wants_ndjson():
+        body, mimetype = _iter_ndjson(rows, serialize, dumps), NDJSON_MIMETYPE
+    else:
+        body, mimetype = _iter_json_array(rows, serialize, dumps), 'application/json'
+    return Response(stream_with_context(body), mimetype=mimetype)
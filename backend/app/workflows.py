@@ -9,6 +9,30 @@ VALID_TRANSITIONS = {
     'DONE': ['IN_PROGRESS']  # Allow reopening
 }
 
+ISSUE_STATUSES = tuple(VALID_TRANSITIONS)
+ISSUE_PRIORITIES = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+TITLE_MAX_LENGTH = 255  # issues.title is String(255)
+
+
+def validate_issue_fields(data):
+    """
+    Type and value checks for the client-supplied issue fields present in `data`
+    Returns an error message, or None when they are valid
+    """
+    if 'title' in data:
+        title = data['title']
+        if not isinstance(title, str) or not title:
+            return 'title must be a non-empty string'
+        if len(title) > TITLE_MAX_LENGTH:
+            return f'title must be at most {TITLE_MAX_LENGTH} characters'
+    if data.get('description') is not None and not isinstance(data['description'], str):
+        return 'description must be a string'
+    if 'status' in data and data['status'] not in ISSUE_STATUSES:
+        return f'status must be one of: {", ".join(ISSUE_STATUSES)}'
+    if 'priority' in data and data['priority'] not in ISSUE_PRIORITIES:
+        return f'priority must be one of: {", ".join(ISSUE_PRIORITIES)}'
+    return None
+
 
 def can_transition(from_status, to_status):
     """Check if a status transition is valid"""
@@ -34,14 +58,8 @@ def can_comment_on_issue(issue, user_id):
     """
     Business rule: Only project members can comment
     """
-    from .models import User
-    user = User.query.get(user_id)
-    
-    if not user:
-        return False
-    
-    # Check if user is a project member or owner
-    return user in issue.project.members or issue.project.owner_id == user_id
+    from .membership import is_member
+    return is_member(issue.project_id, user_id)
 
 
 def can_modify_issue(issue, user_id):
@@ -54,13 +72,8 @@ def can_modify_issue(issue, user_id):
     if issue.assignee_id == user_id or issue.reporter_id == user_id:
         return True
     
-    from .models import User
-    user = User.query.get(user_id)
-    
-    if not user:
-        return False
-    
-    return user in issue.project.members or issue.project.owner_id == user_id
+    from .membership import is_member
+    return is_member(issue.project_id, user_id)
 
 
 def validate_status_change(issue, new_status, user_id):
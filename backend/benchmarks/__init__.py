@@ -0,0 +1 @@
+# Benchmark and query-plan tooling (run with `python -m benchmarks.<module>`)
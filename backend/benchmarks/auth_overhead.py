@@ -0,0 +1,64 @@
+"""
+Per-request cost of the JWT auth decorator, with and without the
+verified-token cache
+
+    python -m benchmarks.auth_overhead --requests 20000
+"""
+import argparse
+import json
+import statistics
+import time
+from flask import request
+from app import create_app
+from app.auth import generate_token, require_auth, token_cache
+from app.config import Config
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SECRET_KEY = 'benchmark-secret-key-with-enough-bytes'
+
+
+@require_auth
+def _protected_view():
+    return request.current_user
+
+
+def measure(app, token, requests, cache_size):
+    """Median and p99 microseconds spent in require_auth for one request"""
+    token_cache.configure(cache_size, app.config['AUTH_TOKEN_CACHE_TTL'])
+    headers = {'Authorization': f'Bearer {token}'}
+    samples = []
+    with app.test_request_context('/', headers=headers):
+        for _ in range(requests):
+            start = time.perf_counter()
+            _protected_view()
+            samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        'p50_us': round(statistics.median(samples), 2),
+        'p99_us': round(samples[int(len(samples) * 0.99) - 1], 2),
+        'mean_us': round(statistics.fmean(samples), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='JWT auth overhead per request')
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        token = generate_token(1, 'bench@test.com', 'member')
+    uncached = measure(app, token, args.requests, cache_size=0)
+    cached = measure(app, token, args.requests, cache_size=app.config['AUTH_TOKEN_CACHE_SIZE'])
+    print(json.dumps({
+        'requests': args.requests,
+        'uncached': uncached,
+        'cached': cached,
+        'speedup_p50': round(uncached['p50_us'] / cached['p50_us'], 1),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
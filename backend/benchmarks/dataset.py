@@ -0,0 +1,125 @@
+"""
+Deterministic synthetic dataset generator
+
+Rows are written with explicit ids through multi-row Core inserts, so the
+same parameters and seed always produce the same database, on SQLite or
+Postgres, at millions of rows.
+"""
+import random
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from app.extensions import db
+from app.models import User, Project, Issue, Comment, AuditLog, project_members
+
+STATUSES = ['OPEN', 'IN_PROGRESS', 'DONE']
+PRIORITIES = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+WORDS = (
+    'login page crash api timeout dashboard export report search filter '
+    'mobile layout payment invoice email notification sync cache database '
+    'migration upload avatar settings password reset token session latency'
+).split()
+EPOCH = datetime(2024, 1, 1)
+PASSWORD = 'password'
+
+
+def _sentence(rng, length):
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def _insert(table, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(table.insert(), rows[start:start + batch_size])
+
+
+def _reset_sequences():
+    if db.session.get_bind().dialect.name != 'postgresql':
+        return
+    for table in ('users', 'projects', 'issues', 'comments', 'audit_logs'):
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def generate(users=50, projects=10, issues_per_project=100, comments_per_issue=2,
+             audit_per_issue=2, members_per_project=8, seed=42, batch_size=5000, log=print):
+    """
+    Populate an empty database. Returns a summary dict of row counts.
+
+    User N has email user{N}@bench.test and password "password"; user 1 is
+    an admin. Every project owner is also a member.
+    """
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(PASSWORD)
+    members_per_project = min(members_per_project, users)
+
+    log(f'users: {users}')
+    _insert(User.__table__, [
+        {'id': n, 'email': f'user{n}@bench.test', 'password_hash': password_hash,
+         'role': 'admin' if n == 1 else 'member', 'created_at': EPOCH}
+        for n in range(1, users + 1)
+    ], batch_size)
+
+    log(f'projects: {projects}')
+    project_rows, member_rows, members_of = [], [], {}
+    for pid in range(1, projects + 1):
+        owner_id = rng.randint(1, users)
+        members = {owner_id, *rng.sample(range(1, users + 1), members_per_project)}
+        members_of[pid] = sorted(members)
+        project_rows.append({'id': pid, 'name': f'Project {pid}', 'description': _sentence(rng, 12),
+                             'owner_id': owner_id, 'created_at': EPOCH, 'is_deleted': False})
+        member_rows.extend({'project_id': pid, 'user_id': uid, 'joined_at': EPOCH}
+                           for uid in members_of[pid])
+    _insert(Project.__table__, project_rows, batch_size)
+    _insert(project_members, member_rows, batch_size)
+    db.session.commit()
+
+    issue_id = comment_id = audit_id = 0
+    issue_rows, comment_rows, audit_rows = [], [], []
+    for pid in range(1, projects + 1):
+        members = members_of[pid]
+        for _ in range(issues_per_project):
+            issue_id += 1
+            created = EPOCH + timedelta(seconds=issue_id * 37 + rng.randint(0, 30))
+            status = rng.choice(STATUSES)
+            issue_rows.append({
+                'id': issue_id, 'title': _sentence(rng, 5), 'description': _sentence(rng, 30),
+                'status': status, 'priority': rng.choice(PRIORITIES), 'project_id': pid,
+                'assignee_id': rng.choice(members) if rng.random() < 0.8 else None,
+                'reporter_id': rng.choice(members), 'created_at': created,
+                'updated_at': created, 'is_deleted': rng.random() < 0.02,
+            })
+            for n in range(comments_per_issue):
+                comment_id += 1
+                comment_rows.append({
+                    'id': comment_id, 'content': _sentence(rng, 20), 'issue_id': issue_id,
+                    'author_id': rng.choice(members), 'created_at': created + timedelta(minutes=n + 1),
+                    'is_deleted': False,
+                })
+            for n in range(audit_per_issue):
+                audit_id += 1
+                audit_rows.append({
+                    'id': audit_id, 'issue_id': issue_id, 'project_id': pid, 'user_id': rng.choice(members),
+                    'action': 'created' if n == 0 else 'status_change',
+                    'old_value': None if n == 0 else rng.choice(STATUSES),
+                    'new_value': status, 'timestamp': created + timedelta(minutes=n),
+                })
+            if len(issue_rows) >= batch_size:
+                _flush(issue_rows, comment_rows, audit_rows, batch_size)
+                log(f'issues: {issue_id}')
+    _flush(issue_rows, comment_rows, audit_rows, batch_size)
+    _reset_sequences()
+    db.session.commit()
+
+    return {'users': users, 'projects': projects, 'project_members': len(member_rows),
+            'issues': issue_id, 'comments': comment_id, 'audit_logs': audit_id}
+
+
+def _flush(issue_rows, comment_rows, audit_rows, batch_size):
+    _insert(Issue.__table__, issue_rows, batch_size)
+    _insert(Comment.__table__, comment_rows, batch_size)
+    _insert(AuditLog.__table__, audit_rows, batch_size)
+    db.session.commit()
+    issue_rows.clear()
+    comment_rows.clear()
+    audit_rows.clear()
@@ -0,0 +1,110 @@
+"""
+EXPLAIN check for the hot endpoint queries
+
+Migrates the database to head, seeds a large synthetic dataset (1M issues
+by default) if it is empty, runs ANALYZE, then EXPLAINs the query behind each endpoint and fails
+if any of the listed tables is read with a full table scan.
+
+    DATABASE_URL=sqlite:////tmp/bench.db python -m benchmarks.explain_indexes
+    DATABASE_URL=postgresql://... python -m benchmarks.explain_indexes --issues 1000000
+"""
+import argparse
+import os
+import sys
+from flask_migrate import upgrade
+from app import create_app
+from app.extensions import db
+from app.models import Issue, Comment, AuditLog, project_members
+from app.pagination import DEFAULT_PAGE_SIZE, page_query
+from app.api.issues import COMMENTS_PREVIEW_SIZE, _comments_query
+from . import dataset
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def endpoint_queries(project_id, user_id, issue_id):
+    """(name, statement, tables that must be read through an index)"""
+    active = Issue.query.filter_by(is_deleted=False)
+
+    def newest(query):
+        return page_query(query, Issue.created_at, Issue.id, DEFAULT_PAGE_SIZE)
+
+    return [
+        ('issues.list', newest(active), ['issues']),
+        ('issues.list?project_id', newest(active.filter_by(project_id=project_id)), ['issues']),
+        ('issues.list?project_id&status', newest(active.filter_by(project_id=project_id, status='OPEN')),
+            ['issues']),
+        ('issues.list?assignee_id', newest(active.filter_by(assignee_id=user_id)), ['issues']),
+        # The same statements the endpoints run (see _comments_page, audit_listing)
+        ('issues.get (comments)', page_query(_comments_query(issue_id), Comment.created_at, Comment.id,
+                                             COMMENTS_PREVIEW_SIZE), ['comments']),
+        ('issues.audit', page_query(AuditLog.query.filter_by(issue_id=issue_id), AuditLog.timestamp,
+                                    AuditLog.id, DEFAULT_PAGE_SIZE), ['audit_logs']),
+        ('projects.list (membership)', db.select(project_members.c.project_id)
+            .where(project_members.c.user_id == user_id), ['project_members']),
+    ]
+
+
+def explain(statement):
+    bind = db.session.get_bind()
+    statement = getattr(statement, 'statement', statement)
+    sql = str(statement.compile(dialect=bind.dialect, compile_kwargs={'literal_binds': True}))
+    if bind.dialect.name == 'postgresql':
+        rows = db.session.execute(db.text('EXPLAIN ' + sql)).scalars().all()
+    else:
+        rows = [r[-1] for r in db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql))]
+    return rows
+
+
+def full_scans(plan, tables):
+    """Tables from `tables` that the plan reads without an index"""
+    bad = []
+    for table in tables:
+        for line in plan:
+            line = line.strip().lstrip('-> ').strip()
+            if line.startswith(f'Seq Scan on {table}') or line == f'SCAN {table}':
+                bad.append(table)
+    return bad
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--issues', type=int, default=1_000_000, help='total issues to seed')
+    parser.add_argument('--projects', type=int, default=100)
+    parser.add_argument('--users', type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        # The schema production has, so an index missing from the migrations shows up here
+        upgrade(directory=MIGRATIONS_DIR)
+        if Issue.query.count() == 0:
+            summary = dataset.generate(
+                users=args.users, projects=args.projects,
+                issues_per_project=args.issues // args.projects,
+                comments_per_issue=1, audit_per_issue=2,
+            )
+            print(f'seeded: {summary}')
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+
+        sample = Issue.query.filter_by(is_deleted=False).order_by(Issue.id).first()
+        failures = []
+        for name, statement, tables in endpoint_queries(sample.project_id, sample.assignee_id or 1, sample.id):
+            plan = explain(statement)
+            bad = full_scans(plan, tables)
+            print(f"\n{'FAIL' if bad else 'ok  '} {name}")
+            for line in plan:
+                print(f'     {line}')
+            if bad:
+                failures.append((name, bad))
+
+    if failures:
+        print(f'\n{len(failures)} queries fall back to full scans: {failures}')
+        return 1
+    print('\nall endpoint queries use an index')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Throughput and tail latency of the gunicorn worker models
+
+Seeds a database (SQLite file by default) if it is empty, then for each
+worker class starts gunicorn with gunicorn.conf.py, drives keep-alive
+GET traffic against the main read endpoints from several client
+processes, and reports requests/s and p50/p99 latency.
+
+    python -m benchmarks.load_workers --duration 15 --concurrency 32
+    DATABASE_URL=postgresql://... python -m benchmarks.load_workers --models gthread,gevent
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from app import create_app
+from app.auth import generate_token
+from app.config import Config
+from app.extensions import db
+from app.models import Issue, Project
+from app.stats import rebuild_project_stats
+from . import dataset
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRET_KEY = 'load-benchmark-secret-key-with-enough-bytes'
+
+
+def seed(database_url):
+    """Populate the database if needed; returns (auth token, endpoint paths)"""
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+
+    app = create_app(BenchConfig)
+    app.config['SECRET_KEY'] = SECRET_KEY
+    with app.app_context():
+        db.create_all()
+        if Issue.query.count() == 0:
+            print(f'seeded: {dataset.generate(users=200, projects=20, issues_per_project=500, log=lambda _: None)}')
+            rebuild_project_stats()
+            db.session.commit()
+        project = Project.query.order_by(Project.id).first()
+        issue = Issue.query.filter_by(project_id=project.id, is_deleted=False).order_by(Issue.id).first()
+        token = generate_token(project.owner_id, f'user{project.owner_id}@bench.test', 'member')
+    paths = [
+        f'/api/v1/issues?project_id={project.id}&limit=50',
+        f'/api/v1/issues/{issue.id}',
+        f'/api/v1/issues/{issue.id}/audit',
+        '/api/v1/projects',
+        f'/api/v1/projects/{project.id}/stats',
+    ]
+    return token, paths
+
+
+def _client_thread(port, paths, headers, deadline):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies, errors, n = [], 0, 0
+    while time.monotonic() < deadline:
+        path = paths[n % len(paths)]
+        n += 1
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors += 1
+    conn.close()
+    return latencies, errors
+
+
+def _client_process(port, paths, token, duration, threads):
+    headers = {'Authorization': f'Bearer {token}'}
+    deadline = time.monotonic() + duration
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda _: _client_thread(port, paths, headers, deadline), range(threads)))
+    return [l for lat, _ in results for l in lat], sum(e for _, e in results)
+
+
+def _wait_until_up(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not come up')
+
+
+def run_model(model, args, token, paths):
+    env = dict(
+        os.environ,
+        DATABASE_URL=args.database, SECRET_KEY=SECRET_KEY,
+        GUNICORN_WORKER_CLASS=model, GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_THREADS=str(args.threads), GUNICORN_BIND=f'127.0.0.1:{args.port}',
+        GUNICORN_MAX_REQUESTS='0',
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'run:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_up(args.port)
+        threads = max(args.concurrency // args.clients, 1)
+        _client_process(args.port, paths, token, 2, threads)  # warm up
+        with ProcessPoolExecutor(args.clients) as pool:
+            futures = [pool.submit(_client_process, args.port, paths, token, args.duration, threads)
+                       for _ in range(args.clients)]
+            results = [f.result() for f in futures]
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    latencies = sorted(l for lat, _ in results for l in lat)
+    errors = sum(e for _, e in results)
+    if not latencies:
+        return {'requests': 0, 'errors': errors}
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / args.duration, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare gunicorn worker models under load')
+    parser.add_argument('--models', default='sync,gthread,gevent')
+    parser.add_argument('--database', default=os.getenv('DATABASE_URL', 'sqlite:////tmp/minijira-load.db'))
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='threads per gthread worker')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent client connections')
+    parser.add_argument('--clients', type=int, default=4, help='client processes')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per worker model')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args(argv)
+
+    token, paths = seed(args.database)
+    report = {'workers': args.workers, 'concurrency': args.concurrency, 'paths': paths, 'models': {}}
+    for model in args.models.split(','):
+        report['models'][model] = run_model(model, args, token, paths)
+        print(f'{model}: {report["models"][model]}', file=sys.stderr)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
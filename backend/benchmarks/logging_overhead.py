@@ -0,0 +1,79 @@
+"""
+Per-request logging cost on the request thread: the old synchronous
+StreamHandler against the queue pipeline in app/logs.py, with and
+without sampling
+
+    python -m benchmarks.logging_overhead --requests 20000
+
+Output goes to /dev/null so the terminal is not the bottleneck; a
+real stdout (a pipe to the container runtime) is slower and makes the
+synchronous case worse.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+from pythonjsonlogger import jsonlogger
+from app.logs import BoundedQueueHandler, SamplingFilter, parse_sample_rates
+
+# Roughly what one list request logs: the endpoint line and request.completed
+EVENTS = [
+    ('issues.list', {'request_id': 'bench', 'user_id': 1, 'project_id': 7, 'status': None,
+                     'assignee_id': None, 'priority': None, 'search_applied': False,
+                     'result_count': 50, 'paginated': True}),
+    ('request.completed', {'request_id': 'bench', 'method': 'GET', 'path': '/api/v1/issues',
+                           'status_code': 200, 'remote_addr': '127.0.0.1'}),
+]
+
+
+def _stream_handler(devnull):
+    handler = logging.StreamHandler(devnull)
+    handler.setFormatter(jsonlogger.JsonFormatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+    return handler
+
+
+def measure(handler, requests):
+    """p50/p99/mean microseconds of logging for one request"""
+    logger = logging.getLogger('benchmarks.logging')
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        for event, extra in EVENTS:
+            logger.info(event, extra=extra)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        'p50_us': round(statistics.median(samples), 2),
+        'p99_us': round(samples[int(len(samples) * 0.99) - 1], 2),
+        'mean_us': round(statistics.fmean(samples), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Logging cost per request')
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--sample-rates', default='issues.list=0.01,request.completed=0.1')
+    args = parser.parse_args(argv)
+
+    results = {'requests': args.requests}
+    with open(os.devnull, 'w') as devnull:
+        results['sync'] = measure(_stream_handler(devnull), args.requests)
+
+        for name, rates in (('queued', ''), ('queued_sampled', args.sample_rates)):
+            # Large enough that nothing is dropped; drops would flatter the numbers
+            handler = BoundedQueueHandler(len(EVENTS) * args.requests, _stream_handler(devnull))
+            handler.addFilter(SamplingFilter(parse_sample_rates(rates)))
+            results[name] = measure(handler, args.requests)
+            handler.stop()
+
+    results['speedup_p50'] = round(results['sync']['p50_us'] / results['queued']['p50_us'], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+"""
+Scripted API benchmark with baseline comparison
+
+Seeds the database with benchmarks.dataset (once: a database already
+holding the requested dataset is reused), then runs each scenario, a
+seeded sequence of requests against one endpoint as a random project
+member, through the WSGI app in-process. Reports requests/s and
+p50/p95/p99 latency per scenario as JSON.
+
+    python -m benchmarks.suite --scale small --output baseline.json
+    python -m benchmarks.suite --scale small --baseline baseline.json
+    DATABASE_URL=postgresql://localhost/minijira_bench python -m benchmarks.suite --scale large
+
+With --baseline, the run is compared with an earlier report for the same
+dataset. It exits 1 when a scenario's p95 grew, or its throughput fell,
+by more than --tolerance. Nothing leaves the machine except queries to
+the local database. Rows created by the write scenarios are deleted after
+the run, so repeated runs measure the same dataset.
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app
+from app.auth import generate_token
+from app.config import Config
+from app.extensions import db
+from app.models import User, Project, Issue, Comment, AuditLog, project_members
+from app.stats import rebuild_project_stats
+from . import dataset
+
+SECRET_KEY = 'suite-benchmark-secret-key-with-enough-bytes'
+
+# users, projects, issues per project, comments and audit rows per issue
+SCALES = {
+    'tiny': dict(users=20, projects=4, issues_per_project=50, comments_per_issue=2, audit_per_issue=2),
+    'small': dict(users=200, projects=20, issues_per_project=500, comments_per_issue=3, audit_per_issue=3),
+    'medium': dict(users=2000, projects=100, issues_per_project=2000, comments_per_issue=3, audit_per_issue=4),
+    'large': dict(users=20000, projects=500, issues_per_project=2000, comments_per_issue=4, audit_per_issue=5),
+}
+HOT_ISSUES = 200  # newest live issues per project that read scenarios pick from
+
+
+class BenchConfig(Config):
+    SECRET_KEY = SECRET_KEY
+    AUDIT_MODE = 'sync'
+    PROFILING_ENABLED = False
+    QUERY_WATCH = False
+
+
+class Context:
+    """Ids the scenarios draw from: projects, their members, and hot issues"""
+
+    def __init__(self):
+        self.members = {}
+        for project_id, user_id in db.session.execute(
+                db.select(project_members.c.project_id, project_members.c.user_id)
+                .order_by(project_members.c.project_id, project_members.c.user_id)):
+            self.members.setdefault(project_id, []).append(user_id)
+        self.project_ids = sorted(self.members)
+        self.issues = {
+            project_id: db.session.scalars(
+                db.select(Issue.id)
+                .where(Issue.project_id == project_id, Issue.is_deleted.is_(False))
+                .order_by(Issue.created_at.desc(), Issue.id.desc())
+                .limit(HOT_ISSUES)
+            ).all()
+            for project_id in self.project_ids
+        }
+        self.own_issues = []  # created by issues.create, edited by issues.update
+        self.tokens = {
+            user_id: generate_token(user_id, f'user{user_id}@bench.test', 'member')
+            for user_id in {u for members in self.members.values() for u in members}
+        }
+
+    def headers(self, user_id):
+        return {'Authorization': f'Bearer {self.tokens[user_id]}'}
+
+    def member(self, rng, project_id=None):
+        project_id = project_id or rng.choice(self.project_ids)
+        return project_id, rng.choice(self.members[project_id])
+
+    def issue(self, rng):
+        project_id, user_id = self.member(rng)
+        return rng.choice(self.issues[project_id]), user_id
+
+
+# Scenario: (blueprint, expected status, fn(rng, ctx) -> (method, path, json body, user id or None))
+def _login(rng, ctx):
+    _, user_id = ctx.member(rng)
+    return 'POST', '/api/v1/auth/login', {'email': f'user{user_id}@bench.test', 'password': dataset.PASSWORD}, None
+
+
+def _me(rng, ctx):
+    _, user_id = ctx.member(rng)
+    return 'GET', '/api/v1/auth/me', None, user_id
+
+
+def _project_path(suffix):
+    def scenario(rng, ctx):
+        project_id, user_id = ctx.member(rng)
+        return 'GET', f'/api/v1/projects/{project_id}{suffix}', None, user_id
+    return scenario
+
+
+def _list_projects(rng, ctx):
+    _, user_id = ctx.member(rng)
+    return 'GET', '/api/v1/projects', None, user_id
+
+
+def _list_issues(extra=''):
+    def scenario(rng, ctx):
+        project_id, user_id = ctx.member(rng)
+        query = extra.format(status=rng.choice(dataset.STATUSES), word=rng.choice(dataset.WORDS))
+        return 'GET', f'/api/v1/issues?project_id={project_id}&limit=50{query}', None, user_id
+    return scenario
+
+
+def _issue_path(suffix):
+    def scenario(rng, ctx):
+        issue_id, user_id = ctx.issue(rng)
+        return 'GET', f'/api/v1/issues/{issue_id}{suffix}', None, user_id
+    return scenario
+
+
+def _create_issue(rng, ctx):
+    project_id, user_id = ctx.member(rng)
+    body = {'title': dataset._sentence(rng, 5), 'description': dataset._sentence(rng, 30),
+            'project_id': project_id, 'priority': rng.choice(dataset.PRIORITIES)}
+    return 'POST', '/api/v1/issues', body, user_id
+
+
+def _update_issue(rng, ctx):
+    issue_id, project_id = rng.choice(ctx.own_issues)
+    _, user_id = ctx.member(rng, project_id)
+    body = {'priority': rng.choice(dataset.PRIORITIES), 'description': dataset._sentence(rng, 30)}
+    return 'PUT', f'/api/v1/issues/{issue_id}', body, user_id
+
+
+def _create_comment(rng, ctx):
+    issue_id, user_id = ctx.issue(rng)
+    return 'POST', '/api/v1/comments', {'issue_id': issue_id, 'content': dataset._sentence(rng, 20)}, user_id
+
+
+SCENARIOS = {
+    'auth.login': ('auth', 200, _login),
+    'auth.me': ('auth', 200, _me),
+    'projects.list': ('projects', 200, _list_projects),
+    'projects.get': ('projects', 200, _project_path('')),
+    'projects.members': ('projects', 200, _project_path('/members')),
+    'projects.stats': ('projects', 200, _project_path('/stats')),
+    'projects.audit': ('projects', 200, _project_path('/audit')),
+    'issues.list': ('issues', 200, _list_issues()),
+    'issues.list?status': ('issues', 200, _list_issues('&status={status}')),
+    'issues.search': ('issues', 200, _list_issues('&search={word}')),
+    'issues.get': ('issues', 200, _issue_path('')),
+    'issues.audit': ('issues', 200, _issue_path('/audit')),
+    'issues.create': ('issues', 201, _create_issue),
+    'issues.update': ('issues', 200, _update_issue),
+    'comments.list': ('comments', 200, _issue_path('/comments')),
+    'comments.create': ('comments', 201, _create_comment),
+}
+
+
+def percentile(sorted_samples, q):
+    """Nearest-rank percentile of an ascending list"""
+    return sorted_samples[max(math.ceil(q * len(sorted_samples)) - 1, 0)]
+
+
+def seed(app, params, seed_value, reset):
+    """Generate the dataset unless the database already holds it; returns row counts"""
+    expected = {'users': params['users'], 'projects': params['projects'],
+                'issues': params['projects'] * params['issues_per_project']}
+    with app.app_context():
+        if reset:
+            db.drop_all()
+        db.create_all()
+        found = {'users': User.query.count(), 'projects': Project.query.count(), 'issues': Issue.query.count()}
+        if found['issues'] == 0:
+            print(f'seeding: {params}', file=sys.stderr)
+            dataset.generate(**params, seed=seed_value, log=lambda line: print(line, file=sys.stderr))
+            rebuild_project_stats()
+            db.session.commit()
+        elif found != expected:
+            raise SystemExit(f'database holds {found}, expected {expected}; rerun with --reset')
+        return {
+            **expected,
+            'comments': Comment.query.count(),
+            'audit_logs': AuditLog.query.count(),
+            'seed': seed_value,
+        }
+
+
+def _worker(app, ctx, name, requests, seed_value, index):
+    blueprint, expected, scenario = SCENARIOS[name]
+    rng = random.Random(f'{seed_value}:{name}:{index}')
+    client = app.test_client()
+    latencies, errors, first_error = [], 0, None
+    for _ in range(requests):
+        method, path, body, user_id = scenario(rng, ctx)
+        headers = ctx.headers(user_id) if user_id else {}
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers)
+        elapsed = time.perf_counter() - start
+        if response.status_code != expected:
+            errors += 1
+            first_error = first_error or f'{method} {path} -> {response.status_code}: {response.get_data(as_text=True)[:200]}'
+            continue
+        latencies.append(elapsed)
+        if name == 'issues.create':
+            issue = response.get_json()
+            ctx.own_issues.append((issue['id'], issue['project_id']))
+    return latencies, errors, first_error
+
+
+def run_scenario(app, ctx, name, requests, warmup, concurrency, seed_value):
+    """Run one scenario: `warmup` untimed requests, then `requests` timed ones"""
+    if warmup:
+        _worker(app, ctx, name, warmup, f'{seed_value}:warmup', 0)
+    per_worker = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda i: _worker(app, ctx, name, per_worker[i], seed_value, i), range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(l for lat, _, _ in results for l in lat)
+    errors = sum(e for _, e, _ in results)
+    first_error = next((err for _, _, err in results if err), None)
+    if first_error:
+        print(f'{name}: {errors} errors, first: {first_error}', file=sys.stderr)
+    report = {'blueprint': SCENARIOS[name][0], 'requests': len(latencies), 'errors': errors,
+              'rps': round(len(latencies) / wall, 1)}
+    if latencies:
+        report.update({f'p{int(q * 100)}_ms': round(percentile(latencies, q) * 1000, 2) for q in (0.5, 0.95, 0.99)})
+        report['max_ms'] = round(latencies[-1] * 1000, 2)
+    return report
+
+
+def cleanup(app, high_water):
+    """Delete rows the write scenarios created (ids above the pre-run maxima)"""
+    with app.app_context():
+        issues = db.select(Issue.id).where(Issue.id > high_water['issues'])
+        db.session.execute(db.delete(AuditLog.__table__).where(
+            db.or_(AuditLog.id > high_water['audit_logs'], AuditLog.issue_id.in_(issues))))
+        db.session.execute(db.delete(Comment.__table__).where(
+            db.or_(Comment.id > high_water['comments'], Comment.issue_id.in_(issues))))
+        db.session.execute(db.delete(Issue.__table__).where(Issue.id > high_water['issues']))
+        rebuild_project_stats()
+        db.session.commit()
+
+
+def compare(report, baseline, tolerance, min_delta_ms):
+    """Per-scenario change against a baseline report; flags regressions"""
+    for key in ('dataset', 'database', 'concurrency'):
+        if baseline[key] != report[key]:
+            raise SystemExit(f'baseline {key} {baseline[key]} differs from this run\'s {report[key]}')
+    comparison = {}
+    for name, current in report['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if not before or 'p95_ms' not in before or 'p95_ms' not in current:
+            continue
+        slower = (current['p95_ms'] > before['p95_ms'] * (1 + tolerance)
+                  and current['p95_ms'] - before['p95_ms'] > min_delta_ms)
+        fewer = current['rps'] * (1 + tolerance) < before['rps']
+        comparison[name] = {
+            'baseline_p95_ms': before['p95_ms'],
+            'p95_ms': current['p95_ms'],
+            'p95_change': round(current['p95_ms'] / before['p95_ms'] - 1, 3) if before['p95_ms'] else None,
+            'baseline_rps': before['rps'],
+            'rps': current['rps'],
+            'regressed': slower or fewer or current['errors'] > before['errors'],
+        }
+    return comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Scripted API benchmark with baseline comparison')
+    parser.add_argument('--database', default=None, help='defaults to DATABASE_URL, else sqlite:////tmp/minijira-bench-<scale>.db')
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    for param in ('users', 'projects', 'issues_per_project', 'comments_per_issue', 'audit_per_issue'):
+        parser.add_argument(f'--{param.replace("_", "-")}', dest=param, type=int, help=f'override the scale\'s {param}')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help='drop and regenerate the dataset')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated scenario names')
+    parser.add_argument('--requests', type=int, default=300, help='timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=1, help='client threads per scenario')
+    parser.add_argument('--app-log', default=os.devnull, help='where the app\'s JSON request logs go')
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    parser.add_argument('--baseline', help='earlier report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95 growth / rps drop (0.2 = 20%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='ignore p95 changes smaller than this')
+    args = parser.parse_args(argv)
+
+    names = args.scenarios.split(',')
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+    params = {**SCALES[args.scale],
+              **{k: v for k, v in vars(args).items() if k in SCALES[args.scale] and v is not None}}
+    database = args.database or os.getenv('DATABASE_URL', f'sqlite:////tmp/minijira-bench-{args.scale}.db')
+
+    class SuiteConfig(BenchConfig):
+        SQLALCHEMY_DATABASE_URI = database
+
+    # Request logs are still formatted and written, to a file rather than
+    # stdout, which carries the JSON report. Left open until exit.
+    app_log = open(args.app_log, 'a', encoding='utf-8')
+    with contextlib.redirect_stdout(app_log):
+        app = create_app(SuiteConfig)
+    summary = seed(app, params, args.seed, args.reset)
+    with app.app_context():
+        high_water = {model.__tablename__: db.session.scalar(db.select(db.func.coalesce(db.func.max(model.id), 0)))
+                      for model in (Issue, Comment, AuditLog)}
+        ctx = Context()
+        dialect = db.engine.dialect.name
+        if 'issues.update' in names and 'issues.create' not in names:
+            names.insert(names.index('issues.update'), 'issues.create')  # update edits created issues
+
+    report = {
+        'dataset': {**params, **summary},
+        'database': dialect,
+        'requests_per_scenario': args.requests,
+        'concurrency': args.concurrency,
+        'scenarios': {},
+    }
+    try:
+        for name in names:
+            report['scenarios'][name] = run_scenario(app, ctx, name, args.requests, args.warmup,
+                                                     args.concurrency, args.seed)
+            print(f'{name}: {report["scenarios"][name]}', file=sys.stderr)
+    finally:
+        cleanup(app, high_water)
+
+    regressed = False
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            report['comparison'] = compare(report, json.load(f), args.tolerance, args.min_delta_ms)
+        regressed = any(c['regressed'] for c in report['comparison'].values())
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    if regressed:
+        print('regressions: ' + ', '.join(n for n, c in report['comparison'].items() if c['regressed']), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
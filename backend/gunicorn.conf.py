@@ -0,0 +1,82 @@
+"""
+Gunicorn settings for production
+
+    gunicorn run:app            # picks up this file from the working directory
+
+Everything is tunable from the environment:
+
+    GUNICORN_WORKER_CLASS   sync | gthread | gevent          (gthread)
+    GUNICORN_WORKERS        worker processes                 (2 x CPUs + 1)
+                            In a container, CPUs are the node's, not the
+                            pod's limit: set this explicitly there.
+    GUNICORN_THREADS        threads per gthread worker       (4)
+    GUNICORN_WORKER_CONNECTIONS  greenlets per gevent worker (200)
+    GUNICORN_TIMEOUT        seconds before a silent worker is killed (30)
+    GUNICORN_GRACEFUL_TIMEOUT    seconds to finish in-flight requests on reload/stop (30)
+    GUNICORN_MAX_REQUESTS   recycle a worker after this many requests, 0 = never (2000)
+    GUNICORN_PRELOAD        import the app once in the master (true)
+
+Keep workers x (threads or worker connections) in line with the DB pool
+(DB_POOL_SIZE + DB_MAX_OVERFLOW, see app/pool.py) or requests will queue
+on pool checkouts instead of in the listen backlog. Every worker has its
+own pool, so a server opens up to workers x (pool + overflow) connections.
+"""
+import gc
+import multiprocessing
+import os
+
+
+def _env_bool(name, default):
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class not in ('sync', 'gthread', 'gevent'):
+    raise RuntimeError(f'Unsupported GUNICORN_WORKER_CLASS: {worker_class}')
+
+if worker_class == 'gevent':
+    # Patch before the app (and its DB driver) is imported by preload_app
+    from gevent import monkey
+    monkey.patch_all()
+    # psycopg2 is a C extension; without this each query blocks the whole worker
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', '4')) if worker_class == 'gthread' else 1
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '200'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Recycling bounds slow leaks; the jitter keeps workers from restarting together
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = max(max_requests // 10, 0)
+
+preload_app = _env_bool('GUNICORN_PRELOAD', 'true')
+
+# The app logs every request itself (request.completed); only keep errors here
+accesslog = None
+errorlog = '-'
+
+
+def when_ready(server):
+    # Move everything imported so far into the permanent generation, so the
+    # collector in the workers does not touch (and copy) the master's pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Give each worker its own DB connections instead of the master's"""
+    if not preload_app:
+        return
+    from run import app
+    from app.extensions import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    replicas = app.extensions.get('replicas')
+    for replica in (replicas.replicas if replicas else ()):
+        replica.engine.dispose(close=False)
@@ -90,9 +90,18 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # SQLite's FTS5 shadow tables (issues_fts*) are managed by raw DDL in the
+    # search migration, not by the models, so autogenerate must ignore them
+    def include_name(name, type_, parent_names):
+        if type_ == 'table':
+            return not name.startswith('issues_fts')
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_name") is None:
+        conf_args["include_name"] = include_name
 
     connectable = get_engine()
 
@@ -0,0 +1,66 @@
+"""Issue full-text search index
+
+Revision ID: 3c9e1f4a7b2d
+Revises: 715818eed1bf
+Create Date: 2026-10-16 10:12:41.118273
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e1f4a7b2d'
+down_revision = '715818eed1bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # Generated column: Postgres keeps it current on every INSERT/UPDATE
+        op.execute(
+            "ALTER TABLE issues ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+            ") STORED"
+        )
+        op.execute("CREATE INDEX ix_issues_search_vector ON issues USING gin (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE issues_fts USING fts5("
+            "title, description, content='issues', content_rowid='id', "
+            "tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER issues_fts_ai AFTER INSERT ON issues BEGIN "
+            "INSERT INTO issues_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER issues_fts_ad AFTER DELETE ON issues BEGIN "
+            "INSERT INTO issues_fts(issues_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER issues_fts_au AFTER UPDATE OF title, description ON issues BEGIN "
+            "INSERT INTO issues_fts(issues_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO issues_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        # Index the rows that existed before the triggers
+        op.execute("INSERT INTO issues_fts(issues_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_issues_search_vector")
+        op.execute("ALTER TABLE issues DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS issues_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS issues_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS issues_fts_ai")
+        op.execute("DROP TABLE IF EXISTS issues_fts")
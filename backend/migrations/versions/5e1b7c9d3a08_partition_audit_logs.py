@@ -0,0 +1,109 @@
+"""Partition audit_logs by month on Postgres
+
+Revision ID: 5e1b7c9d3a08
+Revises: d2a6c8e4f1b3
+Create Date: 2026-10-16 22:14:38.602417
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1b7c9d3a08'
+down_revision = 'd2a6c8e4f1b3'
+branch_labels = None
+depends_on = None
+
+PREMAKE_MONTHS = 3  # same default as AUDIT_PARTITION_PREMAKE_MONTHS
+INDEXES = [
+    ('ix_audit_logs_timestamp', ['timestamp']),
+    ('ix_audit_logs_issue_timestamp', ['issue_id', 'timestamp', 'id']),
+]
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def upgrade():
+    # The timestamp becomes the partition key, which cannot be NULL
+    op.execute("UPDATE audit_logs SET timestamp = CURRENT_TIMESTAMP WHERE timestamp IS NULL")
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+            batch_op.alter_column('timestamp', existing_type=sa.DateTime(), nullable=False)
+        return
+
+    # Move the plain table aside; its sequence outlives it
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER TABLE audit_logs_unpartitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_unpartitioned_pkey")
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='audit_logs_unpartitioned')
+
+    # A partitioned table's primary key must contain the partition key
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id integer NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            issue_id integer NOT NULL REFERENCES issues (id),
+            user_id integer NOT NULL REFERENCES users (id),
+            action varchar(50) NOT NULL,
+            old_value varchar(255),
+            new_value varchar(255),
+            timestamp timestamp without time zone NOT NULL,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    oldest = op.get_bind().execute(sa.text("SELECT min(timestamp) FROM audit_logs_unpartitioned")).scalar()
+    now = datetime.utcnow()
+    month = datetime((oldest or now).year, (oldest or now).month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), PREMAKE_MONTHS)
+    while month <= last:
+        end = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE audit_logs_p{month:%Y%m} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        month = end
+
+    op.execute("INSERT INTO audit_logs SELECT id, issue_id, user_id, action, old_value, new_value, timestamp "
+               "FROM audit_logs_unpartitioned")
+    op.drop_table('audit_logs_unpartitioned')
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    for name, columns in INDEXES:
+        op.create_index(name, 'audit_logs', columns)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+            batch_op.alter_column('timestamp', existing_type=sa.DateTime(), nullable=True)
+        return
+
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='audit_logs_partitioned')
+    op.execute("ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey TO audit_logs_partitioned_pkey")
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id integer NOT NULL DEFAULT nextval('audit_logs_id_seq') PRIMARY KEY,
+            issue_id integer NOT NULL REFERENCES issues (id),
+            user_id integer NOT NULL REFERENCES users (id),
+            action varchar(50) NOT NULL,
+            old_value varchar(255),
+            new_value varchar(255),
+            timestamp timestamp without time zone
+        )
+    """)
+    # Archived months stay in their files
+    op.execute("INSERT INTO audit_logs SELECT id, issue_id, user_id, action, old_value, new_value, timestamp "
+               "FROM audit_logs_partitioned")
+    op.execute("DROP TABLE audit_logs_partitioned")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    for name, columns in INDEXES:
+        op.create_index(name, 'audit_logs', columns)
@@ -0,0 +1,56 @@
+"""Composite and partial indexes for hot query patterns
+
+Revision ID: 8a41d2c6e5f0
+Revises: 3c9e1f4a7b2d
+Create Date: 2026-10-16 11:02:17.504361
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a41d2c6e5f0'
+down_revision = '3c9e1f4a7b2d'
+branch_labels = None
+depends_on = None
+
+
+ACTIVE = {
+    'postgresql_where': sa.text('is_deleted = false'),
+    'sqlite_where': sa.text('is_deleted = 0'),
+}
+
+# (name, table, columns, extra kwargs)
+INDEXES = [
+    ('ix_issues_active_created', 'issues', ['created_at', 'id'], ACTIVE),
+    ('ix_issues_project_active_created', 'issues', ['project_id', 'created_at', 'id'], ACTIVE),
+    ('ix_issues_project_status_active_created', 'issues', ['project_id', 'status', 'created_at', 'id'], ACTIVE),
+    ('ix_issues_assignee_active_created', 'issues', ['assignee_id', 'created_at', 'id'], ACTIVE),
+    ('ix_comments_issue_created', 'comments', ['issue_id', 'created_at', 'id'], {}),
+    ('ix_audit_logs_issue_timestamp', 'audit_logs', ['issue_id', 'timestamp', 'id'], {}),
+    ('ix_project_members_user_id', 'project_members', ['user_id', 'project_id'], {}),
+    ('ix_projects_owner_id_active', 'projects', ['owner_id'], ACTIVE),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # CONCURRENTLY keeps writes flowing on big tables; it cannot run in a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns, kwargs in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True,
+                                if_not_exists=True, **kwargs)
+    else:
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,47 @@
+"""Project scope and keyset indexes for audit_logs
+
+Revision ID: 9c3d5f7a1e24
+Revises: 5e1b7c9d3a08
+Create Date: 2026-10-16 23:05:51.318842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3d5f7a1e24'
+down_revision = '5e1b7c9d3a08'
+branch_labels = None
+depends_on = None
+
+# Partitioned tables cannot CREATE INDEX CONCURRENTLY; on Postgres each
+# index is built per partition under the parent's lock
+INDEXES = [
+    ('ix_audit_logs_project_timestamp', ['project_id', 'timestamp', 'id']),
+]
+
+
+def upgrade():
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('project_id', sa.Integer(), nullable=True))
+
+    # Issues never change project, so the copy stays correct
+    op.execute(
+        "UPDATE audit_logs SET project_id = "
+        "(SELECT issues.project_id FROM issues WHERE issues.id = audit_logs.issue_id)"
+    )
+
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.alter_column('project_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('audit_logs_project_id_fkey', 'projects', ['project_id'], ['id'])
+        for name, columns in INDEXES:
+            batch_op.create_index(name, columns)
+
+
+def downgrade():
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        for name, _ in reversed(INDEXES):
+            batch_op.drop_index(name)
+        batch_op.drop_constraint('audit_logs_project_id_fkey', type_='foreignkey')
+        batch_op.drop_column('project_id')
@@ -0,0 +1,26 @@
+"""Project version counter for ETags
+
+Revision ID: b7f3e9a1c4d2
+Revises: 8a41d2c6e5f0
+Create Date: 2026-10-16 12:31:55.870214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7f3e9a1c4d2'
+down_revision = '8a41d2c6e5f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('version')
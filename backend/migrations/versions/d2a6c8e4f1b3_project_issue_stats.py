@@ -0,0 +1,44 @@
+"""Per-project issue statistics summary table
+
+Revision ID: d2a6c8e4f1b3
+Revises: b7f3e9a1c4d2
+Create Date: 2026-10-16 13:47:09.215530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6c8e4f1b3'
+down_revision = 'b7f3e9a1c4d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_issue_stats',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('dimension', sa.String(length=20), nullable=False),
+    sa.Column('value', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('project_id', 'dimension', 'value')
+    )
+
+    # Backfill from existing issues (same as `flask rebuild-stats`)
+    for dimension, value in [
+        ('status', 'status'),
+        ('priority', 'priority'),
+        ('assignee', "coalesce(cast(assignee_id as varchar), 'unassigned')"),
+    ]:
+        op.execute(
+            "INSERT INTO project_issue_stats (project_id, dimension, value, count) "
+            f"SELECT project_id, '{dimension}', {value}, count(*) FROM issues "
+            "WHERE is_deleted = false "
+            f"GROUP BY project_id, {value}"
+        )
+
+
+def downgrade():
+    op.drop_table('project_issue_stats')
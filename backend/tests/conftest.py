@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+import pytest
+from werkzeug.security import generate_password_hash
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import User, Project
+from app.auth import generate_token
+
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SECRET_KEY = 'test-secret-key-with-enough-bytes-for-hs256'
+    # N+1 regressions fail the test that triggers them (see app/querywatch.py)
+    QUERY_WATCH = True
+    QUERY_WATCH_STRICT = True
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user and return (user, auth headers)"""
+    def _make_user(email, role='member'):
+        user = User(email=email, password_hash=generate_password_hash('password'), role=role)
+        db.session.add(user)
+        db.session.commit()
+        token = generate_token(user.id, user.email, user.role)
+        return user, {'Authorization': f'Bearer {token}'}
+    return _make_user
+
+
+@pytest.fixture
+def project(app, make_user):
+    """A project owned by alice with bob as a plain member"""
+    alice, alice_headers = make_user('alice@test.com')
+    bob, bob_headers = make_user('bob@test.com')
+    project = Project(name='Website Redesign', owner_id=alice.id)
+    project.members.extend([alice, bob])
+    db.session.add(project)
+    db.session.commit()
+    return SimpleNamespace(
+        id=project.id,
+        owner=alice, owner_headers=alice_headers,
+        member=bob, member_headers=bob_headers,
+    )
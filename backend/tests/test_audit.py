@@ -0,0 +1,112 @@
+import json
+import os
+import time
+from datetime import datetime
+import pytest
+from app import create_app
+from app.audit import sink
+from app.extensions import db
+from app.models import AuditLog
+from .conftest import TestConfig
+
+
+class AsyncAuditConfig(TestConfig):
+    AUDIT_MODE = 'async'
+    AUDIT_BACKGROUND_WRITER = False  # tests decide when to flush
+
+
+@pytest.fixture
+def app(tmp_path):
+    class Config(AsyncAuditConfig):
+        AUDIT_SPOOL_DIR = str(tmp_path / 'spool')
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        yield app
+        sink.shutdown()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_async_audit_rows_are_written_after_commit_by_the_sink(app, client, project):
+    headers = project.owner_headers
+    issue_id = client.post('/api/v1/issues', json={'title': 'T', 'project_id': project.id},
+                           headers=headers).get_json()['id']
+    client.put(f'/api/v1/issues/{issue_id}', json={'status': 'IN_PROGRESS'}, headers=headers)
+
+    spool = sink._spool.name
+    with open(spool) as f:
+        assert [json.loads(line)['action'] for line in f] == ['created', 'status_change']
+
+    sink.flush()
+    assert [a.action for a in AuditLog.query.order_by(AuditLog.id)] == ['created', 'status_change']
+    with open(spool) as f:
+        assert f.read() == ''  # everything spooled is committed
+
+    audit = client.get(f'/api/v1/issues/{issue_id}/audit', headers=headers).get_json()['items']
+    assert {a['action'] for a in audit} == {'created', 'status_change'}
+
+
+def test_rolled_back_requests_leave_no_audit_events(app, client, project):
+    resp = client.put('/api/v1/issues/999', json={'status': 'DONE'}, headers=project.owner_headers)
+    assert resp.status_code == 404
+    sink.flush()
+    assert AuditLog.query.count() == 0
+
+
+def test_spools_of_dead_processes_are_replayed_on_startup(app, project, tmp_path):
+    issue_id = db.session.execute(db.text(
+        "INSERT INTO issues (title, status, priority, project_id, reporter_id, is_deleted) "
+        "VALUES ('T', 'OPEN', 'MEDIUM', :p, :u, 0) RETURNING id"
+    ), {'p': project.id, 'u': project.owner.id}).scalar()
+    db.session.commit()
+    dead_spool = tmp_path / 'spool' / 'audit-999999999.jsonl'
+    dead_spool.write_text(''.join(
+        json.dumps({'issue_id': issue_id, 'user_id': project.owner.id, 'action': action,
+                    'old_value': None, 'new_value': 'OPEN', 'timestamp': '2025-01-01T00:00:00'}) + '\n'
+        for action in ('created', 'assigned')
+    ))
+
+    sink.replay_spools()
+    assert sorted(a.action for a in AuditLog.query) == ['assigned', 'created']
+    assert not dead_spool.exists()
+
+
+def test_replay_skips_spools_claimed_by_a_live_worker(app, project, tmp_path):
+    issue_id = db.session.execute(db.text(
+        "INSERT INTO issues (title, status, priority, project_id, reporter_id, is_deleted) "
+        "VALUES ('T', 'OPEN', 'MEDIUM', :p, :u, 0) RETURNING id"
+    ), {'p': project.id, 'u': project.owner.id}).scalar()
+    db.session.commit()
+    line = json.dumps({'issue_id': issue_id, 'user_id': project.owner.id, 'action': 'created',
+                       'old_value': None, 'new_value': 'OPEN', 'timestamp': '2025-01-01T00:00:00'}) + '\n'
+    spool_dir = tmp_path / 'spool'
+    claimed_by_live = spool_dir / f'audit-999999998.jsonl.replaying.{os.getppid()}'
+    claimed_by_dead = spool_dir / 'audit-999999997.jsonl.replaying.999999999'
+    claimed_by_live.write_text(line)
+    claimed_by_dead.write_text(line)
+
+    sink.replay_spools()
+    assert AuditLog.query.count() == 1
+    assert claimed_by_live.exists() and not claimed_by_dead.exists()
+    assert not list(spool_dir.glob('audit-999999997*'))
+
+
+def test_shutdown_wakes_an_idle_writer_and_flushes(tmp_path):
+    class Config(AsyncAuditConfig):
+        AUDIT_BACKGROUND_WRITER = True
+        AUDIT_FLUSH_INTERVAL = 3600
+        AUDIT_SPOOL_DIR = str(tmp_path / 'spool')
+
+    app = create_app(Config)
+    with app.app_context():
+        db.create_all()
+        sink.enqueue([{'issue_id': 1, 'project_id': 1, 'user_id': 1, 'action': 'created', 'old_value': None,
+                       'new_value': 'OPEN', 'timestamp': datetime.utcnow()}])
+        started = time.monotonic()
+        sink.shutdown()
+        assert time.monotonic() - started < 5
+        assert [a.action for a in AuditLog.query] == ['created']
+        db.session.remove()
+        db.drop_all()
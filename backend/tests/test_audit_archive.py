@@ -0,0 +1,102 @@
+import os
+from datetime import datetime
+import pytest
+from app import create_app
+from app.audit_archive import archive_before, archive_month, iter_archived
+from app.extensions import db
+from app.models import AuditLog
+from .conftest import TestConfig
+
+
+@pytest.fixture
+def app(tmp_path):
+    class ArchiveConfig(TestConfig):
+        AUDIT_ARCHIVE_DIR = str(tmp_path / 'archive')
+
+    app = create_app(ArchiveConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _create_issue(client, project):
+    return client.post('/api/v1/issues', json={'title': 'T', 'project_id': project.id},
+                       headers=project.owner_headers).get_json()['id']
+
+
+def _add_old_logs(issue_id, project_id, user_id, *timestamps):
+    for timestamp in timestamps:
+        db.session.add(AuditLog(issue_id=issue_id, project_id=project_id, user_id=user_id,
+                                action='status_change', old_value=None,
+                                new_value=timestamp.isoformat(), timestamp=timestamp))
+    db.session.commit()
+
+
+def test_old_months_move_to_archive_files(app, client, project):
+    issue_id = _create_issue(client, project)
+    _add_old_logs(issue_id, project.id, project.owner.id,
+                  datetime(2024, 1, 5), datetime(2024, 1, 20), datetime(2024, 2, 3))
+
+    archived = archive_before(datetime(2024, 3, 1), app.config['AUDIT_ARCHIVE_DIR'])
+
+    assert archived == {datetime(2024, 1, 1): 2, datetime(2024, 2, 1): 1}
+    assert sorted(os.listdir(app.config['AUDIT_ARCHIVE_DIR'])) == ['audit-2024-01.csv.gz', 'audit-2024-02.csv.gz']
+    assert [a.action for a in AuditLog.query] == ['created']
+
+    rows = list(iter_archived(issue_id))
+    assert [row['new_value'] for row in rows] == ['2024-02-03T00:00:00', '2024-01-20T00:00:00', '2024-01-05T00:00:00']
+    assert rows[0]['old_value'] is None
+    assert rows[0]['issue_id'] == issue_id
+
+
+def test_rows_archived_twice_are_read_back_once(app, client, project):
+    issue_id = _create_issue(client, project)
+    archive_dir = app.config['AUDIT_ARCHIVE_DIR']
+    os.makedirs(archive_dir)
+    _add_old_logs(issue_id, project.id, project.owner.id, datetime(2024, 1, 5), datetime(2024, 1, 20))
+    ids = [a.id for a in AuditLog.query.filter(AuditLog.timestamp < datetime(2024, 2, 1))]
+
+    # An interrupted run: the file was written but the rows were not removed
+    with db.engine.connect() as connection:
+        archive_month(connection, datetime(2024, 1, 1), archive_dir)
+        connection.rollback()
+    with db.engine.begin() as connection:
+        assert archive_month(connection, datetime(2024, 1, 1), archive_dir) == 2
+
+    assert sorted(os.listdir(archive_dir)) == ['audit-2024-01.1.csv.gz', 'audit-2024-01.csv.gz']
+    assert sorted(row['id'] for row in iter_archived(issue_id)) == sorted(ids)
+
+
+def test_months_outside_the_time_range_are_not_opened(app, client, project):
+    issue_id = _create_issue(client, project)
+    archive_dir = app.config['AUDIT_ARCHIVE_DIR']
+    _add_old_logs(issue_id, project.id, project.owner.id,
+                  datetime(2024, 1, 5), datetime(2024, 2, 3), datetime(2024, 3, 9))
+    archive_before(datetime(2024, 4, 1), archive_dir)
+    for month in ('2024-01', '2024-03'):
+        with open(os.path.join(archive_dir, f'audit-{month}.csv.gz'), 'wb') as archive:
+            archive.write(b'not gzip')  # reading either would raise
+
+    rows = list(iter_archived(issue_id, since=datetime(2024, 2, 1), until=datetime(2024, 3, 1)))
+    assert [row['new_value'] for row in rows] == ['2024-02-03T00:00:00']
+
+
+def test_audit_endpoint_streams_archived_rows_on_request(app, client, project):
+    issue_id = _create_issue(client, project)
+    other_id = _create_issue(client, project)
+    _add_old_logs(issue_id, project.id, project.owner.id, datetime(2024, 1, 5))
+    _add_old_logs(other_id, project.id, project.owner.id, datetime(2024, 1, 6))
+    archive_before(datetime(2024, 2, 1), app.config['AUDIT_ARCHIVE_DIR'])
+    url = f'/api/v1/issues/{issue_id}/audit'
+
+    live = client.get(url, headers=project.member_headers).get_json()['items']
+    assert [a['action'] for a in live] == ['created']
+
+    resp = client.get(f'{url}?archived=true', headers=project.member_headers)
+    assert resp.status_code == 200
+    assert resp.is_streamed
+    assert [(a['action'], a['issue_id']) for a in resp.get_json()] == [
+        ('created', issue_id), ('status_change', issue_id)
+    ]
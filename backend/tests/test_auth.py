@@ -0,0 +1,12 @@
+from app.auth import decode_token_cached, generate_token, token_cache
+
+
+def test_verified_tokens_are_cached_until_exp(app):
+    token = generate_token(1, 'a@test.com', 'member')
+    assert decode_token_cached(token)['user_id'] == 1
+    hits = token_cache.stats()['hits']
+    assert decode_token_cached(token)['user_id'] == 1
+    assert token_cache.stats()['hits'] == hits + 1
+
+    assert decode_token_cached(token + 'x') is None
+    assert token_cache.stats()['size'] == 1  # failed verifications are not cached
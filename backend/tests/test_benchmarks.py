@@ -0,0 +1,44 @@
+import json
+import sqlite3
+import pytest
+from benchmarks import suite
+
+
+def _run(capsys, database, *extra):
+    suite.main(['--database', database, '--users', '6', '--projects', '2', '--issues-per-project', '5',
+                '--comments-per-issue', '1', '--audit-per-issue', '1', '--requests', '3', '--warmup', '0',
+                *extra])
+    return json.loads(capsys.readouterr().out)
+
+
+def test_every_scenario_runs_cleanly_and_leaves_the_dataset_unchanged(tmp_path, capsys):
+    path = tmp_path / 'bench.db'
+    report = _run(capsys, f'sqlite:///{path}')
+
+    assert set(report['scenarios']) == set(suite.SCENARIOS)
+    for name, result in report['scenarios'].items():
+        assert result['errors'] == 0, name
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+    assert report['dataset']['issues'] == 10
+
+    with sqlite3.connect(path) as conn:
+        counts = [conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                  for table in ('issues', 'comments', 'audit_logs')]
+    assert counts == [10, 10, 10]
+
+
+def test_baseline_comparison_flags_slower_scenarios(tmp_path, capsys):
+    database = f'sqlite:///{tmp_path / "bench.db"}'
+    baseline = _run(capsys, database, '--scenarios', 'issues.get,auth.me')
+    for result in baseline['scenarios'].values():
+        result['p95_ms'] /= 100
+    baseline['scenarios']['auth.me'].update(p95_ms=1e6, rps=0)
+    baseline_path = tmp_path / 'baseline.json'
+    baseline_path.write_text(json.dumps(baseline))
+
+    with pytest.raises(SystemExit) as exit_info:
+        _run(capsys, database, '--scenarios', 'issues.get,auth.me', '--baseline', str(baseline_path),
+             '--min-delta-ms', '0')
+    assert exit_info.value.code == 1
+    comparison = json.loads(capsys.readouterr().out)['comparison']
+    assert comparison['issues.get']['regressed'] and not comparison['auth.me']['regressed']
@@ -0,0 +1,401 @@
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.extensions import db
+from app.models import Issue, AuditLog, Comment
+
+
+def _seed_issues(project, count, **fields):
+    base = datetime(2025, 1, 1)
+    for n in range(count):
+        db.session.add(Issue(
+            title=f'Issue {n}',
+            project_id=project.id,
+            reporter_id=project.owner.id,
+            # Pairs of issues share a timestamp so the id tiebreaker is exercised
+            created_at=base + timedelta(minutes=n // 2),
+            **fields
+        ))
+    db.session.commit()
+
+
+def test_list_issues_without_limit_returns_plain_list(client, project):
+    _seed_issues(project, 3)
+    resp = client.get(f'/api/v1/issues?project_id={project.id}', headers=project.owner_headers)
+    assert resp.status_code == 200
+    assert len(resp.get_json()) == 3
+
+
+def test_list_issues_cursor_walks_every_issue_once(client, project):
+    _seed_issues(project, 7)
+    seen, cursor = [], None
+    while True:
+        url = f'/api/v1/issues?project_id={project.id}&limit=3'
+        if cursor:
+            url += f'&cursor={cursor}'
+        body = client.get(url, headers=project.owner_headers).get_json()
+        assert 'total' not in body
+        seen.extend(i['id'] for i in body['items'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+    expected = [i.id for i in Issue.query.order_by(Issue.created_at.desc(), Issue.id.desc())]
+    assert seen == expected
+
+
+def test_list_issues_cursor_keeps_filters_and_counts_on_request(client, project):
+    _seed_issues(project, 4, status='OPEN')
+    _seed_issues(project, 2, status='DONE')
+    url = f'/api/v1/issues?project_id={project.id}&status=OPEN&limit=3&include_total=true'
+    body = client.get(url, headers=project.owner_headers).get_json()
+    assert body['total'] == 4
+    assert all(i['status'] == 'OPEN' for i in body['items'])
+
+    body = client.get(url + f'&cursor={body["next_cursor"]}', headers=project.owner_headers).get_json()
+    assert len(body['items']) == 1
+    assert body['next_cursor'] is None
+
+
+def test_list_issues_rejects_garbage_cursor(client, project):
+    resp = client.get('/api/v1/issues?cursor=not-a-cursor', headers=project.owner_headers)
+    assert resp.status_code == 400
+
+
+def test_cursor_from_another_ordering_is_rejected(client, project):
+    for i in range(3):
+        db.session.add(Issue(title=f'Crash report {i}', project_id=project.id, reporter_id=project.owner.id))
+    db.session.commit()
+    url = f'/api/v1/issues?project_id={project.id}&limit=1'
+    rank_cursor = client.get(url + '&search=crash', headers=project.owner_headers).get_json()['next_cursor']
+    date_cursor = client.get(url, headers=project.owner_headers).get_json()['next_cursor']
+    assert rank_cursor and date_cursor
+
+    resp = client.get(url + f'&cursor={rank_cursor}', headers=project.owner_headers)
+    assert resp.status_code == 400 and resp.get_json()['error'] == 'Invalid cursor'
+    resp = client.get(url + f'&search=crash&cursor={date_cursor}', headers=project.owner_headers)
+    assert resp.status_code == 400
+    resp = client.get(f'/api/v1/projects/{project.id}/members?cursor={date_cursor}',
+                      headers=project.owner_headers)
+    assert resp.status_code == 400
+
+
+def test_search_is_ranked_prefix_matched_and_filtered(client, project):
+    for title, description, status in [
+        ('Login page crashes', 'Authentication fails on submit', 'OPEN'),
+        ('Update footer', 'Mention authentication provider in the footer', 'OPEN'),
+        ('Authentication rewrite', 'Move authentication to JWT', 'DONE'),
+        ('Dark mode', 'Unrelated', 'OPEN'),
+    ]:
+        db.session.add(Issue(title=title, description=description, status=status,
+                             project_id=project.id, reporter_id=project.owner.id))
+    db.session.commit()
+
+    url = f'/api/v1/issues?project_id={project.id}&search=authent'
+    results = client.get(url, headers=project.owner_headers).get_json()
+    assert [i['title'] for i in results][0] == 'Authentication rewrite'
+    assert len(results) == 3
+    assert '<mark>' in results[0]['search_snippet']
+
+    db.session.add(Issue(title='<img src=x onerror=alert(1)> authentication', project_id=project.id,
+                         reporter_id=project.owner.id))
+    db.session.commit()
+    snippets = [i['search_snippet'] for i in client.get(url, headers=project.owner_headers).get_json()]
+    assert any('&lt;img src=x onerror=alert(1)&gt; <mark>authentication</mark>' in s for s in snippets)
+    assert not any('<img' in s for s in snippets)
+    db.session.delete(Issue.query.filter(Issue.title.like('<img%')).one())
+    db.session.commit()
+
+    results = client.get(url + '&status=OPEN', headers=project.owner_headers).get_json()
+    assert {i['title'] for i in results} == {'Login page crashes', 'Update footer'}
+
+    issue = Issue.query.filter_by(title='Dark mode').one()
+    issue.description = 'Authentication screen needs a dark theme'
+    db.session.commit()
+    results = client.get(url + '&status=OPEN&limit=2', headers=project.owner_headers).get_json()
+    assert len(results['items']) == 2
+    rest = client.get(url + f'&status=OPEN&limit=2&cursor={results["next_cursor"]}',
+                      headers=project.owner_headers).get_json()
+    assert len(rest['items']) == 1 and rest['next_cursor'] is None
+
+
+def test_list_issues_streams_json_array_and_ndjson(client, project):
+    _seed_issues(project, 5)
+    url = f'/api/v1/issues?project_id={project.id}'
+    expected = client.get(url, headers=project.owner_headers).get_json()
+
+    resp = client.get(url + '&stream=true', headers=project.owner_headers)
+    assert resp.is_streamed
+    assert resp.get_json() == expected
+
+    headers = dict(project.owner_headers, Accept='application/x-ndjson')
+    resp = client.get(url, headers=headers)
+    assert resp.mimetype == 'application/x-ndjson'
+    lines = resp.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == expected
+
+
+def test_list_issues_sparse_fields_select_only_requested_columns(app, client, project):
+    _seed_issues(project, 3, description='x' * 1000)
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    url = f'/api/v1/issues?project_id={project.id}&fields=title,status&limit=2'
+    body = client.get(url, headers=project.owner_headers).get_json()
+    assert [set(i) for i in body['items']] == [{'id', 'title', 'status'}] * 2
+    assert body['next_cursor']
+    assert not any('issues.description' in s for s in statements)
+
+    resp = client.get('/api/v1/issues?fields=title,secret', headers=project.owner_headers)
+    assert resp.status_code == 400
+
+
+def test_issue_reads_answer_304_until_something_changes(client, project, make_user):
+    headers = project.owner_headers
+    issue_id = client.post('/api/v1/issues', json={'title': 'T', 'project_id': project.id},
+                           headers=headers).get_json()['id']
+
+    urls = [f'/api/v1/issues/{issue_id}', f'/api/v1/issues?project_id={project.id}',
+            f'/api/v1/projects/{project.id}']
+    etags = {url: client.get(url, headers=headers).headers['ETag'] for url in urls}
+    for url, etag in etags.items():
+        resp = client.get(url, headers=dict(headers, **{'If-None-Match': etag}))
+        assert resp.status_code == 304 and resp.get_data() == b''
+
+    # A validator does not let an outsider skip the membership check
+    _, outsider_headers = make_user('mallory@test.com')
+    for url, etag in etags.items():
+        resp = client.get(url, headers=dict(outsider_headers, **{'If-None-Match': etag}))
+        assert resp.status_code != 304 and 'ETag' not in resp.headers, url
+
+    # A comment changes the issue detail; membership changes the project
+    client.post('/api/v1/comments', json={'content': 'hi', 'issue_id': issue_id}, headers=headers)
+    carol, _ = make_user('carol@test.com')
+    client.post(f'/api/v1/projects/{project.id}/members', json={'user_id': carol.id}, headers=headers)
+    for url, etag in etags.items():
+        resp = client.get(url, headers=dict(headers, **{'If-None-Match': etag}))
+        assert resp.status_code == 200
+        assert resp.headers['ETag'] != etag
+
+
+def test_bulk_create_reports_per_item_results(client, project, make_user):
+    outsider, _ = make_user('eve@test.com')
+    other_project = client.post('/api/v1/projects', json={'name': 'Other'},
+                                headers=make_user('dave@test.com')[1]).get_json()['id']
+    payload = [
+        {'title': 'One', 'project_id': project.id, 'assignee_id': project.member.id},
+        {'title': 'Two', 'project_id': project.id, 'priority': 'HIGH'},
+        {'project_id': project.id},
+        {'title': 'Bad assignee', 'project_id': project.id, 'assignee_id': outsider.id},
+        {'title': 'Missing', 'project_id': 9999},
+        {'title': 'Not mine', 'project_id': other_project},
+        {'title': 'Typo', 'project_id': project.id, 'assignee_id': 'bob'},
+        {'title': 'Typo', 'project_id': 'alpha'},
+    ]
+    resp = client.post('/api/v1/issues/bulk', json=payload, headers=project.owner_headers)
+    assert resp.status_code == 207
+    body = resp.get_json()
+    assert [r['status'] for r in body['results']] == [201, 201, 400, 400, 404, 403, 400, 400]
+    assert body['results'][6]['error'] == 'assignee_id must be an id or null'
+    assert body['created'] == 2 and body['failed'] == 6
+    assert body['results'][0]['issue']['assignee_id'] == project.member.id
+
+    created_ids = [r['issue']['id'] for r in body['results'][:2]]
+    assert [a.action for a in AuditLog.query.filter(AuditLog.issue_id.in_(created_ids))] == ['created'] * 2
+    stats = client.get(f'/api/v1/projects/{project.id}/stats', headers=project.owner_headers).get_json()
+    assert stats['by_priority'] == {'MEDIUM': 1, 'HIGH': 1}
+
+
+def test_bulk_create_rejects_malformed_items_without_failing_the_batch(client, project):
+    payload = [
+        {'title': 'Fine', 'project_id': project.id, 'priority': 'LOW'},
+        {'title': 'Null priority', 'project_id': project.id, 'priority': None},
+        {'title': {'nested': 'dict'}, 'project_id': project.id},
+        {'title': 'x' * 256, 'project_id': project.id},
+        {'title': 'Odd status', 'project_id': project.id, 'status': 'WONTFIX'},
+        {'title': 'Also fine', 'project_id': project.id, 'status': 'IN_PROGRESS'},
+    ]
+    resp = client.post('/api/v1/issues/bulk', json=payload, headers=project.owner_headers)
+    assert resp.status_code == 207
+    results = resp.get_json()['results']
+    assert [r['status'] for r in results] == [201, 400, 400, 400, 400, 201]
+    assert results[1]['error'].startswith('priority must be one of')
+    assert results[2]['error'] == 'title must be a non-empty string'
+    assert results[3]['error'] == 'title must be at most 255 characters'
+
+    resp = client.post('/api/v1/issues', json={'title': 'Single', 'project_id': project.id, 'priority': None},
+                       headers=project.owner_headers)
+    assert resp.status_code == 400
+
+
+def test_batch_update_checks_rules_per_issue(client, project):
+    headers = project.member_headers
+    member_id = project.member.id
+    ids = [
+        client.post('/api/v1/issues', json={'title': f'Issue {n}', 'project_id': project.id,
+                                            'assignee_id': assignee}, headers=headers).get_json()['id']
+        for n, assignee in enumerate([member_id, member_id, None])
+    ]
+    client.patch('/api/v1/issues/batch', json={'issue_ids': ids, 'changes': {'status': 'IN_PROGRESS'}},
+                 headers=headers)
+
+    resp = client.patch('/api/v1/issues/batch', json={'issue_ids': ids + [9999], 'changes': {'status': 'DONE'}},
+                        headers=headers)
+    assert resp.status_code == 207
+    body = resp.get_json()
+    assert [r['status'] for r in body['results']] == [200, 200, 400, 404]
+    assert body['results'][0]['issue']['status'] == 'DONE'
+    assert body['results'][2]['error'] == 'Only the assignee can move an issue to DONE'
+
+    actions = [a.action for a in AuditLog.query.filter_by(issue_id=ids[0]).order_by(AuditLog.id)]
+    assert actions == ['created', 'status_change', 'status_change']
+    stats = client.get(f'/api/v1/projects/{project.id}/stats', headers=headers).get_json()
+    assert stats['by_status'] == {'DONE': 2, 'IN_PROGRESS': 1}
+
+    resp = client.patch('/api/v1/issues/batch', json={'issue_ids': ids, 'changes': {'title': 'x'}},
+                        headers=headers)
+    assert resp.status_code == 400
+
+
+def test_batch_update_rejects_malformed_ids_and_writes_one_update(app, client, project):
+    headers = project.owner_headers
+    ids = [client.post('/api/v1/issues', json={'title': f'Issue {n}', 'project_id': project.id},
+                       headers=headers).get_json()['id'] for n in range(3)]
+
+    for issue_ids in ('12', ['1', '2'], [1.5], [True], {'1': 1}, list(range(1, 1002))):
+        resp = client.patch('/api/v1/issues/batch', json={'issue_ids': issue_ids, 'changes': {'priority': 'HIGH'}},
+                            headers=headers)
+        assert resp.status_code == 400, issue_ids
+    resp = client.patch('/api/v1/issues/batch', json={'issue_ids': ids, 'changes': {'priority': 'URGENT'}},
+                        headers=headers)
+    assert resp.status_code == 400
+    assert Issue.query.filter(Issue.priority != 'MEDIUM').count() == 0
+
+    updates = []
+    listener = lambda conn, cursor, statement, *args: statement.startswith('UPDATE issues') and updates.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        resp = client.patch('/api/v1/issues/batch', json={
+            'issue_ids': ids, 'changes': {'priority': 'HIGH', 'assignee_id': project.member.id, 'status': 'IN_PROGRESS'}
+        }, headers=headers)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert resp.status_code == 200
+    assert len(updates) == 1
+    assert {(i.priority, i.assignee_id, i.status) for i in Issue.query.all()} == {('HIGH', project.member.id, 'IN_PROGRESS')}
+
+
+def _count_queries(app, fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        fn()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return len(statements)
+
+
+def test_get_issue_query_count_does_not_grow_with_comments(app, client, project, make_user):
+    headers = project.owner_headers
+    issue_id = client.post('/api/v1/issues', json={'title': 'T', 'project_id': project.id},
+                           headers=headers).get_json()['id']
+    url = f'/api/v1/issues/{issue_id}'
+    # Distinct authors, so a per-comment author lazy load cannot hide in the identity map
+    author_ids = [make_user(f'author{n}@test.com')[0].id for n in range(10)]
+
+    def add_comments(count):
+        for n in range(count):
+            db.session.add(Comment(content=f'c{n}', issue_id=issue_id, author_id=author_ids[n % len(author_ids)]))
+        db.session.commit()
+        db.session.expunge_all()
+
+    add_comments(1)
+    client.get(url, headers=headers)  # warm the token and membership caches
+    with_one = _count_queries(app, lambda: client.get(url, headers=headers))
+
+    add_comments(30)
+    with_many = _count_queries(app, lambda: client.get(url, headers=headers))
+    assert len(client.get(url, headers=headers).get_json()['comments']) == 20
+    assert with_many == with_one <= 3
+
+
+def _seed_comments(issue_id, author_id, count):
+    base = datetime(2025, 1, 1)
+    for n in range(count):
+        db.session.add(Comment(content=f'c{n}', issue_id=issue_id, author_id=author_id,
+                               created_at=base + timedelta(minutes=n // 2)))
+    db.session.commit()
+
+
+def test_get_issue_embeds_latest_comments_with_cursor_to_older(client, project):
+    headers = project.owner_headers
+    issue_id = client.post('/api/v1/issues', json={'title': 'T', 'project_id': project.id},
+                           headers=headers).get_json()['id']
+    _seed_comments(issue_id, project.owner.id, 9)
+    Comment.query.filter_by(content='c8').update({'is_deleted': True})
+    db.session.commit()
+
+    body = client.get(f'/api/v1/issues/{issue_id}?comments_limit=3', headers=headers).get_json()
+    assert [c['content'] for c in body['comments']] == ['c5', 'c6', 'c7']
+
+    older = client.get(f'/api/v1/issues/{issue_id}/comments?limit=10&cursor={body["comments_next_cursor"]}',
+                       headers=headers).get_json()
+    assert [c['content'] for c in older['items']] == ['c4', 'c3', 'c2', 'c1', 'c0']
+    assert older['next_cursor'] is None
+
+
+def test_list_issue_comments_pages_newest_first(client, project, make_user):
+    issue_id = client.post('/api/v1/issues', json={'title': 'T', 'project_id': project.id},
+                           headers=project.owner_headers).get_json()['id']
+    _seed_comments(issue_id, project.owner.id, 5)
+    url = f'/api/v1/issues/{issue_id}/comments?limit=2&include_total=true'
+
+    body = client.get(url, headers=project.member_headers).get_json()
+    assert body['total'] == 5
+    assert [c['content'] for c in body['items']] == ['c4', 'c3']
+    assert body['items'][0]['author_email'] == project.owner.email
+
+    _, outsider_headers = make_user('outsider@test.com')
+    assert client.get(url, headers=outsider_headers).status_code == 403
+
+
+def _seed_audit(project, issue, count):
+    base = datetime(2025, 1, 1)
+    for n in range(count):
+        db.session.add(AuditLog(
+            issue_id=issue.id, project_id=project.id,
+            user_id=project.member.id if n % 2 else project.owner.id,
+            action='assigned' if n % 3 == 0 else 'status_change',
+            # Pairs of rows share a timestamp so the id tiebreaker is exercised
+            timestamp=base + timedelta(days=n // 2)
+        ))
+    db.session.commit()
+
+
+def test_issue_audit_pages_newest_first_with_filters(client, project):
+    _seed_issues(project, 1)
+    issue = Issue.query.one()
+    _seed_audit(project, issue, 9)
+    url = f'/api/v1/issues/{issue.id}/audit?limit=4'
+
+    seen, cursor = [], None
+    while True:
+        page_url = url + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(page_url, headers=project.owner_headers).get_json()
+        seen.extend((a['timestamp'], a['id']) for a in body['items'])
+        cursor = body['next_cursor']
+        if not cursor:
+            break
+    assert seen == sorted(seen, reverse=True) and len(set(seen)) == 9
+
+    body = client.get(f'{url}&action=assigned&user_id={project.owner.id}&include_total=true',
+                      headers=project.owner_headers).get_json()
+    assert body['total'] == 2  # n = 0, 6
+    assert {(a['action'], a['user_id']) for a in body['items']} == {('assigned', project.owner.id)}
+
+    body = client.get(f'{url}&since=2025-01-02T00:00:00&until=2025-01-04T00:00:00&include_total=true',
+                      headers=project.owner_headers).get_json()
+    assert body['total'] == 4
+    assert client.get(f'{url}&since=yesterday', headers=project.owner_headers).status_code == 400
+    assert client.get(f'{url}&user_id=abc', headers=project.owner_headers).status_code == 400
@@ -0,0 +1,63 @@
+import logging
+import threading
+from app.logs import BoundedQueueHandler, LOG_RECORDS, SamplingFilter, parse_sample_rates
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.getMessage(), threading.current_thread()))
+
+
+def _logger(handler):
+    logger = logging.getLogger('test.logs')
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def test_sampling_is_per_event_and_never_drops_warnings():
+    collect = _Collect()
+    collect.addFilter(SamplingFilter(parse_sample_rates('issues.list=0, request.completed=1')))
+    logger = _logger(collect)
+    before = LOG_RECORDS.labels('sampled_out')._value.get()
+
+    logger.info('issues.list')
+    logger.warning('issues.list')
+    logger.info('request.completed')
+    logger.info('issues.get')
+
+    assert [msg for msg, _ in collect.records] == ['issues.list', 'request.completed', 'issues.get']
+    assert LOG_RECORDS.labels('sampled_out')._value.get() == before + 1
+
+
+def test_queue_handler_writes_from_the_listener_thread():
+    collect = _Collect()
+    handler = BoundedQueueHandler(100, collect)
+    logger = _logger(handler)
+
+    logger.info('issues.list %s', 'formatted later')
+    handler.stop()
+
+    [(message, thread)] = collect.records
+    assert message == 'issues.list formatted later'
+    assert thread is not threading.current_thread()
+
+
+def test_full_queue_drops_and_counts_instead_of_blocking():
+    collect = _Collect()
+    handler = BoundedQueueHandler(2, collect)
+    handler._ensure_listener()
+    handler.listener.stop()  # nobody drains the queue
+    logger = _logger(handler)
+    before = LOG_RECORDS.labels('dropped')._value.get()
+
+    for _ in range(5):
+        logger.info('issues.list')
+
+    assert handler.queue.qsize() == 2
+    assert LOG_RECORDS.labels('dropped')._value.get() == before + 3
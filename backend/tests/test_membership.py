@@ -0,0 +1,37 @@
+import time
+from app import membership
+from app.cache import TTLCache
+
+
+def test_membership_cache_hits_and_invalidation(client, project, make_user):
+    carol, carol_headers = make_user('carol@test.com')
+    url = f'/api/v1/projects/{project.id}'
+    cache = membership.cache
+
+    assert client.get(url, headers=carol_headers).status_code == 403
+    misses = cache.stats()['misses']
+    assert client.get(url, headers=carol_headers).status_code == 403
+    assert cache.stats()['misses'] == misses  # negative answer served from the LRU
+
+    client.post(f'{url}/members', json={'user_id': carol.id}, headers=project.owner_headers)
+    assert client.get(url, headers=carol_headers).status_code == 200
+
+    client.delete(f'{url}/members/{carol.id}', headers=project.owner_headers)
+    assert client.get(url, headers=carol_headers).status_code == 403
+
+
+def test_ttl_cache_is_bounded_lru():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set((1, 1), True)
+    cache.set((1, 2), False)
+    assert cache.get((1, 1)) is True
+    cache.set((1, 3), True)  # evicts (1, 2), the least recently used
+    assert cache.get((1, 2)) is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    cache.invalidate(lambda key: key[0] == 1)
+    assert cache.stats()['size'] == 0
+
+    cache.set((2, 1), True, expires_at=time.time() - 1)
+    assert cache.get((2, 1)) is None
+
@@ -0,0 +1,45 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import NullPool
+from app.pool import InstrumentedQueuePool, engine_options, instrument
+from .conftest import TestConfig
+
+
+def _config(**overrides):
+    config = {k: getattr(TestConfig, k) for k in dir(TestConfig) if k.startswith('DB_')}
+    config.update(overrides)
+    return config
+
+
+def test_engine_options_follow_backend_and_pgbouncer_mode():
+    assert engine_options(_config(), 'sqlite://') == {}
+
+    options = engine_options(_config(DB_POOL_SIZE=3, DB_MAX_OVERFLOW=2), 'postgresql://u:p@db/minijira')
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert (options['pool_size'], options['max_overflow'], options['pool_pre_ping']) == (3, 2, True)
+
+    bouncer = _config(DB_PGBOUNCER=True)
+    assert engine_options(bouncer, 'postgresql+psycopg2://u:p@db/minijira') == {'poolclass': NullPool}
+    assert engine_options(bouncer, 'postgresql+psycopg://u:p@db/minijira')['connect_args'] == {'prepare_threshold': None}
+
+
+def test_pool_metrics_track_checkouts_overflow_and_timeouts(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "pool.db"}', poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    instrument(engine, 'test')
+    sample = lambda name: REGISTRY.get_sample_value(name, {'engine': 'test'}) or 0
+
+    timeouts_before = sample('db_pool_checkout_timeouts_total')
+    held = engine.connect()
+    assert sample('db_pool_checked_out') == 1
+    with pytest.raises(PoolTimeout):
+        engine.connect()
+    assert sample('db_pool_checkout_timeouts_total') == timeouts_before + 1
+
+    held.close()
+    assert sample('db_pool_checked_out') == 0
+    assert sample('db_pool_connection_hold_seconds_count') >= 1
+    assert sample('db_pool_checkout_wait_seconds_count') >= 2
+    engine.dispose()
@@ -0,0 +1,67 @@
+import time
+import pytest
+from app import create_app
+from app.extensions import db
+from .conftest import TestConfig
+
+
+@pytest.fixture
+def app(tmp_path):
+    class ProfilingConfig(TestConfig):
+        PROFILING_ENABLED = True
+        PROFILE_INTERVAL_MS = 1
+        PROFILE_DIR = str(tmp_path)
+        PROFILE_MAX_FILES = 2
+
+    app = create_app(ProfilingConfig)
+
+    @app.route('/test/busy')
+    def busy():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {'ok': True}
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_admin_header_profiles_a_request_and_admins_can_download_it(client, make_user):
+    _, admin_headers = make_user('admin@test.com', role='admin')
+    _, member_headers = make_user('member@test.com')
+
+    client.get('/test/busy', headers={**member_headers, 'X-Profile': '1'})
+    assert client.get('/api/v1/admin/profiles', headers=admin_headers).get_json() == []
+
+    client.get('/test/busy', headers={**admin_headers, 'X-Profile': '1'})
+    [meta] = client.get('/api/v1/admin/profiles', headers=admin_headers).get_json()
+    assert meta['path'] == '/test/busy' and meta['trigger'] == 'header' and meta['samples'] > 0
+
+    scope = client.get(f'/api/v1/admin/profiles/{meta["id"]}', headers=admin_headers).get_json()
+    names = {frame['name'] for frame in scope['shared']['frames']}
+    assert 'busy' in names and scope['profiles'][0]['type'] == 'sampled'
+
+    folded = client.get(f'/api/v1/admin/profiles/{meta["id"]}?format=collapsed', headers=admin_headers)
+    assert 'busy (test_profiling.py:' in folded.get_data(as_text=True)
+
+    assert client.get('/api/v1/admin/profiles', headers=member_headers).status_code == 403
+    assert client.get('/api/v1/admin/profiles/..%2F..%2Fetc', headers=admin_headers).status_code == 404
+
+
+def test_sampling_rate_profiles_anonymous_requests_and_prunes_old_ones(app, client, make_user):
+    _, admin_headers = make_user('admin@test.com', role='admin')
+    app.config['PROFILE_SAMPLE_RATE'] = 1.0
+    for _ in range(3):
+        client.get('/health')
+
+    profiles = client.get('/api/v1/admin/profiles', headers=admin_headers).get_json()
+    assert [p['trigger'] for p in profiles] == ['sampled', 'sampled']  # PROFILE_MAX_FILES
+
+
+def test_disabled_profiling_registers_no_hooks():
+    app = create_app(TestConfig)
+    hooks = [f.__module__ for funcs in app.before_request_funcs.values() for f in funcs]
+    assert 'app.profiling' not in hooks
@@ -0,0 +1,99 @@
+from app.extensions import db
+from app.stats import get_project_stats, rebuild_project_stats
+
+
+def test_project_stats_follow_issue_writes_and_match_rebuild(client, project):
+    headers = project.owner_headers
+    member_id = project.member.id
+    ids = [
+        client.post('/api/v1/issues', json={'title': f'Issue {n}', 'project_id': project.id,
+                                            'priority': priority, 'assignee_id': assignee},
+                    headers=headers).get_json()['id']
+        for n, (priority, assignee) in enumerate([('HIGH', member_id), ('LOW', None), ('HIGH', None)])
+    ]
+    client.put(f'/api/v1/issues/{ids[0]}', json={'status': 'IN_PROGRESS'}, headers=project.member_headers)
+    client.put(f'/api/v1/issues/{ids[0]}', json={'status': 'DONE'}, headers=project.member_headers)
+    client.put(f'/api/v1/issues/{ids[1]}', json={'assignee_id': member_id, 'priority': 'CRITICAL'},
+               headers=headers)
+    client.delete(f'/api/v1/issues/{ids[2]}', headers=headers)
+
+    stats = client.get(f'/api/v1/projects/{project.id}/stats', headers=headers).get_json()
+    assert stats['total'] == 2 and stats['open'] == 1 and stats['closed'] == 1
+    assert stats['by_status'] == {'DONE': 1, 'OPEN': 1}
+    assert stats['by_priority'] == {'HIGH': 1, 'CRITICAL': 1}
+    assert stats['by_assignee'] == {str(member_id): 2}
+
+    rebuild_project_stats()
+    db.session.commit()
+    assert get_project_stats(project.id) == stats
+
+
+def test_project_stats_require_membership(client, project, make_user):
+    _, outsider_headers = make_user('eve@test.com')
+    resp = client.get(f'/api/v1/projects/{project.id}/stats', headers=outsider_headers)
+    assert resp.status_code == 403
+
+
+def test_list_projects_returns_counts_for_owned_and_member_projects(client, project, make_user):
+    headers = project.owner_headers
+    for n, status in enumerate(['OPEN', 'IN_PROGRESS', 'DONE']):
+        issue = client.post('/api/v1/issues', json={'title': f'Issue {n}', 'project_id': project.id,
+                                                    'assignee_id': project.owner.id},
+                            headers=headers).get_json()
+        if status != 'OPEN':
+            client.put(f'/api/v1/issues/{issue["id"]}', json={'status': 'IN_PROGRESS'}, headers=headers)
+        if status == 'DONE':
+            client.put(f'/api/v1/issues/{issue["id"]}', json={'status': 'DONE'}, headers=headers)
+    client.post('/api/v1/projects', json={'name': 'Other'}, headers=make_user('x@test.com')[1])
+
+    listed = client.get('/api/v1/projects', headers=project.member_headers).get_json()
+    assert [p['id'] for p in listed] == [project.id]
+    assert listed[0]['member_count'] == 2
+    assert listed[0]['open_issue_count'] == 2
+    assert 'members' not in listed[0]
+
+    sparse = client.get('/api/v1/projects?fields=name,member_count', headers=headers).get_json()
+    assert sparse == [{'id': project.id, 'name': listed[0]['name'], 'member_count': 2}]
+
+
+def test_project_members_are_opt_in_and_paginated(client, project, make_user):
+    headers = project.owner_headers
+    url = f'/api/v1/projects/{project.id}'
+    for n in range(3):
+        user, _ = make_user(f'm{n}@test.com')
+        assert client.post(f'{url}/members', json={'user_id': user.id}, headers=headers).status_code == 200
+    assert client.post(f'{url}/members', json={'user_id': user.id}, headers=headers).status_code == 400
+
+    assert 'members' not in client.get(url, headers=headers).get_json()
+    assert len(client.get(f'{url}?include_members=true', headers=headers).get_json()['members']) == 5
+
+    seen, cursor = [], None
+    while True:
+        page = client.get(f'{url}/members?limit=2' + (f'&cursor={cursor}' if cursor else ''),
+                          headers=headers).get_json()
+        seen.extend(m['id'] for m in page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert sorted(seen) == sorted({project.owner.id, project.member.id, *range(user.id - 2, user.id + 1)})
+
+    assert client.delete(f'{url}/members/{user.id}', headers=headers).status_code == 204
+    assert client.get(f'{url}/members?include_total=true', headers=headers).get_json()['total'] == 4
+
+
+def test_project_audit_spans_issues_and_requires_membership(client, project, make_user):
+    headers = project.owner_headers
+    for title in ('A', 'B'):
+        issue_id = client.post('/api/v1/issues', json={'title': title, 'project_id': project.id},
+                               headers=headers).get_json()['id']
+    client.put(f'/api/v1/issues/{issue_id}', json={'status': 'IN_PROGRESS'}, headers=headers)
+
+    body = client.get(f'/api/v1/projects/{project.id}/audit?limit=2', headers=project.member_headers).get_json()
+    assert [a['action'] for a in body['items']] == ['status_change', 'created']
+    assert body['items'][0]['project_id'] == project.id
+    rest = client.get(f"/api/v1/projects/{project.id}/audit?cursor={body['next_cursor']}",
+                      headers=project.member_headers).get_json()
+    assert [a['action'] for a in rest['items']] == ['created'] and rest['next_cursor'] is None
+
+    _, outsider_headers = make_user('eve@test.com')
+    assert client.get(f'/api/v1/projects/{project.id}/audit', headers=outsider_headers).status_code == 403
@@ -0,0 +1,42 @@
+import re
+import pytest
+from app import create_app
+from app.extensions import db
+from app.querymetrics import QUERY_COUNT
+from .conftest import TestConfig
+
+
+@pytest.fixture
+def app():
+    class TimingConfig(TestConfig):
+        SERVER_TIMING = True
+
+    app = create_app(TimingConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _observed(endpoint):
+    """(number of requests, total queries) recorded for `endpoint`"""
+    samples = {s.name: s.value for s in QUERY_COUNT.collect()[0].samples
+               if s.labels.get('endpoint') == endpoint}
+    return samples.get('db_queries_per_request_count', 0), samples.get('db_queries_per_request_sum', 0)
+
+
+def test_queries_are_counted_per_request_and_endpoint(client, project):
+    requests_before, queries_before = _observed('issues.list_issues')
+    resp = client.get(f'/api/v1/issues?project_id={project.id}', headers=project.owner_headers)
+    assert resp.status_code == 200
+
+    requests_after, queries_after = _observed('issues.list_issues')
+    assert requests_after == requests_before + 1
+    _, count = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries"', resp.headers['Server-Timing']).groups()
+    assert int(count) == queries_after - queries_before > 0
+
+
+def test_requests_without_queries_report_zero(client):
+    resp = client.get('/health')
+    assert resp.headers['Server-Timing'] == 'db;dur=0.0;desc="0 queries"'
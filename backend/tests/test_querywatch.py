@@ -0,0 +1,69 @@
+import logging
+import pytest
+from app import create_app
+from app.extensions import db
+from app.models import Comment, Issue
+from app.querywatch import RepeatedQueryError, fingerprint
+from .conftest import TestConfig
+
+
+def test_fingerprint_ignores_values_and_in_list_length():
+    assert fingerprint("SELECT * FROM users WHERE id = 3 AND email = 'a@b.c'") == \
+        fingerprint('SELECT * FROM users\n WHERE id = ? AND email = %(email_1)s')
+    assert fingerprint('SELECT 1 FROM t WHERE id IN (?, ?, ?)') == fingerprint('SELECT 1 FROM t WHERE id IN (?)')
+    assert fingerprint('SELECT * FROM users') != fingerprint('SELECT * FROM projects')
+
+
+def _seed_comments(project, authors):
+    issue = Issue(title='T', project_id=project.id, reporter_id=project.owner.id)
+    db.session.add(issue)
+    db.session.flush()
+    for n, author in enumerate(authors):
+        db.session.add(Comment(content=f'c{n}', issue_id=issue.id, author_id=author.id))
+    db.session.commit()
+    return issue.id
+
+
+def test_strict_mode_fails_requests_with_n_plus_one_lazy_loads(app, client, project, make_user):
+    authors = [make_user(f'user{n}@test.com')[0] for n in range(3)]
+    issue_id = _seed_comments(project, authors)
+
+    @app.route('/test/comments/<int:issue_id>')
+    def naive_comments(issue_id):
+        db.session.expire_all()
+        comments = Comment.query.filter_by(issue_id=issue_id).all()
+        return {'authors': [c.author.email for c in comments]}  # one lazy load per author
+
+    with pytest.raises(RepeatedQueryError, match='FROM users'):
+        client.get(f'/test/comments/{issue_id}')
+
+    # The eager-loading endpoint stays under the threshold
+    resp = client.get(f'/api/v1/issues/{issue_id}/comments', headers=project.owner_headers)
+    assert resp.status_code == 200
+
+
+def test_slow_statements_are_logged_with_parameters_and_plan():
+    class SlowConfig(TestConfig):
+        QUERY_WATCH_SLOW_MS = 0
+        QUERY_WATCH_STRICT = False
+
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    watch_logger = logging.getLogger('app.querywatch')
+    watch_logger.addHandler(handler)
+    try:
+        app = create_app(SlowConfig)
+        with app.app_context():
+            db.create_all()
+            with app.test_request_context('/'):
+                app.preprocess_request()
+                statement = db.text('SELECT id FROM users WHERE email = :email')
+                db.session.execute(statement, {'email': 'x@y.z'})
+            db.drop_all()
+    finally:
+        watch_logger.removeHandler(handler)
+
+    slow = [r for r in records if r.msg == 'sql.slow']
+    assert slow and 'x@y.z' in slow[0].parameters
+    assert 'users' in slow[0].plan
@@ -0,0 +1,72 @@
+import sqlite3
+import pytest
+from app import create_app, replicas
+from app.extensions import db
+from app.models import Issue
+from .conftest import TestConfig
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Primary and replica as two SQLite files; snapshot() brings the replica up to date"""
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{primary}'
+        SQLALCHEMY_REPLICA_URIS = [f'sqlite:///{replica}']
+        REPLICA_LAG_CHECK_INTERVAL = 0
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        app.snapshot = lambda: sqlite3.connect(primary).backup(sqlite3.connect(replica))
+        yield app
+        db.session.remove()
+        app.extensions['replicas'].dispose()
+
+
+def _titles(client, project):
+    resp = client.get(f'/api/v1/issues?project_id={project.id}', headers=project.owner_headers)
+    return sorted(i['title'] for i in resp.get_json())
+
+
+def test_reads_use_replica_until_it_lags(app, client, project, monkeypatch):
+    app.snapshot()
+    db.session.add(Issue(title='not replicated yet', project_id=project.id, reporter_id=project.owner.id))
+    db.session.commit()
+
+    assert _titles(client, project) == []
+
+    monkeypatch.setattr(replicas, 'measure_lag', lambda engine: 60.0)
+    assert _titles(client, project) == ['not replicated yet']
+
+
+def test_writer_reads_its_own_writes_from_primary(app, client, project):
+    app.snapshot()
+    resp = client.post('/api/v1/issues', json={'title': 'mine', 'project_id': project.id},
+                       headers=project.owner_headers)
+    assert resp.status_code == 201
+    assert client.get_cookie(replicas.PIN_COOKIE) is not None
+    assert _titles(client, project) == ['mine']
+
+    client.delete_cookie(replicas.PIN_COOKIE)
+    assert _titles(client, project) == []
+
+
+def test_core_only_writes_pin_the_writer(app, client, project, make_user):
+    newcomer, _ = make_user('newcomer@test.com')
+    resp = client.post(f'/api/v1/projects/{project.id}/members', json={'user_id': newcomer.id},
+                       headers=project.owner_headers)
+    assert resp.status_code == 200
+    assert client.get_cookie(replicas.PIN_COOKIE) is not None
+
+
+def test_membership_checks_ignore_a_stale_replica(app, client, project):
+    app.snapshot()
+    resp = client.delete(f'/api/v1/projects/{project.id}/members/{project.member.id}',
+                         headers=project.owner_headers)
+    assert resp.status_code == 204
+    client.delete_cookie(replicas.PIN_COOKIE)
+
+    resp = client.get(f'/api/v1/projects/{project.id}', headers=project.member_headers)
+    assert resp.status_code == 403
@@ -31,6 +31,11 @@ export default function IssueDetailModal({ show, onHide, issueId, members, onUpd
   // Comments
   const [newComment, setNewComment] = useState('');
   const [addingComment, setAddingComment] = useState(false);
+  // The issue embeds only the newest comments; older ones are paged in
+  const [comments, setComments] = useState([]);
+  const [commentsCursor, setCommentsCursor] = useState(null);
+  const [commentTotal, setCommentTotal] = useState(0);
+  const [loadingOlder, setLoadingOlder] = useState(false);
 
   useEffect(() => {
     if (show && issueId) {
@@ -41,13 +46,17 @@ export default function IssueDetailModal({ show, onHide, issueId, members, onUpd
   const loadIssue = async () => {
     setLoading(true);
     try {
-      const [issueRes, auditRes] = await Promise.all([
+      const [issueRes, auditRes, countRes] = await Promise.all([
         issuesAPI.get(issueId),
-        issuesAPI.getAuditLog(issueId)
+        issuesAPI.getAuditLog(issueId),
+        issuesAPI.getComments(issueId, { limit: 1, include_total: true })
       ]);
       
       setIssue(issueRes.data);
-      setAuditLog(auditRes.data);
+      setAuditLog(auditRes.data.items);
+      setComments(issueRes.data.comments || []);
+      setCommentsCursor(issueRes.data.comments_next_cursor);
+      setCommentTotal(countRes.data.total);
       setFormData({
         title: issueRes.data.title,
         description: issueRes.data.description || '',
@@ -105,6 +114,20 @@ export default function IssueDetailModal({ show, onHide, issueId, members, onUpd
     }
   };
 
+  const handleLoadOlderComments = async () => {
+    setLoadingOlder(true);
+    try {
+      const res = await issuesAPI.getComments(issueId, { cursor: commentsCursor });
+      // Pages come newest first; the thread reads oldest first
+      setComments((current) => [...res.data.items.reverse(), ...current]);
+      setCommentsCursor(res.data.next_cursor);
+    } catch (err) {
+      setError('Failed to load older comments');
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const handleDeleteComment = async (commentId) => {
     if (!window.confirm('Delete this comment?')) return;
 
@@ -278,11 +301,23 @@ export default function IssueDetailModal({ show, onHide, issueId, members, onUpd
                 )}
               </Tab>
 
-              <Tab eventKey="comments" title={`Comments (${issue.comments?.length || 0})`}>
+              <Tab eventKey="comments" title={`Comments (${commentTotal})`}>
                 <div style={{ maxHeight: '400px', overflowY: 'auto' }}>
-                  {issue.comments && issue.comments.length > 0 ? (
+                  {commentsCursor && (
+                    <div className="text-center my-2">
+                      <Button
+                        variant="link"
+                        size="sm"
+                        onClick={handleLoadOlderComments}
+                        disabled={loadingOlder}
+                      >
+                        {loadingOlder ? 'Loading...' : `Load older comments (${commentTotal - comments.length} more)`}
+                      </Button>
+                    </div>
+                  )}
+                  {comments.length > 0 ? (
                     <ListGroup variant="flush">
-                      {issue.comments.map((comment) => (
+                      {comments.map((comment) => (
                         <ListGroup.Item key={comment.id}>
                           <div className="d-flex justify-content-between align-items-start">
                             <div className="flex-grow-1">
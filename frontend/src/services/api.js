@@ -50,7 +50,7 @@ export const projectsAPI = {
     api.get('/projects'),
   
   get: (id) =>
-    api.get(`/projects/${id}`),
+    api.get(`/projects/${id}`, { params: { include_members: true } }),
   
   create: (data) =>
     api.post('/projects', data),
@@ -87,6 +87,10 @@ export const issuesAPI = {
   
   getAuditLog: (id) =>
     api.get(`/issues/${id}/audit`),
+  
+  // Newest first; pass { cursor } from comments_next_cursor for older pages
+  getComments: (id, params) =>
+    api.get(`/issues/${id}/comments`, { params }),
 };
 
 // Comments API
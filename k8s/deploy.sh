@@ -31,6 +31,7 @@ docker images ghcr.io/andreisalomia/minijira-nginx --format "{{.ID}} {{.Tag}}" |
 echo "Updating Kubernetes deployments..."
 sudo k3s kubectl set image deployment/backend backend=ghcr.io/andreisalomia/minijira-backend:$SHA -n minijira
 sudo k3s kubectl set image deployment/frontend frontend=ghcr.io/andreisalomia/minijira-frontend:$SHA -n minijira
+sudo k3s kubectl set image cronjob/audit-maintenance audit-maintenance=ghcr.io/andreisalomia/minijira-backend:$SHA -n minijira
 
 # Wait for rollout
 echo "Waiting for rollout to complete..."